@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Alias Automaton - Aho-Corasick matcher over normalized species names
+Built once from every alias, it reports each alias occurring in a card name
+in a single pass over the name, independent of how many aliases exist
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class AliasMatch:
+    """One alias occurrence in a text (text[start:end] == alias)"""
+    start: int
+    end: int
+    alias: str
+    value: str
+    order: int  # insertion order of the alias, the final tie-breaker
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+    def is_whole_word(self, text: str) -> bool:
+        """True if the match is bounded by spaces (or the ends of text)"""
+        return ((self.start == 0 or text[self.start - 1] == ' ')
+                and (self.end == len(text) or text[self.end] == ' '))
+
+
+class AliasAutomaton:
+    """Aho-Corasick automaton mapping aliases to values (first alias wins)"""
+
+    def __init__(self, aliases: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            aliases: (alias, value) pairs; a repeated alias keeps its first value
+        """
+        # Node 0 is the root; goto/fail/out are parallel per-node arrays
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._pattern: List[Optional[int]] = [None]  # pattern ending exactly here
+        self._out: List[int] = [-1]  # nearest proper suffix node with a pattern
+        self._patterns: List[Tuple[str, str]] = []
+
+        for alias, value in aliases:
+            if alias:
+                self._insert(alias, value)
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _insert(self, alias: str, value: str):
+        node = 0
+        for char in alias:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._pattern.append(None)
+                self._out.append(-1)
+            node = child
+        if self._pattern[node] is None:
+            self._pattern[node] = len(self._patterns)
+            self._patterns.append((alias, value))
+
+    def _link(self):
+        """Compute failure and output links breadth-first"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                suffix = self._fail[child]
+                self._out[child] = suffix if self._pattern[suffix] is not None else self._out[suffix]
+
+    def find_all(self, text: str) -> List[AliasMatch]:
+        """Every alias occurrence in text (overlaps included), ordered by end position"""
+        matches = []
+        goto, fail, pattern, out = self._goto, self._fail, self._pattern, self._out
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            hit = node if pattern[node] is not None else out[node]
+            while hit > 0:
+                order = pattern[hit]
+                alias, value = self._patterns[order]
+                matches.append(AliasMatch(end - len(alias), end, alias, value, order))
+                hit = out[hit]
+        return matches
+
+    @staticmethod
+    def _rank(match: AliasMatch, text: str) -> Tuple[int, int, int, int]:
+        """Sort key: longest, then whole-word, then leftmost, then first inserted"""
+        return (-match.length, not match.is_whole_word(text), match.start, match.order)
+
+    def best_match(self, text: str) -> Optional[AliasMatch]:
+        """The longest, most specific alias in text (deterministic on ties)"""
+        matches = self.find_all(text)
+        if not matches:
+            return None
+        return min(matches, key=lambda m: self._rank(m, text))
+
+
+def main():
+    """Match a few card names against a small alias set"""
+    automaton = AliasAutomaton([
+        ('mew', 'mew'), ('mewtwo', 'mewtwo'), ('pikachu', 'pikachu'),
+        ('zekrom', 'zekrom'), ('reshiram', 'reshiram'), ('ピカチュウ', 'pikachu'),
+    ])
+    print(f"{len(automaton)} aliases")
+    for text in ['dark mewtwo', 'reshiramzekrom', 'ピカチュウgx', 'eevee']:
+        best = automaton.best_match(text)
+        print(f"{text!r}: best={best.value if best else None}, "
+              f"all={sorted({m.value for m in automaton.find_all(text)})}")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ import unicodedata
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
+from urllib.parse import urlparse
 
 try:
     import requests
@@ -34,11 +35,117 @@ except ImportError:
     print("Error: 'requests' package required. Install with: pip install requests")
     sys.exit(1)
 
+from batch_ingest import DEFAULT_BATCH_SIZE, IngestStats, create_indexes, to_rows, write_rows
+from db_profiles import DEFAULT_PROFILE, PROFILES, apply_profile, finalize_for_shipping, page_usage
+from fts_tuning import DEFAULT_FTS_DETAIL, FTS_DETAIL_LEVELS, compare_prefix_index, fts_options, set_rank
+from http_client import HttpClient, shared_client
+from incremental import (
+    SET_STATE_SCHEMA,
+    SetDiff,
+    delete_vanished_rows,
+    diff_sets,
+    fetch_pokemontcg_set_cards,
+    fetch_pokemontcg_set_snapshots,
+    forget_set_state,
+    load_set_state,
+    open_existing_database,
+    record_set_state,
+)
+from rate_limiter import HostRateLimits, rate_from_delay_ms
+from set_registry import SETS_SCHEMA, SetInfo, SetRegistry, adopt_set_keys, has_table
+from url_templates import URL_TEMPLATES_SCHEMA, UrlTemplates, adopt_url_templates, template_url_sql, url_stats
+
 
 # Constants
 API_BASE_URL = "https://api.pokemontcg.io/v2"
 DB_VERSION = 1
 SOURCE_URL = "https://pokemontcg.io"
+DEFAULT_MAX_RATE = 10.0  # PokemonTCG.io requests/sec ceiling
+
+# Secondary indexes, built after the bulk load (see create_indexes)
+CARD_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_cards_set_number ON card_rows(set_key, card_number)",
+    "CREATE INDEX IF NOT EXISTS idx_cards_name_norm ON card_rows(name_normalized)",
+    "CREATE INDEX IF NOT EXISTS idx_cards_name_num ON card_rows(name_normalized, card_number)",
+]
+
+# Card rows keep a set_key into `sets` instead of set_id and set_name, and
+# their image URL as a url_templates row plus a stem (see url_templates)
+CARD_ROWS_SCHEMA = """
+    CREATE TABLE card_rows (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        name_normalized TEXT NOT NULL,
+        set_key INTEGER NOT NULL REFERENCES sets(set_key),
+        card_number TEXT NOT NULL,
+        image_template INTEGER REFERENCES url_templates(template_id),
+        image_stem TEXT,  -- NULL: same as card_number
+        rarity TEXT,
+        updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+    );
+"""
+
+# The original `cards` columns, for queries (and cards_fts) written against them
+CARDS_VIEW_SCHEMA = f"""
+    CREATE VIEW cards AS
+    SELECT c.rowid AS rowid, c.id, c.name, c.name_normalized, s.name AS set_name, s.set_id,
+           c.card_number, {template_url_sql('u', 'c')} AS image_url_small,
+           c.rarity, c.updated_at, c.set_key
+    FROM card_rows c JOIN sets s ON s.set_key = c.set_key
+    LEFT JOIN url_templates u ON u.template_id = c.image_template;
+"""
+
+# Prefix indexes (2-4 characters) serve as-you-type queries like "char"*;
+# {options} comes from fts_tuning.fts_options (prefix and detail level)
+CARDS_FTS_SQL = """
+    CREATE VIRTUAL TABLE cards_fts USING fts5(
+        name,
+        set_name,
+        card_number,
+        content='cards',
+        content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2',
+        {options}
+    )
+"""
+# bm25 weights for (name, set_name, card_number): name hits rank first
+CARDS_FTS_WEIGHTS = (10.0, 2.0, 1.0)
+
+# Sync triggers for updates after the build; set names come from `sets`,
+# and renaming a set reindexes its cards
+CARDS_FTS_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS cards_ai AFTER INSERT ON card_rows BEGIN
+        INSERT INTO cards_fts(rowid, name, set_name, card_number)
+        VALUES (NEW.rowid, NEW.name, (SELECT name FROM sets WHERE set_key = NEW.set_key), NEW.card_number);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS cards_ad AFTER DELETE ON card_rows BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
+        VALUES ('delete', OLD.rowid, OLD.name, (SELECT name FROM sets WHERE set_key = OLD.set_key),
+                OLD.card_number);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS cards_au AFTER UPDATE ON card_rows BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
+        VALUES ('delete', OLD.rowid, OLD.name, (SELECT name FROM sets WHERE set_key = OLD.set_key),
+                OLD.card_number);
+        INSERT INTO cards_fts(rowid, name, set_name, card_number)
+        VALUES (NEW.rowid, NEW.name, (SELECT name FROM sets WHERE set_key = NEW.set_key), NEW.card_number);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS sets_au_cards_fts AFTER UPDATE OF name ON sets BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
+        SELECT 'delete', rowid, name, OLD.name, card_number FROM card_rows WHERE set_key = OLD.set_key;
+        INSERT INTO cards_fts(rowid, name, set_name, card_number)
+        SELECT rowid, name, NEW.name, card_number FROM card_rows WHERE set_key = NEW.set_key;
+    END;
+"""
+DROP_CARDS_FTS_TRIGGERS = """
+    DROP TRIGGER IF EXISTS cards_ai;
+    DROP TRIGGER IF EXISTS cards_ad;
+    DROP TRIGGER IF EXISTS cards_au;
+    DROP TRIGGER IF EXISTS sets_au_cards_fts;
+"""
 
 
 def normalize_name(name: str) -> str:
@@ -72,8 +179,9 @@ def check_fts5_support(db_path: str) -> bool:
         return False
 
 
-def create_database(db_path: str) -> sqlite3.Connection:
-    """Create a new SQLite database with schema."""
+def create_database(db_path: str, profile: str = DEFAULT_PROFILE,
+                    fts_detail: str = DEFAULT_FTS_DETAIL) -> sqlite3.Connection:
+    """Create a new SQLite database with tables only (indexes come after the load)."""
     # Remove existing database if present
     path = Path(db_path)
     if path.exists():
@@ -82,94 +190,54 @@ def create_database(db_path: str) -> sqlite3.Connection:
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    # Set pragmas for performance
-    cursor.executescript("""
-        PRAGMA journal_mode=WAL;
-        PRAGMA synchronous=NORMAL;
-        PRAGMA temp_store=MEMORY;
-        PRAGMA cache_size=-64000;
-    """)
+    # Build-time pragmas (finalize_for_shipping resets them for the app)
+    apply_profile(conn, profile)
 
-    # Create main tables
+    # Create main tables: sets, URL templates, card rows keyed to them and the cards view
+    cursor.executescript(SETS_SCHEMA)
+    cursor.executescript(URL_TEMPLATES_SCHEMA)
+    cursor.executescript(CARD_ROWS_SCHEMA)
+    cursor.executescript(CARDS_VIEW_SCHEMA)
     cursor.executescript("""
-        -- Main cards table
-        CREATE TABLE cards (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            name_normalized TEXT NOT NULL,
-            set_name TEXT NOT NULL,
-            set_id TEXT NOT NULL,
-            card_number TEXT NOT NULL,
-            image_url_small TEXT,
-            rarity TEXT,
-            updated_at INTEGER DEFAULT (strftime('%s', 'now'))
-        );
-
         -- Metadata table for versioning
         CREATE TABLE meta (
             key TEXT PRIMARY KEY,
             value TEXT
         );
-
-        -- Indexes for fast lookup
-        CREATE INDEX idx_cards_set_number ON cards(set_id, card_number);
-        CREATE INDEX idx_cards_name_norm ON cards(name_normalized);
-        CREATE INDEX idx_cards_name_num ON cards(name_normalized, card_number);
-
-        -- FTS5 virtual table (we'll populate it after bulk insert)
-        CREATE VIRTUAL TABLE cards_fts USING fts5(
-            name,
-            set_name,
-            card_number,
-            content='cards',
-            content_rowid='rowid',
-            tokenize='unicode61 remove_diacritics 2'
-        );
-
-        -- Sync triggers for future updates
-        CREATE TRIGGER cards_ai AFTER INSERT ON cards BEGIN
-            INSERT INTO cards_fts(rowid, name, set_name, card_number)
-            VALUES (NEW.rowid, NEW.name, NEW.set_name, NEW.card_number);
-        END;
-
-        CREATE TRIGGER cards_ad AFTER DELETE ON cards BEGIN
-            INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
-            VALUES ('delete', OLD.rowid, OLD.name, OLD.set_name, OLD.card_number);
-        END;
-
-        CREATE TRIGGER cards_au AFTER UPDATE ON cards BEGIN
-            INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
-            VALUES ('delete', OLD.rowid, OLD.name, OLD.set_name, OLD.card_number);
-            INSERT INTO cards_fts(rowid, name, set_name, card_number)
-            VALUES (NEW.rowid, NEW.name, NEW.set_name, NEW.card_number);
-        END;
     """)
 
+    # FTS5 virtual table over the cards view (we'll populate it after bulk insert)
+    cursor.execute(CARDS_FTS_SQL.format(options=fts_options(fts_detail)))
+    cursor.executescript(CARDS_FTS_TRIGGERS)
+    cursor.executescript(SET_STATE_SCHEMA)
+
     conn.commit()
     return conn
 
 
-def fetch_total_count(api_key: Optional[str] = None) -> int:
+def fetch_total_count(
+    api_key: Optional[str] = None,
+    client: Optional[HttpClient] = None
+) -> int:
     """Fetch total card count from API."""
     headers = {"X-Api-Key": api_key} if api_key else {}
-    response = requests.get(
+    data = (client or shared_client()).get_json(
         f"{API_BASE_URL}/cards",
         params={"pageSize": 1},
         headers=headers
     )
-    response.raise_for_status()
-    data = response.json()
     return data.get("totalCount", 0)
 
 
 def fetch_cards_page(
     page: int,
     page_size: int,
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    client: Optional[HttpClient] = None
 ) -> list[dict[str, Any]]:
     """Fetch a page of cards from the API."""
     headers = {"X-Api-Key": api_key} if api_key else {}
-    response = requests.get(
+    data = (client or shared_client()).get_json(
         f"{API_BASE_URL}/cards",
         params={
             "page": page,
@@ -178,82 +246,93 @@ def fetch_cards_page(
         },
         headers=headers
     )
-    response.raise_for_status()
-    data = response.json()
     return data.get("data", [])
 
 
+# Upsert keeps rowids stable so the cards_au trigger can update FTS in place
+UPSERT_CARD_SQL = """
+    INSERT INTO card_rows
+    (id, name, name_normalized, set_key, card_number, image_template, image_stem, rarity, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, strftime('%s', 'now'))
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name,
+        name_normalized = excluded.name_normalized,
+        set_key = excluded.set_key,
+        card_number = excluded.card_number,
+        image_template = excluded.image_template,
+        image_stem = excluded.image_stem,
+        rarity = excluded.rarity,
+        updated_at = excluded.updated_at
+    WHERE (card_rows.name, card_rows.set_key, card_rows.card_number, card_rows.image_template,
+           card_rows.image_stem, card_rows.rarity)
+        IS NOT (excluded.name, excluded.set_key, excluded.card_number, excluded.image_template,
+                excluded.image_stem, excluded.rarity)
+"""
+
+
+def card_row(card: dict[str, Any], sets: SetRegistry, images: UrlTemplates) -> tuple:
+    """UPSERT_CARD_SQL parameters for an API card (set and image URL registered as keys)."""
+    name = card.get("name", "")
+    number = card.get("number", "")
+    return (
+        card.get("id", ""),
+        name,
+        normalize_name(name),
+        sets.key(SetInfo.from_pokemontcg(card.get("set", {}))),
+        number,
+        *images.encode(card.get("images", {}).get("small"), number),
+        card.get("rarity")
+    )
+
+
 def insert_cards(
     conn: sqlite3.Connection,
     cards: list[dict[str, Any]],
-    use_triggers: bool = False
+    sets: SetRegistry,
+    images: UrlTemplates,
+    use_triggers: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    stats: Optional[IngestStats] = None
 ) -> int:
     """Insert cards into the database."""
     cursor = conn.cursor()
 
     # Temporarily disable triggers for bulk insert performance
     if not use_triggers:
-        cursor.execute("DROP TRIGGER IF EXISTS cards_ai")
-        cursor.execute("DROP TRIGGER IF EXISTS cards_ad")
-        cursor.execute("DROP TRIGGER IF EXISTS cards_au")
-
-    sql = """
-        INSERT OR REPLACE INTO cards
-        (id, name, name_normalized, set_name, set_id, card_number, image_url_small, rarity, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, strftime('%s', 'now'))
-    """
+        cursor.executescript(DROP_CARDS_FTS_TRIGGERS)
 
-    inserted = 0
-    for card in cards:
-        try:
-            name = card.get("name", "")
-            set_info = card.get("set", {})
-            images = card.get("images", {})
-
-            cursor.execute(sql, (
-                card.get("id", ""),
-                name,
-                normalize_name(name),
-                set_info.get("name", ""),
-                set_info.get("id", ""),
-                card.get("number", ""),
-                images.get("small"),
-                card.get("rarity")
-            ))
-            inserted += 1
-        except Exception as e:
-            print(f"  Warning: Failed to insert card {card.get('id', 'unknown')}: {e}")
+    rows = to_rows(cards, lambda card: card_row(card, sets, images), stats,
+                   describe=lambda card: card.get("id", "unknown"))
+    return write_rows(conn, UPSERT_CARD_SQL, rows, batch_size, stats, sort_by_key=True)
 
-    conn.commit()
-    return inserted
+
+def upgrade_card_schema(conn: sqlite3.Connection) -> bool:
+    """
+    Move a database from an earlier build onto set keys and URL templates.
+
+    Returns:
+        True if anything moved; the caller recreates triggers and indexes
+    """
+    if has_table(conn, "card_rows"):
+        return adopt_url_templates(conn, "card_rows", "id", view="cards", view_schema=CARDS_VIEW_SCHEMA)
+    adopt_url_templates(conn, "cards", "id")
+    return adopt_set_keys(conn, "cards", "card_rows", CARD_ROWS_SCHEMA, CARDS_VIEW_SCHEMA,
+                          "'en'", "'pokemontcg'")
 
 
-def rebuild_fts_index(conn: sqlite3.Connection) -> None:
-    """Rebuild the FTS5 index from scratch."""
+def rebuild_fts_index(conn: sqlite3.Connection, fts_detail: str = DEFAULT_FTS_DETAIL) -> None:
+    """Rebuild the FTS5 index from scratch (fts_detail: see fts_tuning.FTS_DETAIL_LEVELS)."""
     cursor = conn.cursor()
 
     print("Rebuilding FTS5 index...")
     start = time.time()
 
     # Drop existing FTS table and triggers
-    cursor.executescript("""
-        DROP TRIGGER IF EXISTS cards_ai;
-        DROP TRIGGER IF EXISTS cards_ad;
-        DROP TRIGGER IF EXISTS cards_au;
-        DROP TABLE IF EXISTS cards_fts;
-    """)
+    cursor.executescript(DROP_CARDS_FTS_TRIGGERS)
+    cursor.execute("DROP TABLE IF EXISTS cards_fts")
 
     # Recreate FTS table
-    cursor.execute("""
-        CREATE VIRTUAL TABLE cards_fts USING fts5(
-            name,
-            set_name,
-            card_number,
-            content='cards',
-            content_rowid='rowid',
-            tokenize='unicode61 remove_diacritics 2'
-        )
-    """)
+    cursor.execute(CARDS_FTS_SQL.format(options=fts_options(fts_detail)))
 
     # Populate FTS index
     cursor.execute("""
@@ -262,30 +341,71 @@ def rebuild_fts_index(conn: sqlite3.Connection) -> None:
     """)
 
     # Recreate triggers for future updates
-    cursor.executescript("""
-        CREATE TRIGGER IF NOT EXISTS cards_ai AFTER INSERT ON cards BEGIN
-            INSERT INTO cards_fts(rowid, name, set_name, card_number)
-            VALUES (NEW.rowid, NEW.name, NEW.set_name, NEW.card_number);
-        END;
-
-        CREATE TRIGGER IF NOT EXISTS cards_ad AFTER DELETE ON cards BEGIN
-            INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
-            VALUES ('delete', OLD.rowid, OLD.name, OLD.set_name, OLD.card_number);
-        END;
-
-        CREATE TRIGGER IF NOT EXISTS cards_au AFTER UPDATE ON cards BEGIN
-            INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
-            VALUES ('delete', OLD.rowid, OLD.name, OLD.set_name, OLD.card_number);
-            INSERT INTO cards_fts(rowid, name, set_name, card_number)
-            VALUES (NEW.rowid, NEW.name, NEW.set_name, NEW.card_number);
-        END;
-    """)
+    cursor.executescript(CARDS_FTS_TRIGGERS)
 
+    conn.commit()
+    set_rank(conn, "cards_fts", CARDS_FTS_WEIGHTS)
+    # Below detail=full, clients must send AND-ed terms instead of phrases
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fts_detail', ?)", (fts_detail,))
     conn.commit()
     elapsed = time.time() - start
     print(f"FTS5 index rebuilt in {elapsed:.2f}s")
 
 
+def plan_set_refresh(
+    conn: sqlite3.Connection,
+    client: HttpClient,
+    api_key: Optional[str] = None
+) -> SetDiff:
+    """Compare the API's set list against the sets recorded by the last build."""
+    previous = load_set_state(conn, "pokemontcg", "en")
+    current = fetch_pokemontcg_set_snapshots(client, API_BASE_URL, api_key)
+    return diff_sets(current, previous)
+
+
+def apply_set_refresh(
+    conn: sqlite3.Connection,
+    client: HttpClient,
+    diff: SetDiff,
+    sets: SetRegistry,
+    images: UrlTemplates,
+    api_key: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    ingest: Optional[IngestStats] = None
+) -> int:
+    """Fetch new/changed sets, upsert their cards and drop vanished ones."""
+    upserted = 0
+    to_fetch = diff.to_fetch
+
+    for i, snapshot in enumerate(to_fetch, 1):
+        try:
+            cards = fetch_pokemontcg_set_cards(client, API_BASE_URL, snapshot.set_id, api_key)
+        except requests.RequestException as e:
+            # State is not recorded, so the set is retried on the next run
+            print(f"  ERROR on set {snapshot.set_id}: {e}")
+            continue
+
+        upserted += insert_cards(
+            conn, cards, sets, images, use_triggers=True, batch_size=batch_size, stats=ingest
+        )
+        removed = delete_vanished_rows(
+            conn, "card_rows", "id", [card.get("id", "") for card in cards],
+            set_key=sets.lookup(snapshot.set_id, "en")
+        )
+        record_set_state(conn, snapshot)
+        conn.commit()
+
+        print(f"  Set {i}/{len(to_fetch)} - {snapshot.set_name}: {len(cards)} cards, {removed} removed")
+
+    for set_id in diff.removed:
+        removed = sets.remove("card_rows", set_id, "en")
+        forget_set_state(conn, "pokemontcg", "en", set_id)
+        print(f"  Removed set {set_id}: {removed} cards")
+    conn.commit()
+
+    return upserted
+
+
 def update_metadata(
     conn: sqlite3.Connection,
     total_count: int,
@@ -321,6 +441,18 @@ def verify_database(conn: sqlite3.Connection) -> dict[str, Any]:
     cursor.execute("SELECT COUNT(*) FROM cards_fts")
     fts_count = cursor.fetchone()[0]
 
+    # Test set browsing: filtering on set_key reads idx_cards_set_number in
+    # number order (filtering on the view's set_id needs a sort)
+    set_count = cursor.execute("SELECT COUNT(*) FROM sets").fetchone()[0]
+    start = time.time()
+    cursor.execute("""
+        SELECT id, name, card_number FROM cards
+        WHERE set_key = (SELECT set_key FROM sets ORDER BY release_date DESC LIMIT 1)
+        ORDER BY card_number
+    """)
+    set_results = cursor.fetchall()
+    set_time = (time.time() - start) * 1000
+
     # Test exact search
     start = time.time()
     cursor.execute(
@@ -344,6 +476,9 @@ def verify_database(conn: sqlite3.Connection) -> dict[str, Any]:
     return {
         "card_count": card_count,
         "fts_count": fts_count,
+        "set_count": set_count,
+        "set_browse_ms": set_time,
+        "set_results": len(set_results),
         "exact_search_ms": exact_time,
         "fts_search_ms": fts_time,
         "exact_results": len(exact_results),
@@ -371,11 +506,57 @@ def main():
         default=250,
         help="Cards per API request (default: 250, max: 250)"
     )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=DEFAULT_MAX_RATE,
+        help=f"PokemonTCG.io requests/sec ceiling; backs off on 429/503 and "
+             f"honors Retry-After (default: {DEFAULT_MAX_RATE:g}, 0 = uncapped)"
+    )
     parser.add_argument(
         "--sleep-ms",
         type=int,
-        default=100,
-        help="Delay between API requests in milliseconds (default: 100)"
+        default=None,
+        help="Deprecated: fixed delay between requests; sets --max-rate to 1000/SLEEP_MS"
+    )
+    parser.add_argument(
+        "--rate-log",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Append rate limiter decisions (backoffs, give-ups) to FILE as JSON lines"
+    )
+    parser.add_argument(
+        "--ingest-batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per executemany batch (default: {DEFAULT_BATCH_SIZE}; 1 = row-at-a-time)"
+    )
+    parser.add_argument(
+        "--http-timeout",
+        type=float,
+        default=30,
+        help="Read timeout for API requests in seconds (default: 30)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Refresh an existing --out database in place, fetching only new or changed sets"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        default=DEFAULT_PROFILE,
+        help="SQLite settings while building: safe (WAL) or bulk (no fsyncs, exclusive lock; "
+             "faster, but an interrupted build starts over). Output is always finalized for "
+             f"the app bundle (default: {DEFAULT_PROFILE})"
+    )
+    parser.add_argument(
+        "--fts-detail",
+        choices=FTS_DETAIL_LEVELS,
+        default=DEFAULT_FTS_DETAIL,
+        help="FTS5 detail level of cards_fts: full, or column/none for a smaller index without "
+             f"phrase queries (prefix and AND queries still work) (default: {DEFAULT_FTS_DETAIL})"
     )
     parser.add_argument(
         "--max-pages",
@@ -398,64 +579,110 @@ def main():
         sys.exit(1)
     print("  FTS5 support confirmed")
 
-    # Fetch total count
-    print("\n[2/6] Fetching card count from API...")
-    total_count = fetch_total_count(args.api_key)
-    print(f"  Total cards available: {total_count:,}")
-
-    # Calculate pages
-    page_size = min(args.page_size, 250)  # API max is 250
-    total_pages = (total_count + page_size - 1) // page_size
-    if args.max_pages:
-        total_pages = min(total_pages, args.max_pages)
-        print(f"  Limited to {total_pages} pages for testing")
-
-    # Create database
-    print(f"\n[3/6] Creating database: {args.out}")
-    conn = create_database(args.out)
-    print("  Schema created")
-
-    # Fetch and insert cards
-    print(f"\n[4/6] Fetching and inserting cards ({total_pages} pages)...")
-    start_time = time.time()
-    total_inserted = 0
-
-    for page in range(1, total_pages + 1):
-        try:
-            cards = fetch_cards_page(page, page_size, args.api_key)
-            inserted = insert_cards(conn, cards, use_triggers=False)
-            total_inserted += inserted
+    max_rate = rate_from_delay_ms(args.sleep_ms) if args.sleep_ms is not None else args.max_rate
+    client = HttpClient(
+        timeout=(10, args.http_timeout),
+        rate_limits=HostRateLimits(log_path=args.rate_log)
+    )
+    client.set_rate_limit(urlparse(API_BASE_URL).netloc, max_rate)
+    ingest = IngestStats()
+
+    conn = open_existing_database(args.out, args.profile) if args.incremental else None
+    if args.incremental and conn is None:
+        print("\n  No existing database found; running a full build")
+
+    if conn is not None:
+        # Incremental refresh of an existing database
+        print(f"\n[2/6] Opening existing database: {args.out}")
+        start_time = time.time()
+        if upgrade_card_schema(conn):
+            conn.executescript(CARDS_FTS_TRIGGERS)
+            create_indexes(conn, CARD_INDEXES)
+            conn.commit()
+            print("  Moved cards onto set keys and URL templates (cards view)")
+        sets = SetRegistry(conn)
+        images = UrlTemplates(conn)
+
+        print("\n[3/6] Comparing sets against the last build...")
+        diff = plan_set_refresh(conn, client, args.api_key)
+        print(f"  Sets: {diff.summary()}")
+
+        print(f"\n[4/6] Refreshing {len(diff.to_fetch)} sets...")
+        total_inserted = apply_set_refresh(
+            conn, client, diff, sets, images, args.api_key, args.ingest_batch_size, ingest
+        )
+        print(f"  Upserted {total_inserted:,} cards in {time.time() - start_time:.1f}s")
+
+        print("\n[5/6] FTS5 search index kept in sync by triggers")
+        create_indexes(conn, CARD_INDEXES)
+        total_count = conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+    else:
+        # Fetch total count
+        print("\n[2/6] Fetching card count from API...")
+        total_count = fetch_total_count(args.api_key, client)
+        print(f"  Total cards available: {total_count:,}")
+
+        # Calculate pages
+        page_size = min(args.page_size, 250)  # API max is 250
+        total_pages = (total_count + page_size - 1) // page_size
+        if args.max_pages:
+            total_pages = min(total_pages, args.max_pages)
+            print(f"  Limited to {total_pages} pages for testing")
+
+        # Create database
+        print(f"\n[3/6] Creating database: {args.out}")
+        conn = create_database(args.out, args.profile, args.fts_detail)
+        sets = SetRegistry(conn)
+        images = UrlTemplates(conn)
+        print("  Schema created")
+
+        # Fetch and insert cards
+        print(f"\n[4/6] Fetching and inserting cards ({total_pages} pages)...")
+        start_time = time.time()
+        total_inserted = 0
+        failed_pages = 0
+
+        for page in range(1, total_pages + 1):
+            try:
+                cards = fetch_cards_page(page, page_size, args.api_key, client)
+                inserted = insert_cards(
+                    conn, cards, sets, images, use_triggers=False,
+                    batch_size=args.ingest_batch_size, stats=ingest
+                )
+                total_inserted += inserted
 
-            # Progress
-            progress = page / total_pages * 100
-            elapsed = time.time() - start_time
-            eta = elapsed / page * (total_pages - page) if page > 0 else 0
+                # Progress
+                progress = page / total_pages * 100
+                elapsed = time.time() - start_time
+                eta = elapsed / page * (total_pages - page) if page > 0 else 0
 
-            print(f"  Page {page}/{total_pages} ({progress:.1f}%) - "
-                  f"{inserted} cards - ETA: {eta:.0f}s")
+                print(f"  Page {page}/{total_pages} ({progress:.1f}%) - "
+                      f"{inserted} cards - ETA: {eta:.0f}s")
 
-            # Rate limiting
-            if args.sleep_ms > 0:
-                time.sleep(args.sleep_ms / 1000)
+            except requests.RequestException as e:
+                # The client already paced and retried this page with backoff
+                print(f"  ERROR on page {page}: {e}")
+                failed_pages += 1
 
-        except requests.RequestException as e:
-            print(f"  ERROR on page {page}: {e}")
-            print("  Retrying in 5 seconds...")
-            time.sleep(5)
-            # Retry once
-            try:
-                cards = fetch_cards_page(page, page_size, args.api_key)
-                inserted = insert_cards(conn, cards, use_triggers=False)
-                total_inserted += inserted
-            except Exception as retry_e:
-                print(f"  Retry failed: {retry_e}")
-
-    fetch_time = time.time() - start_time
-    print(f"  Imported {total_inserted:,} cards in {fetch_time:.1f}s")
+        fetch_time = time.time() - start_time
+        print(f"  Imported {total_inserted:,} cards in {fetch_time:.1f}s")
 
-    # Rebuild FTS index
-    print("\n[5/6] Building FTS5 search index...")
-    rebuild_fts_index(conn)
+        # Record per-set state so the next run can use --incremental
+        if failed_pages or args.max_pages:
+            print("  Partial import; not recording set state for --incremental")
+        else:
+            try:
+                for snapshot in fetch_pokemontcg_set_snapshots(client, API_BASE_URL, args.api_key):
+                    record_set_state(conn, snapshot)
+                conn.commit()
+            except requests.RequestException as e:
+                print(f"  Warning: could not record set state for --incremental: {e}")
+
+        # Build indexes and the FTS index over the loaded table
+        print("\n[5/6] Building indexes and FTS5 search index...")
+        index_time = create_indexes(conn, CARD_INDEXES)
+        print(f"  Indexes built in {index_time:.2f}s")
+        rebuild_fts_index(conn, args.fts_detail)
 
     # Update metadata
     data_version = datetime.utcnow().strftime("%Y%m%d")
@@ -466,11 +693,20 @@ def main():
     stats = verify_database(conn)
     print(f"  Card count: {stats['card_count']:,}")
     print(f"  FTS index count: {stats['fts_count']:,}")
+    print(f"  Sets: {stats['set_count']:,}")
+    print(f"  Set browse time: {stats['set_browse_ms']:.2f}ms ({stats['set_results']} results)")
     print(f"  Exact search time: {stats['exact_search_ms']:.2f}ms ({stats['exact_results']} results)")
     print(f"  FTS search time: {stats['fts_search_ms']:.2f}ms ({stats['fts_results']} results)")
-
-    # Close and optimize
-    conn.execute("VACUUM")
+    names = [row[0] for row in conn.execute("SELECT name FROM cards")]
+    for line in compare_prefix_index(conn, "cards_fts", names).summary():
+        print(f"  {line}")
+
+    # Switch to the shipped configuration (rollback journal, compact pages)
+    ship_time = finalize_for_shipping(conn)
+    print(f"  Finalized for shipping in {ship_time:.2f}s")
+    for table, pages, size in page_usage(conn):
+        print(f"    {table}: {pages:,} pages ({size / 1024:,.0f} KB)")
+    print(f"    {url_stats(conn, 'card_rows', 'cards').summary()}")
     conn.close()
 
     # Final stats
@@ -485,6 +721,9 @@ def main():
     print(f"  Cards: {stats['card_count']:,}")
     print(f"  Data version: {data_version}")
     print(f"  Total time: {total_time:.1f}s")
+    print(f"  Ingest: {ingest.summary()}")
+    print(f"  HTTP: {client.stats.summary()}")
+    print(f"  Rate limits: {client.rate_limits.summary()}")
     print("=" * 60)
 
 
@@ -25,6 +25,7 @@ import unicodedata
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
+from urllib.parse import urlparse
 
 try:
     import requests
@@ -32,12 +33,181 @@ except ImportError:
     print("Error: 'requests' package required. Install with: pip install requests")
     sys.exit(1)
 
+from batch_ingest import DEFAULT_BATCH_SIZE, IngestStats, create_indexes, to_rows, write_rows
+from checkpoint import Checkpoint, open_for_resume
+from concurrent_fetch import bounded_imap
+from http_cache import HttpCache
+from db_profiles import DEFAULT_PROFILE, PROFILES, apply_profile, finalize_for_shipping, page_usage
+from fts_tuning import DEFAULT_FTS_DETAIL, FTS_DETAIL_LEVELS, compare_prefix_index, fts_options, set_rank
+from http_client import HttpClient, shared_client
+from incremental import (
+    SET_STATE_SCHEMA,
+    SetSnapshot,
+    delete_vanished_rows,
+    diff_sets,
+    fetch_pokemontcg_set_cards,
+    fetch_pokemontcg_set_snapshots,
+    fingerprint,
+    forget_set_state,
+    load_set_state,
+    open_existing_database,
+    record_set_state,
+)
+from rate_limiter import HostRateLimits, rate_from_delay_ms
+from set_registry import SETS_SCHEMA, SetInfo, SetRegistry, adopt_set_keys, has_table
+from tcgdex_scheduler import TCGdexScheduler, TCGdexSetJob
+from url_templates import (
+    TCGDEX_SMALL_IMAGE,
+    URL_TEMPLATES_SCHEMA,
+    UrlTemplates,
+    adopt_url_templates,
+    template_url_sql,
+    url_stats,
+)
+
 
 # Constants
 POKEMONTCG_BASE_URL = "https://api.pokemontcg.io/v2"
 TCGDEX_BASE_URL = "https://api.tcgdex.net/v2"
 DB_VERSION = 2  # Bumped for multi-language support
 SOURCE_URL = "https://pokemontcg.io"
+DEFAULT_MAX_RATE = 10.0  # PokemonTCG.io requests/sec ceiling
+
+# Secondary indexes, built after the bulk load (see create_indexes)
+CARD_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_cards_language ON card_rows(language)",
+    "CREATE INDEX IF NOT EXISTS idx_cards_set_number ON card_rows(set_key, card_number)",
+    "CREATE INDEX IF NOT EXISTS idx_cards_name_norm ON card_rows(name_normalized)",
+    "CREATE INDEX IF NOT EXISTS idx_cards_name_lang ON card_rows(name_normalized, language)",
+]
+
+# Card rows keep a set_key into `sets` instead of set_id and set_name, and
+# their image URL as a url_templates row plus a stem (see url_templates)
+CARD_ROWS_SCHEMA = """
+    CREATE TABLE card_rows (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        name_normalized TEXT NOT NULL,
+        set_key INTEGER NOT NULL REFERENCES sets(set_key),
+        card_number TEXT NOT NULL,
+        image_template INTEGER REFERENCES url_templates(template_id),
+        image_stem TEXT,  -- NULL: same as card_number
+        rarity TEXT,
+        language TEXT NOT NULL DEFAULT 'en',
+        source TEXT NOT NULL DEFAULT 'pokemontcg',
+        updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+    );
+"""
+
+# The original `cards` columns, for queries (and the FTS tables) written against them
+CARDS_VIEW_SCHEMA = f"""
+    CREATE VIEW cards AS
+    SELECT c.rowid AS rowid, c.id, c.name, c.name_normalized, s.name AS set_name, s.set_id,
+           c.card_number, {template_url_sql('u', 'c')} AS image_url_small,
+           c.rarity, c.language, c.source, c.updated_at, c.set_key
+    FROM card_rows c JOIN sets s ON s.set_key = c.set_key
+    LEFT JOIN url_templates u ON u.template_id = c.image_template;
+"""
+
+# Prefix indexes (2-4 characters) serve as-you-type queries like "char"*;
+# {options} comes from fts_tuning.fts_options (prefix and detail level)
+CARDS_FTS_SQL = """
+    CREATE VIRTUAL TABLE cards_fts USING fts5(
+        name,
+        set_name,
+        card_number,
+        content='cards',
+        content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2',
+        {options}
+    )
+"""
+# bm25 weights for (name, set_name, card_number): name hits rank first
+CARDS_FTS_WEIGHTS = (10.0, 2.0, 1.0)
+
+# Sync triggers for updates after the build; set names come from `sets`,
+# and renaming a set reindexes its cards
+CARDS_FTS_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS cards_ai AFTER INSERT ON card_rows BEGIN
+        INSERT INTO cards_fts(rowid, name, set_name, card_number)
+        VALUES (NEW.rowid, NEW.name, (SELECT name FROM sets WHERE set_key = NEW.set_key), NEW.card_number);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS cards_ad AFTER DELETE ON card_rows BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
+        VALUES ('delete', OLD.rowid, OLD.name, (SELECT name FROM sets WHERE set_key = OLD.set_key),
+                OLD.card_number);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS cards_au AFTER UPDATE ON card_rows BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
+        VALUES ('delete', OLD.rowid, OLD.name, (SELECT name FROM sets WHERE set_key = OLD.set_key),
+                OLD.card_number);
+        INSERT INTO cards_fts(rowid, name, set_name, card_number)
+        VALUES (NEW.rowid, NEW.name, (SELECT name FROM sets WHERE set_key = NEW.set_key), NEW.card_number);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS sets_au_cards_fts AFTER UPDATE OF name ON sets BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
+        SELECT 'delete', rowid, name, OLD.name, card_number FROM card_rows WHERE set_key = OLD.set_key;
+        INSERT INTO cards_fts(rowid, name, set_name, card_number)
+        SELECT rowid, name, NEW.name, card_number FROM card_rows WHERE set_key = NEW.set_key;
+    END;
+"""
+
+# Upsert (not INSERT OR REPLACE) so existing rows keep their rowid and the
+# cards_au trigger fires only when something actually changed
+UPSERT_CARD_SQL = """
+    INSERT INTO card_rows
+    (id, name, name_normalized, set_key, card_number, image_template, image_stem, rarity,
+     language, source, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, strftime('%s', 'now'))
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name,
+        name_normalized = excluded.name_normalized,
+        set_key = excluded.set_key,
+        card_number = excluded.card_number,
+        image_template = excluded.image_template,
+        image_stem = excluded.image_stem,
+        rarity = excluded.rarity,
+        language = excluded.language,
+        source = excluded.source,
+        updated_at = excluded.updated_at
+    WHERE (card_rows.name, card_rows.set_key, card_rows.card_number, card_rows.image_template,
+           card_rows.image_stem, card_rows.rarity)
+        IS NOT (excluded.name, excluded.set_key, excluded.card_number, excluded.image_template,
+                excluded.image_stem, excluded.rarity)
+"""
+
+# Trigram index over Japanese and Chinese names. unicode61 treats a run of
+# CJK characters as one token, so cards_fts can't find a name inside a longer
+# one; trigrams turn any substring of 3+ characters into an index lookup.
+# Shorter queries (two-character Chinese names) must still LIKE-scan cards
+CJK_FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE cards_cjk_fts USING fts5(
+        name,
+        content='cards',
+        content_rowid='rowid',
+        tokenize='trigram'
+    );
+
+    CREATE TRIGGER cards_cjk_ai AFTER INSERT ON card_rows
+    WHEN NEW.language IN ('ja', 'zh-tw') BEGIN
+        INSERT INTO cards_cjk_fts(rowid, name) VALUES (NEW.rowid, NEW.name);
+    END;
+
+    CREATE TRIGGER cards_cjk_ad AFTER DELETE ON card_rows
+    WHEN OLD.language IN ('ja', 'zh-tw') BEGIN
+        INSERT INTO cards_cjk_fts(cards_cjk_fts, rowid, name) VALUES ('delete', OLD.rowid, OLD.name);
+    END;
+
+    CREATE TRIGGER cards_cjk_au AFTER UPDATE ON card_rows BEGIN
+        INSERT INTO cards_cjk_fts(cards_cjk_fts, rowid, name)
+        SELECT 'delete', OLD.rowid, OLD.name WHERE OLD.language IN ('ja', 'zh-tw');
+        INSERT INTO cards_cjk_fts(rowid, name)
+        SELECT NEW.rowid, NEW.name WHERE NEW.language IN ('ja', 'zh-tw');
+    END;
+"""
 
 
 def normalize_name(name: str) -> str:
@@ -78,8 +248,9 @@ def check_fts5_support() -> bool:
         return False
 
 
-def create_database(db_path: str) -> sqlite3.Connection:
-    """Create a new SQLite database with schema."""
+def create_database(db_path: str, profile: str = DEFAULT_PROFILE,
+                    fts_detail: str = DEFAULT_FTS_DETAIL) -> sqlite3.Connection:
+    """Create a new SQLite database with tables only (indexes come after the load)."""
     path = Path(db_path)
     if path.exists():
         path.unlink()
@@ -87,80 +258,57 @@ def create_database(db_path: str) -> sqlite3.Connection:
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    # Set pragmas for performance
-    cursor.executescript("""
-        PRAGMA journal_mode=WAL;
-        PRAGMA synchronous=NORMAL;
-        PRAGMA temp_store=MEMORY;
-        PRAGMA cache_size=-64000;
-    """)
+    # Build-time pragmas (finalize_for_shipping resets them for the app)
+    apply_profile(conn, profile)
 
-    # Create main tables with language support
+    # Create main tables: sets, URL templates, card rows (with language) keyed to them
+    # and the cards view
+    cursor.executescript(SETS_SCHEMA)
+    cursor.executescript(URL_TEMPLATES_SCHEMA)
+    cursor.executescript(CARD_ROWS_SCHEMA)
+    cursor.executescript(CARDS_VIEW_SCHEMA)
     cursor.executescript("""
-        -- Main cards table with language column
-        CREATE TABLE cards (
-            id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            name_normalized TEXT NOT NULL,
-            set_name TEXT NOT NULL,
-            set_id TEXT NOT NULL,
-            card_number TEXT NOT NULL,
-            image_url_small TEXT,
-            rarity TEXT,
-            language TEXT NOT NULL DEFAULT 'en',
-            source TEXT NOT NULL DEFAULT 'pokemontcg',
-            updated_at INTEGER DEFAULT (strftime('%s', 'now'))
-        );
-
         -- Metadata table for versioning
         CREATE TABLE meta (
             key TEXT PRIMARY KEY,
             value TEXT
         );
-
-        -- Indexes for fast lookup
-        CREATE INDEX idx_cards_language ON cards(language);
-        CREATE INDEX idx_cards_set_number ON cards(set_id, card_number);
-        CREATE INDEX idx_cards_name_norm ON cards(name_normalized);
-        CREATE INDEX idx_cards_name_lang ON cards(name_normalized, language);
-
-        -- FTS5 virtual table (populated after bulk insert)
-        CREATE VIRTUAL TABLE cards_fts USING fts5(
-            name,
-            set_name,
-            card_number,
-            content='cards',
-            content_rowid='rowid',
-            tokenize='unicode61 remove_diacritics 2'
-        );
     """)
 
+    # FTS5 virtual table over the cards view (populated after bulk insert)
+    cursor.execute(CARDS_FTS_SQL.format(options=fts_options(fts_detail)))
+    cursor.executescript(SET_STATE_SCHEMA)
+
     conn.commit()
     return conn
 
 
-def fetch_pokemontcg_count(api_key: Optional[str] = None) -> int:
+def fetch_pokemontcg_count(
+    api_key: Optional[str] = None,
+    base_url: str = POKEMONTCG_BASE_URL,
+    client: Optional[HttpClient] = None
+) -> int:
     """Fetch total card count from PokemonTCG.io API."""
     headers = {"X-Api-Key": api_key} if api_key else {}
-    response = requests.get(
-        f"{POKEMONTCG_BASE_URL}/cards",
+    data = (client or shared_client()).get_json(
+        f"{base_url}/cards",
         params={"pageSize": 1},
         headers=headers
     )
-    response.raise_for_status()
-    data = response.json()
     return data.get("totalCount", 0)
 
 
 def fetch_pokemontcg_page(
     page: int,
     page_size: int,
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    base_url: str = POKEMONTCG_BASE_URL,
+    client: Optional[HttpClient] = None
 ) -> list[dict[str, Any]]:
     """Fetch a page of cards from PokemonTCG.io API."""
     headers = {"X-Api-Key": api_key} if api_key else {}
-    response = requests.get(
-        f"{POKEMONTCG_BASE_URL}/cards",
+    data = (client or shared_client()).get_json(
+        f"{base_url}/cards",
         params={
             "page": page,
             "pageSize": page_size,
@@ -168,112 +316,96 @@ def fetch_pokemontcg_page(
         },
         headers=headers
     )
-    response.raise_for_status()
-    data = response.json()
     return data.get("data", [])
 
 
-def fetch_tcgdex_sets(language: str = "ja") -> list[dict[str, Any]]:
-    """Fetch all sets from TCGdex API."""
-    response = requests.get(f"{TCGDEX_BASE_URL}/{language}/sets")
-    response.raise_for_status()
-    return response.json()
-
-
-def fetch_tcgdex_set_cards(set_id: str, language: str = "ja") -> list[dict[str, Any]]:
-    """Fetch all cards in a set from TCGdex API."""
-    response = requests.get(f"{TCGDEX_BASE_URL}/{language}/sets/{set_id}")
-    if response.status_code == 404:
-        return []
-    response.raise_for_status()
-    data = response.json()
-    return data.get("cards", [])
-
-
-def insert_pokemontcg_cards(conn: sqlite3.Connection, cards: list[dict[str, Any]]) -> int:
-    """Insert PokemonTCG.io cards into the database."""
-    cursor = conn.cursor()
-
-    sql = """
-        INSERT OR REPLACE INTO cards
-        (id, name, name_normalized, set_name, set_id, card_number, image_url_small, rarity, language, source, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'en', 'pokemontcg', strftime('%s', 'now'))
-    """
+def pokemontcg_card_row(card: dict[str, Any], sets: SetRegistry, images: UrlTemplates) -> tuple:
+    """UPSERT_CARD_SQL parameters for a PokemonTCG.io card (set and image URL registered as keys)."""
+    name = card.get("name", "")
+    number = card.get("number", "")
+    return (
+        card.get("id", ""),
+        name,
+        normalize_name(name),
+        sets.key(SetInfo.from_pokemontcg(card.get("set", {}))),
+        number,
+        *images.encode(card.get("images", {}).get("small"), number),
+        card.get("rarity"),
+        "en",
+        "pokemontcg"
+    )
 
-    inserted = 0
-    for card in cards:
-        try:
-            name = card.get("name", "")
-            set_info = card.get("set", {})
-            images = card.get("images", {})
-
-            cursor.execute(sql, (
-                card.get("id", ""),
-                name,
-                normalize_name(name),
-                set_info.get("name", ""),
-                set_info.get("id", ""),
-                card.get("number", ""),
-                images.get("small"),
-                card.get("rarity")
-            ))
-            inserted += 1
-        except Exception as e:
-            print(f"  Warning: Failed to insert card {card.get('id', 'unknown')}: {e}")
 
-    conn.commit()
-    return inserted
+def insert_pokemontcg_cards(
+    conn: sqlite3.Connection,
+    cards: list[dict[str, Any]],
+    sets: SetRegistry,
+    images: UrlTemplates,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    stats: Optional[IngestStats] = None
+) -> int:
+    """Insert (or update) PokemonTCG.io cards in the database."""
+    rows = to_rows(cards, lambda card: pokemontcg_card_row(card, sets, images), stats,
+                   describe=lambda card: card.get("id", "unknown"))
+    return write_rows(conn, UPSERT_CARD_SQL, rows, batch_size, stats, sort_by_key=True)
+
+
+def tcgdex_card_id(card_id: str, language: str) -> str:
+    """Database ID for a TCGdex card (prefixed with language to avoid collisions)."""
+    return f"{language}_{card_id}"
+
+
+def tcgdex_card_row(card: dict[str, Any], set_key: int, images: UrlTemplates, language: str) -> tuple:
+    """UPSERT_CARD_SQL parameters for a card from a TCGdex set payload."""
+    name = card.get("name", "")
+    number = card.get("localId", "")
+    image_base = card.get("image", "")
+    return (
+        tcgdex_card_id(card.get("id", ""), language),
+        name,
+        normalize_name(name),
+        set_key,
+        number,
+        *images.encode(f"{image_base}{TCGDEX_SMALL_IMAGE}" if image_base else None, number),
+        None,  # TCGdex doesn't include rarity in list endpoint
+        language,
+        "tcgdex"
+    )
 
 
 def insert_tcgdex_cards(
     conn: sqlite3.Connection,
     cards: list[dict[str, Any]],
-    set_name: str,
-    set_id: str,
-    language: str
+    set_key: int,
+    images: UrlTemplates,
+    language: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    stats: Optional[IngestStats] = None
 ) -> int:
-    """Insert TCGdex cards into the database."""
-    cursor = conn.cursor()
+    """Insert (or update) one TCGdex set's cards (set_key from SetRegistry.key)."""
+    rows = to_rows(
+        cards, lambda card: tcgdex_card_row(card, set_key, images, language), stats,
+        describe=lambda card: card.get("id", "unknown")
+    )
+    return write_rows(conn, UPSERT_CARD_SQL, rows, batch_size, stats, sort_by_key=True)
 
-    sql = """
-        INSERT OR REPLACE INTO cards
-        (id, name, name_normalized, set_name, set_id, card_number, image_url_small, rarity, language, source, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'tcgdex', strftime('%s', 'now'))
-    """
 
-    inserted = 0
-    for card in cards:
-        try:
-            name = card.get("name", "")
-            card_id = card.get("id", "")
-            local_id = card.get("localId", "")
-            image_base = card.get("image", "")
-            image_url = f"{image_base}/low.webp" if image_base else None
-
-            # Prefix ID with language to avoid collisions
-            unique_id = f"{language}_{card_id}"
-
-            cursor.execute(sql, (
-                unique_id,
-                name,
-                normalize_name(name),
-                set_name,
-                set_id,
-                local_id,
-                image_url,
-                None,  # TCGdex doesn't include rarity in list endpoint
-                language
-            ))
-            inserted += 1
-        except Exception as e:
-            print(f"  Warning: Failed to insert card {card.get('id', 'unknown')}: {e}")
+def upgrade_card_schema(conn: sqlite3.Connection) -> bool:
+    """
+    Move a database from an earlier build onto set keys and URL templates.
 
-    conn.commit()
-    return inserted
+    Returns:
+        True if anything moved; the caller recreates triggers and indexes
+    """
+    if has_table(conn, "card_rows"):
+        return adopt_url_templates(conn, "card_rows", "id", view="cards", view_schema=CARDS_VIEW_SCHEMA)
+    adopt_url_templates(conn, "cards", "id")
+    return adopt_set_keys(conn, "cards", "card_rows", CARD_ROWS_SCHEMA, CARDS_VIEW_SCHEMA,
+                          "t.language", "t.source")
 
 
-def rebuild_fts_index(conn: sqlite3.Connection) -> None:
-    """Rebuild the FTS5 index from scratch."""
+def rebuild_fts_index(conn: sqlite3.Connection, fts_detail: str = DEFAULT_FTS_DETAIL) -> None:
+    """Rebuild the FTS5 index from scratch (fts_detail: see fts_tuning.FTS_DETAIL_LEVELS)."""
     cursor = conn.cursor()
 
     print("Rebuilding FTS5 index...")
@@ -284,20 +416,12 @@ def rebuild_fts_index(conn: sqlite3.Connection) -> None:
         DROP TRIGGER IF EXISTS cards_ai;
         DROP TRIGGER IF EXISTS cards_ad;
         DROP TRIGGER IF EXISTS cards_au;
+        DROP TRIGGER IF EXISTS sets_au_cards_fts;
         DROP TABLE IF EXISTS cards_fts;
     """)
 
     # Recreate FTS table
-    cursor.execute("""
-        CREATE VIRTUAL TABLE cards_fts USING fts5(
-            name,
-            set_name,
-            card_number,
-            content='cards',
-            content_rowid='rowid',
-            tokenize='unicode61 remove_diacritics 2'
-        )
-    """)
+    cursor.execute(CARDS_FTS_SQL.format(options=fts_options(fts_detail)))
 
     # Populate FTS index
     cursor.execute("""
@@ -306,30 +430,166 @@ def rebuild_fts_index(conn: sqlite3.Connection) -> None:
     """)
 
     # Recreate triggers
-    cursor.executescript("""
-        CREATE TRIGGER IF NOT EXISTS cards_ai AFTER INSERT ON cards BEGIN
-            INSERT INTO cards_fts(rowid, name, set_name, card_number)
-            VALUES (NEW.rowid, NEW.name, NEW.set_name, NEW.card_number);
-        END;
-
-        CREATE TRIGGER IF NOT EXISTS cards_ad AFTER DELETE ON cards BEGIN
-            INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
-            VALUES ('delete', OLD.rowid, OLD.name, OLD.set_name, OLD.card_number);
-        END;
-
-        CREATE TRIGGER IF NOT EXISTS cards_au AFTER UPDATE ON cards BEGIN
-            INSERT INTO cards_fts(cards_fts, rowid, name, set_name, card_number)
-            VALUES ('delete', OLD.rowid, OLD.name, OLD.set_name, OLD.card_number);
-            INSERT INTO cards_fts(rowid, name, set_name, card_number)
-            VALUES (NEW.rowid, NEW.name, NEW.set_name, NEW.card_number);
-        END;
-    """)
+    cursor.executescript(CARDS_FTS_TRIGGERS)
 
+    conn.commit()
+    set_rank(conn, "cards_fts", CARDS_FTS_WEIGHTS)
+    # Below detail=full, clients must send AND-ed terms instead of phrases
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fts_detail', ?)", (fts_detail,))
     conn.commit()
     elapsed = time.time() - start
     print(f"FTS5 index rebuilt in {elapsed:.2f}s")
 
 
+def build_cjk_fts_index(conn: sqlite3.Connection) -> bool:
+    """
+    (Re)build the trigram index over Japanese and Chinese card names.
+
+    Returns:
+        False if this SQLite lacks the trigram tokenizer (3.34+), in which
+        case the index is skipped and CJK lookups stay on LIKE
+    """
+    start = time.time()
+    conn.executescript("""
+        DROP TRIGGER IF EXISTS cards_cjk_ai;
+        DROP TRIGGER IF EXISTS cards_cjk_ad;
+        DROP TRIGGER IF EXISTS cards_cjk_au;
+        DROP TABLE IF EXISTS cards_cjk_fts;
+    """)
+    try:
+        conn.executescript(CJK_FTS_SCHEMA)
+    except sqlite3.OperationalError as e:
+        print(f"Warning: CJK trigram index skipped ({e})")
+        return False
+
+    conn.execute("""
+        INSERT INTO cards_cjk_fts(rowid, name)
+        SELECT rowid, name FROM cards WHERE language IN ('ja', 'zh-tw')
+    """)
+    conn.commit()
+    print(f"CJK trigram index built in {time.time() - start:.2f}s")
+    return True
+
+
+def has_cjk_fts_index(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cards_cjk_fts'"
+    ).fetchone() is not None
+
+
+def cjk_match_query(text: str) -> str:
+    """FTS5 MATCH string finding text anywhere in a name (needs 3+ characters)"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def refresh_pokemontcg_sets(
+    conn: sqlite3.Connection,
+    client: HttpClient,
+    sets: SetRegistry,
+    images: UrlTemplates,
+    concurrency: int,
+    base_url: str = POKEMONTCG_BASE_URL,
+    api_key: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    ingest: Optional[IngestStats] = None
+) -> int:
+    """Incrementally refresh English cards: only new or changed sets are fetched."""
+    previous = load_set_state(conn, "pokemontcg", "en")
+    diff = diff_sets(fetch_pokemontcg_set_snapshots(client, base_url, api_key), previous)
+    print(f"  Sets: {diff.summary()}")
+
+    def fetch_set(snapshot: SetSnapshot) -> list[dict[str, Any]]:
+        return fetch_pokemontcg_set_cards(client, base_url, snapshot.set_id, api_key)
+
+    upserted = 0
+    to_fetch = diff.to_fetch
+    for done, outcome in enumerate(bounded_imap(fetch_set, to_fetch, concurrency), 1):
+        snapshot = outcome.item
+        if not outcome.ok:
+            # State is not recorded, so the set is retried on the next run
+            print(f"  ERROR on set {snapshot.set_id}: {outcome.error}")
+            continue
+
+        cards = outcome.result
+        upserted += insert_pokemontcg_cards(conn, cards, sets, images, batch_size, ingest)
+        removed = delete_vanished_rows(
+            conn, "card_rows", "id", [card.get("id", "") for card in cards],
+            set_key=sets.lookup(snapshot.set_id, "en"), source="pokemontcg"
+        )
+        record_set_state(conn, snapshot)
+        conn.commit()
+
+        print(f"  Set {done}/{len(to_fetch)} - {snapshot.set_name}: "
+              f"{len(cards)} cards, {removed} removed")
+
+    for set_id in diff.removed:
+        removed = sets.remove("card_rows", set_id, "en")
+        forget_set_state(conn, "pokemontcg", "en", set_id)
+        print(f"  Removed set {set_id}: {removed} cards")
+    conn.commit()
+
+    return upserted
+
+
+def record_pokemontcg_baseline(
+    conn: sqlite3.Connection,
+    client: HttpClient,
+    base_url: str = POKEMONTCG_BASE_URL,
+    api_key: Optional[str] = None
+) -> None:
+    """Record every English set as ingested so later --incremental runs can diff."""
+    try:
+        snapshots = fetch_pokemontcg_set_snapshots(client, base_url, api_key)
+    except requests.RequestException as e:
+        print(f"  Warning: could not record set state for incremental builds: {e}")
+        return
+
+    for snapshot in snapshots:
+        record_set_state(conn, snapshot)
+    conn.commit()
+
+
+def select_tcgdex_jobs(
+    conn: sqlite3.Connection,
+    sets: SetRegistry,
+    jobs_by_language: dict[str, list[TCGdexSetJob]],
+    revalidate_all: bool,
+    allow_removals: bool
+) -> dict[str, list[TCGdexSetJob]]:
+    """
+    Pick the TCGdex sets to fetch in incremental mode.
+
+    New sets and sets whose card count changed are always fetched. With an
+    HTTP cache every set is revalidated (unchanged ones come back as cheap
+    304s and are skipped by fingerprint). Sets gone from the source are deleted.
+    """
+    selected = {}
+    for language, jobs in jobs_by_language.items():
+        previous = load_set_state(conn, "tcgdex", language)
+        current = [
+            SetSnapshot("tcgdex", language, job.set_id, job.set_name, card_count=job.card_count)
+            for job in jobs
+        ]
+        diff = diff_sets(current, previous)
+        print(f"  {language} sets: {diff.summary()}")
+
+        if revalidate_all:
+            selected[language] = jobs
+        else:
+            wanted = {snapshot.set_id for snapshot in diff.to_fetch}
+            selected[language] = [job for job in jobs if job.set_id in wanted]
+
+        if not allow_removals:
+            continue
+        for set_id in diff.removed:
+            removed = sets.remove("card_rows", set_id, language)
+            forget_set_state(conn, "tcgdex", language, set_id)
+            print(f"  Removed {language} set {set_id}: {removed} cards")
+        conn.commit()
+
+    return selected
+
+
 def update_metadata(conn: sqlite3.Connection, en_count: int, ja_count: int, data_version: str, zh_count: int = 0) -> None:
     """Update database metadata."""
     cursor = conn.cursor()
@@ -369,6 +629,18 @@ def verify_database(conn: sqlite3.Connection) -> dict[str, Any]:
     cursor.execute("SELECT COUNT(*) FROM cards_fts")
     fts_count = cursor.fetchone()[0]
 
+    # Test set browsing: filtering on set_key reads idx_cards_set_number in
+    # number order (filtering on the view's set_id needs a sort)
+    set_counts = dict(cursor.execute("SELECT language, COUNT(*) FROM sets GROUP BY language").fetchall())
+    start = time.time()
+    cursor.execute("""
+        SELECT id, name, card_number FROM cards
+        WHERE set_key = (SELECT set_key FROM sets ORDER BY card_total DESC LIMIT 1)
+        ORDER BY card_number
+    """)
+    set_results = cursor.fetchall()
+    set_time = (time.time() - start) * 1000
+
     # Test English search
     start = time.time()
     cursor.execute(
@@ -378,23 +650,29 @@ def verify_database(conn: sqlite3.Connection) -> dict[str, Any]:
     en_results = cursor.fetchall()
     en_time = (time.time() - start) * 1000
 
-    # Test Japanese search
-    start = time.time()
-    cursor.execute(
-        "SELECT id, name FROM cards WHERE name LIKE ? AND language = 'ja' LIMIT 10",
-        ("%リザードン%",)
-    )
-    ja_results = cursor.fetchall()
-    ja_time = (time.time() - start) * 1000
-
-    # Test Chinese search
-    start = time.time()
-    cursor.execute(
-        "SELECT id, name FROM cards WHERE name LIKE ? AND language = 'zh-tw' LIMIT 10",
-        ("%皮卡丘%",)
-    )
-    zh_results = cursor.fetchall()
-    zh_time = (time.time() - start) * 1000
+    # Test Japanese and Chinese substring search: LIKE scan vs trigram index
+    cjk = {}
+    has_trigram = has_cjk_fts_index(conn)
+    for prefix, language, term in (("ja", "ja", "リザードン"), ("zh", "zh-tw", "皮卡丘")):
+        start = time.time()
+        cursor.execute(
+            "SELECT id, name FROM cards WHERE name LIKE ? AND language = ?",
+            (f"%{term}%", language)
+        )
+        cjk[f"{prefix}_results"] = len(cursor.fetchall())
+        cjk[f"{prefix}_search_ms"] = (time.time() - start) * 1000
+
+        if has_trigram:
+            # CROSS JOIN keeps the index lookup first; with a plain JOIN the
+            # planner walks idx_cards_language and runs MATCH once per card
+            start = time.time()
+            cursor.execute("""
+                SELECT c.id, c.name FROM cards_cjk_fts fts
+                CROSS JOIN cards c ON c.rowid = fts.rowid
+                WHERE cards_cjk_fts MATCH ? AND c.language = ?
+            """, (cjk_match_query(term), language))
+            cjk[f"{prefix}_trigram_results"] = len(cursor.fetchall())
+            cjk[f"{prefix}_trigram_ms"] = (time.time() - start) * 1000
 
     # Test FTS search
     start = time.time()
@@ -413,14 +691,14 @@ def verify_database(conn: sqlite3.Connection) -> dict[str, Any]:
         "japanese_count": lang_counts.get("ja", 0),
         "chinese_count": lang_counts.get("zh-tw", 0),
         "fts_count": fts_count,
+        "set_counts": set_counts,
+        "set_browse_ms": set_time,
+        "set_results": len(set_results),
         "en_search_ms": en_time,
-        "ja_search_ms": ja_time,
-        "zh_search_ms": zh_time,
         "fts_search_ms": fts_time,
         "en_results": len(en_results),
-        "ja_results": len(ja_results),
-        "zh_results": len(zh_results),
-        "fts_results": len(fts_results)
+        "fts_results": len(fts_results),
+        **cjk
     }
 
 
@@ -444,11 +722,62 @@ def main():
         default=250,
         help="Cards per API request (default: 250, max: 250)"
     )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=DEFAULT_MAX_RATE,
+        help=f"PokemonTCG.io requests/sec ceiling; backs off on 429/503 and "
+             f"honors Retry-After (default: {DEFAULT_MAX_RATE:g}, 0 = uncapped)"
+    )
     parser.add_argument(
         "--sleep-ms",
         type=int,
-        default=100,
-        help="Delay between API requests in milliseconds (default: 100)"
+        default=None,
+        help="Deprecated: fixed delay between requests; sets --max-rate to 1000/SLEEP_MS"
+    )
+    parser.add_argument(
+        "--rate-log",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Append rate limiter decisions (backoffs, give-ups) to FILE as JSON lines"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="PokemonTCG.io page requests kept in flight (default: 1). "
+             "--max-rate still caps the overall request rate"
+    )
+    parser.add_argument(
+        "--ingest-batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per executemany batch (default: {DEFAULT_BATCH_SIZE}; 1 = row-at-a-time)"
+    )
+    parser.add_argument(
+        "--http-timeout",
+        type=float,
+        default=30,
+        help="Read timeout for API requests in seconds (default: 30)"
+    )
+    parser.add_argument(
+        "--http-cache",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Cache API responses in DIR and revalidate them with ETag/If-Modified-Since"
+    )
+    parser.add_argument(
+        "--http-cache-size-mb",
+        type=int,
+        default=512,
+        help="Size cap for --http-cache before LRU eviction (default: 512)"
+    )
+    parser.add_argument(
+        "--pokemontcg-url",
+        default=POKEMONTCG_BASE_URL,
+        help="PokemonTCG.io API base URL (e.g. a local mock_api_server.py)"
     )
     parser.add_argument(
         "--skip-english",
@@ -471,8 +800,52 @@ def main():
         default=None,
         help="Maximum sets to fetch per language (for testing)"
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Refresh an existing --out database in place, fetching only new or changed sets"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted build of --out from its checkpoint journal"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        default=DEFAULT_PROFILE,
+        help="SQLite settings while building: safe (WAL) or bulk (no fsyncs, exclusive lock; "
+             "faster, but a crashed build may not be resumable). Output is always finalized "
+             f"for the app bundle (default: {DEFAULT_PROFILE})"
+    )
+    parser.add_argument(
+        "--fts-detail",
+        choices=FTS_DETAIL_LEVELS,
+        default=DEFAULT_FTS_DETAIL,
+        help="FTS5 detail level of cards_fts: full, or column/none for a smaller index without "
+             f"phrase queries (prefix and AND queries still work) (default: {DEFAULT_FTS_DETAIL})"
+    )
+    parser.add_argument(
+        "--tcgdex-concurrency",
+        type=int,
+        default=4,
+        help="Concurrent TCGdex requests across all languages (default: 4)"
+    )
+    parser.add_argument(
+        "--tcgdex-rate",
+        type=float,
+        default=20.0,
+        help="TCGdex requests/sec ceiling; backs off on 429/5xx (default: 20)"
+    )
+    parser.add_argument(
+        "--tcgdex-url",
+        default=TCGDEX_BASE_URL,
+        help="TCGdex API base URL (e.g. a local mock_api_server.py)"
+    )
 
     args = parser.parse_args()
+    if args.resume and args.incremental:
+        parser.error("--resume continues an interrupted full build; --incremental runs can simply be rerun")
 
     print("=" * 60, flush=True)
     print("Pokemon Card Database Builder (Multi-Language)", flush=True)
@@ -485,10 +858,56 @@ def main():
         sys.exit(1)
     print("  FTS5 support confirmed")
 
-    # Create database
-    print(f"\n[2/8] Creating database: {args.out}")
-    conn = create_database(args.out)
-    print("  Schema created")
+    # Create (or, with --incremental/--resume, reopen) database
+    conn = None
+    if args.resume:
+        print(f"\n[2/8] Resuming interrupted build: {args.out}")
+        conn = open_for_resume(args.out, args.profile)
+        if conn is None:
+            print("  No intact checkpointed build found; running a full build")
+        else:
+            if upgrade_card_schema(conn):
+                print("  Moved cards onto set keys and URL templates (cards view)")
+            print(f"  {Checkpoint(conn).count():,} pages/sets already completed")
+    elif args.incremental:
+        print(f"\n[2/8] Opening existing database: {args.out}")
+        conn = open_existing_database(args.out, args.profile)
+        if conn is None:
+            print("  No existing database found; running a full build")
+            args.incremental = False
+        else:
+            if upgrade_card_schema(conn):
+                # Triggers on a replaced table went with it
+                conn.executescript(CARDS_FTS_TRIGGERS)
+                if has_cjk_fts_index(conn):
+                    build_cjk_fts_index(conn)
+                create_indexes(conn, CARD_INDEXES)
+                conn.commit()
+                print("  Moved cards onto set keys and URL templates (cards view)")
+            print("  Incremental mode: fetching only new or changed sets")
+
+    if conn is None:
+        print(f"\n[2/8] Creating database: {args.out}")
+        conn = create_database(args.out, args.profile, args.fts_detail)
+        print("  Schema created")
+    sets = SetRegistry(conn)
+    images = UrlTemplates(conn)
+
+    cache = None
+    if args.http_cache:
+        cache = HttpCache(args.http_cache, max_bytes=args.http_cache_size_mb * 1024 * 1024)
+        print(f"  HTTP cache: {args.http_cache} ({cache.total_bytes() / (1024 * 1024):.1f} MB)")
+    max_rate = rate_from_delay_ms(args.sleep_ms) if args.sleep_ms is not None else args.max_rate
+    client = HttpClient(
+        timeout=(10, args.http_timeout),
+        cache=cache,
+        rate_limits=HostRateLimits(log_path=args.rate_log)
+    )
+    ingest = IngestStats()
+
+    # Full builds journal finished pages/sets so an interrupted run can --resume
+    checkpoint = None if args.incremental else Checkpoint(conn)
+    incomplete = 0
 
     total_english = 0
     total_japanese = 0
@@ -499,134 +918,191 @@ def main():
     if not args.skip_english:
         print("\n[3/8] Fetching English cards from PokemonTCG.io...")
 
-        en_count = fetch_pokemontcg_count(args.api_key)
-        print(f"  Total English cards available: {en_count:,}")
-
-        page_size = min(args.page_size, 250)
-        total_pages = (en_count + page_size - 1) // page_size
-
-        en_start = time.time()
-        for page in range(1, total_pages + 1):
-            try:
-                cards = fetch_pokemontcg_page(page, page_size, args.api_key)
-                inserted = insert_pokemontcg_cards(conn, cards)
+        concurrency = max(1, args.concurrency)
+        if concurrency > 1:
+            print(f"  Fetching with {concurrency} concurrent requests")
+        # The host limiter is shared by all workers, so concurrency never exceeds --max-rate
+        pokemontcg_host = urlparse(args.pokemontcg_url).netloc
+        client.set_pool_size(pokemontcg_host, concurrency)
+        client.set_rate_limit(pokemontcg_host, max_rate, capacity=concurrency)
+
+        if args.incremental:
+            total_english = refresh_pokemontcg_sets(
+                conn, client, sets, images, concurrency, args.pokemontcg_url, args.api_key,
+                args.ingest_batch_size, ingest
+            )
+        else:
+            en_count = fetch_pokemontcg_count(args.api_key, args.pokemontcg_url, client)
+            print(f"  Total English cards available: {en_count:,}")
+
+            # A resumed build keeps the original page size so page numbers line up
+            page_size = int(checkpoint.setting("page_size", str(min(args.page_size, 250))))
+            total_pages = (en_count + page_size - 1) // page_size
+            done_pages = checkpoint.completed("pokemontcg", "en")
+            pending_pages = [page for page in range(1, total_pages + 1) if str(page) not in done_pages]
+            if len(pending_pages) < total_pages:
+                print(f"  Resuming: {total_pages - len(pending_pages)} of {total_pages} pages already done")
+
+            def fetch_page(page: int) -> list[dict[str, Any]]:
+                return fetch_pokemontcg_page(page, page_size, args.api_key, args.pokemontcg_url, client)
+
+            en_start = time.time()
+            failed_pages = 0
+            # Pages are fetched on worker threads; inserts stay on this thread
+            for done, outcome in enumerate(bounded_imap(fetch_page, pending_pages, concurrency), 1):
+                page = outcome.item
+                if not outcome.ok:
+                    print(f"  ERROR on page {page}: {outcome.error}")
+                    failed_pages += 1
+                    continue
+
+                inserted = insert_pokemontcg_cards(
+                    conn, outcome.result, sets, images, args.ingest_batch_size, ingest
+                )
                 total_english += inserted
+                checkpoint.mark("pokemontcg", str(page), "en")
+                conn.commit()
 
-                progress = page / total_pages * 100
+                progress = done / len(pending_pages) * 100
                 elapsed = time.time() - en_start
-                eta = elapsed / page * (total_pages - page) if page > 0 else 0
+                eta = elapsed / done * (len(pending_pages) - done)
 
                 print(f"  Page {page}/{total_pages} ({progress:.1f}%) - {inserted} cards - ETA: {eta:.0f}s")
 
-                if args.sleep_ms > 0:
-                    time.sleep(args.sleep_ms / 1000)
-
-            except requests.RequestException as e:
-                print(f"  ERROR on page {page}: {e}")
-                time.sleep(5)
-                try:
-                    cards = fetch_pokemontcg_page(page, page_size, args.api_key)
-                    inserted = insert_pokemontcg_cards(conn, cards)
-                    total_english += inserted
-                except Exception as retry_e:
-                    print(f"  Retry failed: {retry_e}")
+            if failed_pages:
+                incomplete += failed_pages
+                print(f"  Warning: {failed_pages} pages failed; not recording set state for --incremental")
+            else:
+                record_pokemontcg_baseline(conn, client, args.pokemontcg_url, args.api_key)
 
         print(f"  Imported {total_english:,} English cards")
     else:
         print("\n[3/8] Skipping English cards")
 
-    # Fetch Japanese cards from TCGdex
+    # Fetch Japanese and Chinese (Traditional) cards from TCGdex in parallel
+    tcgdex_languages = []
     if not args.skip_japanese:
-        print("\n[4/8] Fetching Japanese cards from TCGdex...")
-
-        try:
-            ja_sets = fetch_tcgdex_sets("ja")
-            print(f"  Found {len(ja_sets)} Japanese sets")
-
-            if args.max_sets:
-                ja_sets = ja_sets[:args.max_sets]
-                print(f"  Limited to {len(ja_sets)} sets for testing")
-
-            ja_start = time.time()
-            for i, set_info in enumerate(ja_sets, 1):
-                set_id = set_info.get("id", "")
-                set_name = set_info.get("name", "")
-
-                try:
-                    cards = fetch_tcgdex_set_cards(set_id, "ja")
-                    if cards:
-                        inserted = insert_tcgdex_cards(conn, cards, set_name, set_id, "ja")
-                        total_japanese += inserted
-
-                    progress = i / len(ja_sets) * 100
-                    elapsed = time.time() - ja_start
-                    eta = elapsed / i * (len(ja_sets) - i) if i > 0 else 0
-
-                    print(f"  Set {i}/{len(ja_sets)} ({progress:.1f}%) - {set_name}: {len(cards)} cards - ETA: {eta:.0f}s")
-
-                    # Rate limit for TCGdex
-                    time.sleep(0.05)
-
-                except Exception as e:
-                    print(f"  ERROR on set {set_id}: {e}")
-
-            print(f"  Imported {total_japanese:,} Japanese cards")
-
-        except Exception as e:
-            print(f"  ERROR fetching Japanese sets: {e}")
-    else:
-        print("\n[4/8] Skipping Japanese cards")
-
-    # Fetch Chinese (Traditional) cards from TCGdex
+        tcgdex_languages.append("ja")
     if not args.skip_chinese:
-        print("\n[5/8] Fetching Chinese (Traditional) cards from TCGdex...")
-
-        try:
-            zh_sets = fetch_tcgdex_sets("zh-tw")
-            print(f"  Found {len(zh_sets)} Chinese sets")
-
-            if args.max_sets:
-                zh_sets = zh_sets[:args.max_sets]
-                print(f"  Limited to {len(zh_sets)} sets for testing")
-
-            zh_start = time.time()
-            for i, set_info in enumerate(zh_sets, 1):
-                set_id = set_info.get("id", "")
-                set_name = set_info.get("name", "")
-
-                try:
-                    cards = fetch_tcgdex_set_cards(set_id, "zh-tw")
-                    if cards:
-                        inserted = insert_tcgdex_cards(conn, cards, set_name, set_id, "zh-tw")
-                        total_chinese += inserted
-
-                    progress = i / len(zh_sets) * 100
-                    elapsed = time.time() - zh_start
-                    eta = elapsed / i * (len(zh_sets) - i) if i > 0 else 0
-
-                    print(f"  Set {i}/{len(zh_sets)} ({progress:.1f}%) - {set_name}: {len(cards)} cards - ETA: {eta:.0f}s")
-
-                    # Rate limit for TCGdex
-                    time.sleep(0.05)
-
-                except Exception as e:
-                    print(f"  ERROR on set {set_id}: {e}")
-
-            print(f"  Imported {total_chinese:,} Chinese cards")
-
-        except Exception as e:
-            print(f"  ERROR fetching Chinese sets: {e}")
+        tcgdex_languages.append("zh-tw")
+
+    if tcgdex_languages:
+        print(f"\n[4/8] Fetching TCGdex set lists ({', '.join(tcgdex_languages)})...")
+        scheduler = TCGdexScheduler(
+            base_url=args.tcgdex_url,
+            max_per_host=args.tcgdex_concurrency,
+            max_rate=args.tcgdex_rate,
+            timeout=args.http_timeout,
+            client=client
+        )
+        jobs_by_language = scheduler.plan_jobs(tcgdex_languages, args.max_sets)
+        for language, jobs in jobs_by_language.items():
+            print(f"  Found {len(jobs)} {language} sets")
+        if args.max_sets:
+            print(f"  Limited to {args.max_sets} sets per language for testing")
+
+        if args.incremental:
+            jobs_by_language = select_tcgdex_jobs(
+                conn, sets, jobs_by_language,
+                revalidate_all=cache is not None,
+                allow_removals=not args.max_sets
+            )
+        elif checkpoint is not None:
+            for language, jobs in jobs_by_language.items():
+                done_sets = checkpoint.completed("tcgdex", language)
+                if done_sets:
+                    print(f"  Resuming: {len(done_sets)} {language} sets already done")
+                jobs_by_language[language] = [job for job in jobs if job.set_id not in done_sets]
+        previous_state = {
+            language: load_set_state(conn, "tcgdex", language) if args.incremental else {}
+            for language in tcgdex_languages
+        }
+
+        jobs = TCGdexScheduler.interleave(jobs_by_language)
+        print(f"\n[5/8] Fetching {len(jobs)} TCGdex sets "
+              f"({args.tcgdex_concurrency} concurrent)...")
+
+        tcgdex_start = time.time()
+        tcgdex_totals = {language: 0 for language in tcgdex_languages}
+        for done, outcome in enumerate(scheduler.iter_set_details(jobs), 1):
+            job = outcome.item
+            if not outcome.ok:
+                print(f"  ERROR on {job.language} set {job.set_id}: {outcome.error}")
+                incomplete += 1
+                continue
+
+            if outcome.result is None:
+                print(f"  Set {job.language}/{job.set_id} not found")
+                continue
+
+            cards = outcome.result.get("cards", [])
+            snapshot = SetSnapshot(
+                "tcgdex", job.language, job.set_id, job.set_name,
+                release_date=outcome.result.get("releaseDate"),
+                card_count=job.card_count,
+                fingerprint=fingerprint(cards)
+            )
+            previous = previous_state[job.language].get(job.set_id)
+
+            if previous is None or previous.fingerprint != snapshot.fingerprint:
+                set_key = sets.key(SetInfo.from_tcgdex(
+                    outcome.result, job.language, set_id=job.set_id, name=job.set_name
+                ))
+                if cards:
+                    inserted = insert_tcgdex_cards(
+                        conn, cards, set_key, images, job.language, args.ingest_batch_size, ingest
+                    )
+                    tcgdex_totals[job.language] += inserted
+                if args.incremental:
+                    delete_vanished_rows(
+                        conn, "card_rows", "id",
+                        [tcgdex_card_id(card.get("id", ""), job.language) for card in cards],
+                        set_key=set_key, source="tcgdex"
+                    )
+                record_set_state(conn, snapshot)
+                if checkpoint is not None:
+                    checkpoint.mark("tcgdex", job.set_id, job.language)
+                conn.commit()
+
+            progress = done / len(jobs) * 100
+            elapsed = time.time() - tcgdex_start
+            eta = elapsed / done * (len(jobs) - done)
+
+            print(f"  Set {done}/{len(jobs)} ({progress:.1f}%) - [{job.language}] "
+                  f"{job.set_name}: {len(cards)} cards - ETA: {eta:.0f}s")
+
+        total_japanese = tcgdex_totals.get("ja", 0)
+        total_chinese = tcgdex_totals.get("zh-tw", 0)
+        print(f"  Imported {total_japanese:,} Japanese and {total_chinese:,} Chinese cards "
+              f"({scheduler.request_count} requests, {scheduler.limiter.throttle_count} throttled)")
     else:
+        print("\n[4/8] Skipping Japanese cards")
         print("\n[5/8] Skipping Chinese cards")
 
-    # Rebuild FTS index
-    print("\n[6/8] Building FTS5 search index...")
-    rebuild_fts_index(conn)
+    # Build indexes over the loaded table, then the FTS index
+    # (incremental runs keep FTS current through triggers)
+    print("\n[6/8] Building indexes and FTS5 search index...")
+    index_time = create_indexes(conn, CARD_INDEXES)
+    print(f"  Indexes built in {index_time:.2f}s")
+    if args.incremental:
+        print("  Kept in sync by cards_ai/ad/au triggers; skipping rebuild")
+        if not has_cjk_fts_index(conn):
+            build_cjk_fts_index(conn)
+    else:
+        rebuild_fts_index(conn, args.fts_detail)
+        build_cjk_fts_index(conn)
 
     # Update metadata
     print("\n[7/8] Updating metadata...")
     data_version = datetime.utcnow().strftime("%Y%m%d")
-    update_metadata(conn, total_english, total_japanese, data_version, total_chinese)
+    lang_counts = dict(conn.execute("SELECT language, COUNT(*) FROM cards GROUP BY language").fetchall())
+    update_metadata(
+        conn,
+        lang_counts.get("en", 0),
+        lang_counts.get("ja", 0),
+        data_version,
+        lang_counts.get("zh-tw", 0)
+    )
     print("  Metadata updated")
 
     # Verify
@@ -637,13 +1113,33 @@ def main():
     print(f"  Japanese cards: {stats['japanese_count']:,}")
     print(f"  Chinese cards: {stats['chinese_count']:,}")
     print(f"  FTS index count: {stats['fts_count']:,}")
+    print("  Sets: " + ", ".join(f"{count:,} {language}" for language, count in stats['set_counts'].items()))
+    print(f"  Set browse: {stats['set_browse_ms']:.2f}ms ({stats['set_results']} results)")
     print(f"  English search: {stats['en_search_ms']:.2f}ms ({stats['en_results']} results)")
-    print(f"  Japanese search: {stats['ja_search_ms']:.2f}ms ({stats['ja_results']} results)")
-    print(f"  Chinese search: {stats['zh_search_ms']:.2f}ms ({stats['zh_results']} results)")
+    for prefix, label in (("ja", "Japanese"), ("zh", "Chinese")):
+        line = f"  {label} substring search: LIKE {stats[f'{prefix}_search_ms']:.2f}ms ({stats[f'{prefix}_results']} results)"
+        if f"{prefix}_trigram_ms" in stats:
+            line += (f", trigram {stats[f'{prefix}_trigram_ms']:.2f}ms "
+                     f"({stats[f'{prefix}_trigram_results']} results)")
+        print(line)
     print(f"  FTS search: {stats['fts_search_ms']:.2f}ms ({stats['fts_results']} results)")
-
-    # Close and optimize
-    conn.execute("VACUUM")
+    names = [row[0] for row in conn.execute("SELECT name FROM cards")]
+    for line in compare_prefix_index(conn, "cards_fts", names).summary():
+        print(f"  {line}")
+
+    # Drop the checkpoint journal once nothing is left to resume
+    if checkpoint is not None:
+        if incomplete:
+            print(f"\n  {incomplete} pages/sets failed; rerun with --resume to fetch only those")
+        else:
+            checkpoint.clear()
+
+    # Switch to the shipped configuration (rollback journal, compact pages)
+    ship_time = finalize_for_shipping(conn)
+    print(f"  Finalized for shipping in {ship_time:.2f}s")
+    for table, pages, size in page_usage(conn):
+        print(f"    {table}: {pages:,} pages ({size / 1024:,.0f} KB)")
+    print(f"    {url_stats(conn, 'card_rows', 'cards').summary()}")
     conn.close()
 
     # Final stats
@@ -655,12 +1151,20 @@ def main():
     print("=" * 60)
     print(f"  Database: {args.out}")
     print(f"  Size: {db_size:.2f} MB")
-    print(f"  English cards: {total_english:,}")
-    print(f"  Japanese cards: {total_japanese:,}")
-    print(f"  Chinese cards: {total_chinese:,}")
-    print(f"  Total cards: {total_english + total_japanese + total_chinese:,}")
+    # Database totals (as recorded in meta); a resumed or incremental run
+    # writes only part of them
+    print(f"  English cards: {lang_counts.get('en', 0):,}")
+    print(f"  Japanese cards: {lang_counts.get('ja', 0):,}")
+    print(f"  Chinese cards: {lang_counts.get('zh-tw', 0):,}")
+    print(f"  Total cards: {stats['total_count']:,}")
+    if args.incremental or args.resume:
+        print(f"  Written this run: {total_english:,} English, {total_japanese:,} Japanese, "
+              f"{total_chinese:,} Chinese")
     print(f"  Data version: {data_version}")
     print(f"  Total time: {total_time:.1f}s")
+    print(f"  Ingest: {ingest.summary()}")
+    print(f"  HTTP: {client.stats.summary()}")
+    print(f"  Rate limits: {client.rate_limits.summary()}")
     print("=" * 60)
 
 
@@ -10,7 +10,8 @@ Builds a species-aware database that enables cross-language search:
 Architecture:
 - species: Canonical Pokémon (1,010 rows)
 - species_aliases: Multilingual names + romaji (10,100+ rows)
-- printings: Card instances (32,733 rows)
+- sets: Set names and metadata per language (set_key)
+- printings: Card instances (32,733 rows; a view over printing_rows)
 - printing_species_map: Link cards to species (32,733+ rows)
 
 Usage:
@@ -26,37 +27,196 @@ import re
 import sqlite3
 import sys
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Iterable, Iterator, Tuple, Optional
+from urllib.parse import urlparse
 
 # Import our modules
+from batch_ingest import DEFAULT_BATCH_SIZE, IngestStats, create_indexes, to_rows, write_rows
+from checkpoint import PHASE, Checkpoint, open_for_resume
+from db_profiles import DEFAULT_PROFILE, PROFILES, apply_profile, finalize_for_shipping, page_usage
+from fts_tuning import DEFAULT_FTS_DETAIL, FTS_DETAIL_LEVELS, compare_prefix_index, fts_options, set_rank
+from concurrent_fetch import bounded_stage
+from http_cache import HttpCache
+from http_client import HttpClient
+from incremental import (
+    SET_STATE_SCHEMA,
+    SetDiff,
+    SetSnapshot,
+    delete_vanished_rows,
+    diff_sets,
+    fetch_pokemontcg_set_cards,
+    fetch_pokemontcg_set_snapshots,
+    fingerprint,
+    forget_set_state,
+    load_set_state,
+    open_existing_database,
+    record_set_state,
+)
 from species_fetcher import SpeciesFetcher, Species, SpeciesName
-from romanization import Romanizer
+from romanization import Romanizer, VariantStats
 from species_mapper import SpeciesMapper, CardSpeciesMapping
-
-try:
-    import requests
-except ImportError:
-    print("Error: 'requests' package required. Install with: pip install requests")
-    sys.exit(1)
+from parallel_mapper import MappingPool, default_workers
+from rate_limiter import HostRateLimits
+from set_registry import SETS_SCHEMA, SetInfo, SetRegistry, adopt_set_keys, has_table
+from tcgdex_scheduler import TCGdexScheduler, TCGdexSetJob
+from url_templates import (
+    TCGDEX_SMALL_IMAGE,
+    URL_TEMPLATES_SCHEMA,
+    UrlTemplates,
+    adopt_url_templates,
+    template_url_sql,
+    url_stats,
+)
 
 
 # Constants
 POKEMONTCG_BASE_URL = "https://api.pokemontcg.io/v2"
 TCGDEX_BASE_URL = "https://api.tcgdex.net/v2"
 DB_VERSION = 2  # V2 with species normalization
+PIPELINE_DEPTH = 4  # Pages buffered between streaming pipeline stages
+DEFAULT_MAX_RATE = 10.0  # PokemonTCG.io requests/sec ceiling
+
+# Secondary indexes, built in finalize_database after the bulk load
+V2_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_species_canonical ON species(canonical_name)",
+    # One row per spelling and language; also serves alias lookups by spelling
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_species_aliases_unique "
+    "ON species_aliases(alias_normalized, language, species_id)",
+    "CREATE INDEX IF NOT EXISTS idx_species_aliases_species ON species_aliases(species_id)",
+    "CREATE INDEX IF NOT EXISTS idx_printings_set_number ON printing_rows(set_key, card_number)",
+    "CREATE INDEX IF NOT EXISTS idx_printings_language ON printing_rows(language)",
+    "CREATE INDEX IF NOT EXISTS idx_printings_variant ON printing_rows(variant)",
+    "CREATE INDEX IF NOT EXISTS idx_printing_species_map_species ON printing_species_map(species_id)",
+    "CREATE INDEX IF NOT EXISTS idx_printing_species_map_printing ON printing_species_map(printing_id)",
+]
+
+# bm25 weight for species_aliases_fts(alias), recorded so clients rank the
+# same way the builder's benchmark does
+SPECIES_ALIASES_FTS_WEIGHTS = (1.0,)
+
+# Card printings (specific instances); set_key points into `sets`, and the
+# image URL is a url_templates row plus a stem (see url_templates)
+PRINTING_ROWS_SCHEMA = """
+    CREATE TABLE printing_rows (
+        printing_id TEXT PRIMARY KEY,
+        set_key INTEGER NOT NULL REFERENCES sets(set_key),
+        card_number TEXT NOT NULL,
+        language TEXT NOT NULL,
+        image_template INTEGER REFERENCES url_templates(template_id),
+        image_stem TEXT,  -- NULL: same as card_number
+        rarity TEXT,
+        variant TEXT,  -- 'EX', 'GX', 'V', 'VMAX', 'VSTAR', 'ex' or NULL
+        source TEXT NOT NULL DEFAULT 'pokemontcg',
+        updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+    );
+"""
+
+# The original `printings` columns, for queries (and printings_fts) written against them
+PRINTINGS_VIEW_SCHEMA = f"""
+    CREATE VIEW printings AS
+    SELECT p.rowid AS rowid, p.printing_id, s.set_id, s.name AS set_name, p.card_number,
+           p.language, {template_url_sql('u', 'p')} AS image_url_small,
+           p.rarity, p.variant, p.source, p.updated_at, p.set_key
+    FROM printing_rows p JOIN sets s ON s.set_key = p.set_key
+    LEFT JOIN url_templates u ON u.template_id = p.image_template;
+"""
+
+# Upsert keeps rowids stable so the printings_au trigger updates FTS in place
+UPSERT_PRINTING_SQL = """
+    INSERT INTO printing_rows (
+        printing_id, set_key, card_number, language,
+        image_template, image_stem, rarity, variant, source
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(printing_id) DO UPDATE SET
+        set_key = excluded.set_key,
+        card_number = excluded.card_number,
+        language = excluded.language,
+        image_template = excluded.image_template,
+        image_stem = excluded.image_stem,
+        rarity = excluded.rarity,
+        variant = excluded.variant,
+        source = excluded.source,
+        updated_at = strftime('%s', 'now')
+    WHERE (printing_rows.set_key, printing_rows.card_number, printing_rows.image_template,
+           printing_rows.image_stem, printing_rows.rarity, printing_rows.variant)
+        IS NOT (excluded.set_key, excluded.card_number, excluded.image_template,
+                excluded.image_stem, excluded.rarity, excluded.variant)
+"""
+
+# Set names come from `sets`; renaming a set reindexes its printings
+PRINTINGS_FTS_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS printings_ai AFTER INSERT ON printing_rows BEGIN
+        INSERT INTO printings_fts(rowid, set_name, card_number)
+        VALUES (NEW.rowid, (SELECT name FROM sets WHERE set_key = NEW.set_key), NEW.card_number);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS printings_ad AFTER DELETE ON printing_rows BEGIN
+        INSERT INTO printings_fts(printings_fts, rowid, set_name, card_number)
+        VALUES ('delete', OLD.rowid, (SELECT name FROM sets WHERE set_key = OLD.set_key), OLD.card_number);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS printings_au AFTER UPDATE ON printing_rows BEGIN
+        INSERT INTO printings_fts(printings_fts, rowid, set_name, card_number)
+        VALUES ('delete', OLD.rowid, (SELECT name FROM sets WHERE set_key = OLD.set_key), OLD.card_number);
+        INSERT INTO printings_fts(rowid, set_name, card_number)
+        VALUES (NEW.rowid, (SELECT name FROM sets WHERE set_key = NEW.set_key), NEW.card_number);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS sets_au_printings_fts AFTER UPDATE OF name ON sets BEGIN
+        INSERT INTO printings_fts(printings_fts, rowid, set_name, card_number)
+        SELECT 'delete', rowid, OLD.name, card_number FROM printing_rows WHERE set_key = OLD.set_key;
+        INSERT INTO printings_fts(rowid, set_name, card_number)
+        SELECT rowid, NEW.name, card_number FROM printing_rows WHERE set_key = NEW.set_key;
+    END;
+"""
+
+
+@dataclass
+class CardPage:
+    """One fetched page (or set) flowing through the streaming pipeline"""
+    label: str
+    cards: List[Dict]
+    snapshot: Optional[SetSnapshot] = None  # set_state recorded once the page is written
+    prune: bool = False  # delete printings of the set that the page no longer contains
+    checkpoint: Optional[Tuple[str, str, str]] = None  # (source, language, unit) journaled once written
+    mappings: List[Tuple[str, str, bool]] = field(default_factory=list)
+    unmapped: int = 0
 
 
 class DatabaseBuilder:
     """Orchestrates the multi-phase database build process"""
 
-    def __init__(self, output_path: str, api_key: Optional[str] = None):
+    def __init__(self, output_path: str, api_key: Optional[str] = None,
+                 http_cache: Optional[HttpCache] = None, incremental: bool = False,
+                 batch_size: int = DEFAULT_BATCH_SIZE, resume: bool = False,
+                 max_rate: float = DEFAULT_MAX_RATE, rate_log: Optional[Path] = None,
+                 species_concurrency: int = SpeciesFetcher.DEFAULT_CONCURRENCY,
+                 map_workers: int = 0, profile: str = DEFAULT_PROFILE,
+                 fts_detail: str = DEFAULT_FTS_DETAIL):
         self.output_path = output_path
         self.api_key = api_key
+        self.incremental = incremental
+        self.resume = resume
+        self.profile = profile  # build-time pragmas, see db_profiles
+        self.fts_detail = fts_detail  # detail level of the FTS5 tables, see fts_tuning
+        self.checkpoint: Optional[Checkpoint] = None
+        self.batch_size = batch_size
+        self.ingest = IngestStats()
         self.conn: Optional[sqlite3.Connection] = None
-        self.species_fetcher = SpeciesFetcher()
+        self.sets: Optional[SetRegistry] = None  # set_keys, once the database is open
+        self.images: Optional[UrlTemplates] = None  # image URL template_ids, likewise
+        self.http = HttpClient(cache=http_cache, rate_limits=HostRateLimits(log_path=rate_log))
+        self.http.set_rate_limit(urlparse(POKEMONTCG_BASE_URL).netloc, max_rate)
+        self.species_fetcher = SpeciesFetcher(http_client=self.http)
+        self.species_concurrency = species_concurrency
+        self.map_workers = map_workers  # 0 = one per core, 1 = map on the pipeline thread
+        self.mapping_pool: Optional[MappingPool] = None
         self.romanizer = Romanizer()
+        self.tcgdex = TCGdexScheduler(TCGDEX_BASE_URL, client=self.http)
 
         # Stats
         self.stats = {
@@ -64,9 +224,15 @@ class DatabaseBuilder:
             'alias_count': 0,
             'printing_count': 0,
             'mapping_count': 0,
+            'unmapped_count': 0,
             'start_time': time.time(),
         }
 
+        # Set once the English page loop reaches the end of the catalog
+        self._pokemontcg_complete = False
+        # Pages/sets that failed and are left for --resume
+        self._incomplete = 0
+
     def build(self):
         """Execute the full build pipeline"""
         print("=" * 70)
@@ -74,27 +240,74 @@ class DatabaseBuilder:
         print("=" * 70)
 
         try:
-            # Phase 1: Create database and schema
-            print("\n[Phase 1/5] Creating database and schema...")
-            self.create_database()
+            if self.incremental:
+                self.conn = open_existing_database(self.output_path, self.profile)
+                if self.conn is not None:
+                    self.build_incremental()
+                    return
+                print("\nNo existing database found; running a full build")
+
+            if self.resume:
+                self.conn = open_for_resume(self.output_path, self.profile)
+                if self.conn is None:
+                    print("\nNo intact checkpointed build found; running a full build")
 
-            # Phase 2: Fetch and insert species
-            print("\n[Phase 2/5] Fetching species from PokéAPI...")
-            species_list = self.fetch_species()
-            self.insert_species(species_list)
-
-            # Phase 3: Generate and insert aliases
-            print("\n[Phase 3/5] Generating multilingual aliases...")
-            self.generate_aliases(species_list)
-
-            # Phase 4: Fetch and insert card printings
-            print("\n[Phase 4/5] Fetching card printings...")
-            cards = self.fetch_cards()
-            self.insert_printings(cards)
-
-            # Phase 5: Map printings to species
-            print("\n[Phase 5/5] Mapping cards to species...")
-            self.map_printings_to_species(cards, species_list)
+            # Phase 1: Create database and schema
+            if self.conn is None:
+                print("\n[Phase 1/4] Creating database and schema...")
+                self.create_database()
+            else:
+                print(f"\n[Phase 1/4] Resuming interrupted build: {self.output_path}")
+                self._upgrade_printing_schema()
+                self._ensure_unique_aliases()
+            self.sets = SetRegistry(self.conn)
+            self.images = UrlTemplates(self.conn)
+
+            # Full builds journal finished work so an interrupted run can --resume
+            self.checkpoint = Checkpoint(self.conn)
+
+            if self.checkpoint.is_done(PHASE, 'species'):
+                print("\n[Phase 2-3/4] Species and aliases already built; reusing them")
+                species_dict = self._species_dict_from_database()
+                self.stats['species_count'] = self.conn.execute("SELECT COUNT(*) FROM species").fetchone()[0]
+                self.stats['alias_count'] = self.conn.execute("SELECT COUNT(*) FROM species_aliases").fetchone()[0]
+            else:
+                # Drop whatever a previous attempt left half-written
+                self.conn.execute("DELETE FROM species_aliases")
+                self.conn.execute("DELETE FROM species")
+
+                # Phase 2: Fetch and insert species
+                print("\n[Phase 2/4] Fetching species from PokéAPI...")
+                species_list = self.fetch_species()
+                self.insert_species(species_list)
+
+                # Phase 3: Generate and insert aliases
+                print("\n[Phase 3/4] Generating multilingual aliases...")
+                self.generate_aliases(species_list)
+
+                self.checkpoint.mark(PHASE, 'species')
+                self.conn.commit()
+                species_dict = self._species_dict(species_list)
+
+            # Phase 4: Stream card printings (each page is inserted and mapped as it arrives)
+            print("\n[Phase 4/4] Streaming card printings (fetch → map → insert)...")
+            mapper = SpeciesMapper(species_dict)
+            self.mapping_pool = self._start_mapping_pool(mapper)
+
+            print("\n  PokemonTCG.io (English)...")
+            done_pages = self.checkpoint.completed('pokemontcg', 'en')
+            if done_pages:
+                print(f"    Resuming: {len(done_pages)} pages already done")
+            self.stream_pages(self._iter_pokemontcg_pages(done_pages), mapper)
+            self.record_pokemontcg_baseline()
+
+            print("\n  TCGdex (Japanese, Chinese)...")
+            jobs = self._plan_tcgdex_jobs()
+            self.stream_pages(self._iter_tcgdex_pages(jobs), mapper)
+
+            print(f"\n  Total printings: {self.stats['printing_count']:,}, "
+                  f"mappings: {self.stats['mapping_count']:,}, "
+                  f"unmapped (trainers/energy): {self.stats['unmapped_count']:,}")
 
             # Finalize
             self.finalize_database()
@@ -106,8 +319,12 @@ class DatabaseBuilder:
             print(f"\nError: {e}")
             import traceback
             traceback.print_exc()
+            if self.checkpoint is not None:
+                print("Completed pages are kept; rerun with --resume to continue")
             sys.exit(1)
         finally:
+            if self.mapping_pool is not None:
+                self.mapping_pool.close()
             if self.conn:
                 self.conn.close()
 
@@ -123,16 +340,11 @@ class DatabaseBuilder:
         self.conn = sqlite3.connect(self.output_path)
         cursor = self.conn.cursor()
 
-        # Performance pragmas
-        cursor.executescript("""
-            PRAGMA journal_mode=WAL;
-            PRAGMA synchronous=NORMAL;
-            PRAGMA temp_store=MEMORY;
-            PRAGMA cache_size=-64000;
-        """)
+        # Build-time pragmas (finalize_database resets them for the app)
+        apply_profile(self.conn, self.profile)
 
         # Create v2 schema
-        cursor.executescript("""
+        cursor.executescript(f"""
             -- Canonical Pokémon species
             CREATE TABLE species (
                 species_id TEXT PRIMARY KEY,
@@ -153,18 +365,11 @@ class DatabaseBuilder:
                 FOREIGN KEY (species_id) REFERENCES species(species_id) ON DELETE CASCADE
             );
 
-            -- Card printings (specific instances)
-            CREATE TABLE printings (
-                printing_id TEXT PRIMARY KEY,
-                set_id TEXT NOT NULL,
-                set_name TEXT NOT NULL,
-                card_number TEXT NOT NULL,
-                language TEXT NOT NULL,
-                image_url_small TEXT,
-                rarity TEXT,
-                source TEXT NOT NULL DEFAULT 'pokemontcg',
-                updated_at INTEGER DEFAULT (strftime('%s', 'now'))
-            );
+            -- Sets, URL templates, card printings keyed to them and the printings view
+            {SETS_SCHEMA}
+            {URL_TEMPLATES_SCHEMA}
+            {PRINTING_ROWS_SCHEMA}
+            {PRINTINGS_VIEW_SCHEMA}
 
             -- Link printings to species (many-to-many)
             CREATE TABLE printing_species_map (
@@ -172,34 +377,29 @@ class DatabaseBuilder:
                 species_id TEXT NOT NULL,
                 is_primary BOOLEAN DEFAULT 1,
                 PRIMARY KEY (printing_id, species_id),
-                FOREIGN KEY (printing_id) REFERENCES printings(printing_id) ON DELETE CASCADE,
+                FOREIGN KEY (printing_id) REFERENCES printing_rows(printing_id) ON DELETE CASCADE,
                 FOREIGN KEY (species_id) REFERENCES species(species_id) ON DELETE CASCADE
             );
 
-            -- Indexes for performance
-            CREATE INDEX idx_species_canonical ON species(canonical_name);
-            CREATE INDEX idx_species_aliases_norm ON species_aliases(alias_normalized, language);
-            CREATE INDEX idx_species_aliases_species ON species_aliases(species_id);
-            CREATE INDEX idx_printings_set_number ON printings(set_id, card_number);
-            CREATE INDEX idx_printings_language ON printings(language);
-            CREATE INDEX idx_printing_species_map_species ON printing_species_map(species_id);
-            CREATE INDEX idx_printing_species_map_printing ON printing_species_map(printing_id);
+            -- Secondary indexes (V2_INDEXES) are built after the bulk load
 
-            -- FTS5 for fast alias search
+            -- FTS5 for fast alias search (prefix indexes for as-you-type)
             CREATE VIRTUAL TABLE species_aliases_fts USING fts5(
                 alias,
                 content='species_aliases',
                 content_rowid='alias_id',
-                tokenize='unicode61 remove_diacritics 2'
+                tokenize='unicode61 remove_diacritics 2',
+                {fts_options(self.fts_detail)}
             );
 
-            -- FTS5 for set/number search
+            -- FTS5 for set/number search (over the printings view)
             CREATE VIRTUAL TABLE printings_fts USING fts5(
                 set_name,
                 card_number,
                 content='printings',
                 content_rowid='rowid',
-                tokenize='unicode61 remove_diacritics 2'
+                tokenize='unicode61 remove_diacritics 2',
+                {fts_options(self.fts_detail, prefix=False)}
             );
 
             -- Metadata table
@@ -213,9 +413,12 @@ class DatabaseBuilder:
                 ('schema_version', '2'),
                 ('db_version', '2'),
                 ('build_date', datetime('now')),
-                ('source', 'pokemontcg.io + tcgdex');
+                ('source', 'pokemontcg.io + tcgdex'),
+                ('fts_detail', '{self.fts_detail}');
         """)
 
+        cursor.executescript(SET_STATE_SCHEMA)
+
         self.conn.commit()
         print(f"  Created database: {self.output_path}")
         print("  Schema version: 2 (species-normalized)")
@@ -223,7 +426,9 @@ class DatabaseBuilder:
     def fetch_species(self) -> List[Species]:
         """Fetch all Pokémon species from PokéAPI"""
         # Fetch Pokémon (National Dex 1-1025)
-        species_list = self.species_fetcher.fetch_all_species(max_id=1025)
+        species_list = self.species_fetcher.fetch_all_species(
+            max_id=1025, concurrency=self.species_concurrency
+        )
 
         # Add manual entries for common trainers/energy
         # These will be mapped later if cards reference them
@@ -252,221 +457,508 @@ class DatabaseBuilder:
         print(f"  Inserted {len(species_list)} species")
 
     def generate_aliases(self, species_list: List[Species]):
-        """Generate and insert all searchable aliases"""
-        cursor = self.conn.cursor()
-        alias_count = 0
+        """Generate all searchable aliases, dedupe them in memory and bulk-insert them"""
+        # Romanize every Japanese name in one batch (each distinct name once)
+        romaji_stats = VariantStats()
+        romaji = self.romanizer.romanize_many(
+            (name_entry.name
+             for species in species_list
+             for name_entry in species.names
+             if name_entry.language == 'ja' and self._has_katakana(name_entry.name)),
+            romaji_stats
+        )
+
+        # (species_id, alias_normalized, language) -> row; ja and ja-Hrkt (both
+        # 'ja') often repeat a spelling, as do romaji of those duplicate names
+        aliases: Dict[Tuple[str, str, str], Tuple] = {}
+        generated = 0
+
+        def add(species_id: str, alias: str, normalized: str, language: str, is_canonical: bool):
+            nonlocal generated
+            generated += 1
+            key = (species_id, normalized, language)
+            existing = aliases.get(key)
+            if existing is None:
+                aliases[key] = (species_id, alias, normalized, language, is_canonical)
+            elif is_canonical and not existing[4]:
+                aliases[key] = existing[:4] + (True,)
 
         for species in species_list:
-            # Insert official names from PokéAPI
+            # Official names from PokéAPI
             for name_entry in species.names:
-                # Insert original name
-                cursor.execute("""
-                    INSERT INTO species_aliases (species_id, alias, alias_normalized, language, is_canonical)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    species.species_id,
-                    name_entry.name,
-                    self._normalize_text(name_entry.name),
-                    name_entry.language,
-                    name_entry.is_canonical
-                ))
-                alias_count += 1
-
-                # Generate romaji variants for Japanese names
-                if name_entry.language == 'ja' and self._has_katakana(name_entry.name):
-                    romaji_variants = self.romanizer.romanize_with_variants(name_entry.name)
-
-                    for variant in romaji_variants:
-                        cursor.execute("""
-                            INSERT INTO species_aliases (species_id, alias, alias_normalized, language, is_canonical)
-                            VALUES (?, ?, ?, ?, ?)
-                        """, (
-                            species.species_id,
-                            variant,
-                            variant.lower(),
-                            'ja-Latn',  # Japanese romanization
-                            False
-                        ))
-                        alias_count += 1
+                add(species.species_id, name_entry.name, self._normalize_text(name_entry.name),
+                    name_entry.language, name_entry.is_canonical)
 
-        self.conn.commit()
-        self.stats['alias_count'] = alias_count
-        print(f"  Generated {alias_count} searchable aliases")
-
-    def fetch_cards(self) -> List[Dict]:
-        """Fetch all cards from PokemonTCG.io and TCGdex"""
-        all_cards = []
-
-        # Fetch English cards from PokemonTCG.io
-        print("\n  Fetching from PokemonTCG.io (English)...")
-        pokemontcg_cards = self._fetch_pokemontcg_cards()
-        all_cards.extend(pokemontcg_cards)
-        print(f"    Fetched {len(pokemontcg_cards)} English cards")
-
-        # Fetch Japanese and Chinese cards from TCGdex
-        print("\n  Fetching from TCGdex (Japanese, Chinese)...")
-        tcgdex_cards = self._fetch_tcgdex_cards()
-        all_cards.extend(tcgdex_cards)
-        print(f"    Fetched {len(tcgdex_cards)} non-English cards")
+                # Romaji variants for Japanese names
+                if name_entry.name in romaji and name_entry.language == 'ja':
+                    for variant in romaji[name_entry.name]:
+                        add(species.species_id, variant, variant.lower(),
+                            'ja-Latn',  # Japanese romanization
+                            False)
 
-        print(f"\n  Total cards fetched: {len(all_cards)}")
-        return all_cards
+        alias_count = write_rows(self.conn, """
+            INSERT INTO species_aliases (species_id, alias, alias_normalized, language, is_canonical)
+            VALUES (?, ?, ?, ?, ?)
+        """, list(aliases.values()), self.batch_size, self.ingest)
 
-    def _fetch_pokemontcg_cards(self) -> List[Dict]:
-        """Fetch cards from PokemonTCG.io API"""
+        self.stats['alias_count'] = alias_count
+        print(f"  Generated {alias_count} searchable aliases "
+              f"({generated - len(aliases)} duplicates dropped)")
+        print(f"  Romaji: {romaji_stats.summary()}")
+
+    def stream_pages(self, pages: Iterable[CardPage], mapper: SpeciesMapper,
+                     replace_mappings: bool = False):
+        """
+        Run fetch → map → insert as a pipeline with bounded queues between
+        the stages. Fetching and species mapping run on background threads
+        (mapping fans out to the process pool when there is one); every page
+        is written and committed on this thread as soon as it arrives, so
+        memory stays flat and finished pages survive a crash.
+        """
+        fetched = bounded_stage(pages, PIPELINE_DEPTH, name='fetch')
+        mapped = bounded_stage(self._map_pages(fetched, mapper), PIPELINE_DEPTH, name='map')
+
+        for page in mapped:
+            self.write_page(page, replace_mappings)
+            print(f"    {page.label}: {len(page.cards)} printings, "
+                  f"{len(page.mappings)} mappings")
+
+    def _iter_pokemontcg_pages(self, done_pages: Iterable[str] = ()) -> Iterator[CardPage]:
+        """
+        Fetch stage: yield PokemonTCG.io card pages as they are downloaded
+
+        Args:
+            done_pages: Page numbers already journaled by an interrupted build
+        """
+        done_pages = set(done_pages)
         headers = {}
         if self.api_key:
             headers['X-Api-Key'] = self.api_key
 
-        cards = []
         page = 1
         page_size = 250
 
         while True:
+            if str(page) in done_pages:
+                page += 1
+                continue
+
             url = f"{POKEMONTCG_BASE_URL}/cards?page={page}&pageSize={page_size}"
 
             try:
-                response = requests.get(url, headers=headers, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-
-                page_cards = data.get('data', [])
-                if not page_cards:
-                    break
-
-                for card in page_cards:
-                    cards.append({
-                        'id': card['id'],
-                        'name': card['name'],
-                        'set_id': card['set']['id'],
-                        'set_name': card['set']['name'],
-                        'card_number': card['number'],
-                        'language': 'en',  # PokemonTCG.io is English only
-                        'image_url_small': card['images'].get('small'),
-                        'rarity': card.get('rarity'),
-                        'source': 'pokemontcg'
-                    })
-
-                page += 1
-                time.sleep(0.1)  # Rate limiting
-
+                data = self.http.get_json(url, headers=headers)
             except Exception as e:
                 print(f"      Warning: Failed page {page}: {e}")
+                self._incomplete += 1
                 break
 
-        return cards
+            page_cards = data.get('data', [])
+            if not page_cards:
+                self._pokemontcg_complete = True
+                break
 
-    def _fetch_tcgdex_cards(self) -> List[Dict]:
-        """Fetch cards from TCGdex API (Japanese, Chinese, etc.)"""
-        cards = []
-        languages = ['ja', 'zh-tw']  # Japanese and Traditional Chinese
+            yield CardPage(
+                f"en page {page}",
+                [self._pokemontcg_card_dict(card) for card in page_cards],
+                checkpoint=('pokemontcg', 'en', str(page))
+            )
 
-        for lang in languages:
-            lang_url = f"{TCGDEX_BASE_URL}/{lang}/sets"
+            page += 1
+
+    def _plan_tcgdex_jobs(self, previous_state: Optional[Dict[str, Dict[str, SetSnapshot]]] = None) -> List[TCGdexSetJob]:
+        """
+        List TCGdex sets to download (Japanese and Traditional Chinese).
+
+        With previous_state (incremental mode) sets that vanished from the
+        source are deleted here, on the writer thread.
+        """
+        languages = ['ja', 'zh-tw']
+
+        # All languages are downloaded at once under one per-host cap
+        jobs_by_language = self.tcgdex.plan_jobs(languages)
+        if previous_state is not None:
+            self._remove_vanished_tcgdex_sets(jobs_by_language, previous_state)
+        elif self.checkpoint is not None:
+            for language, jobs in jobs_by_language.items():
+                done_sets = self.checkpoint.completed('tcgdex', language)
+                if done_sets:
+                    print(f"    Resuming: {len(done_sets)} {language} sets already done")
+                jobs_by_language[language] = [job for job in jobs if job.set_id not in done_sets]
+        return TCGdexScheduler.interleave(jobs_by_language)
+
+    def _iter_tcgdex_pages(self, jobs: List[TCGdexSetJob],
+                           previous_state: Optional[Dict[str, Dict[str, SetSnapshot]]] = None) -> Iterator[CardPage]:
+        """
+        Fetch stage: yield one page per downloaded TCGdex set.
+
+        With previous_state (incremental mode) sets whose card list
+        fingerprint is unchanged are skipped.
+        """
+        for outcome in self.tcgdex.iter_set_details(jobs):
+            job = outcome.item
+            if not outcome.ok:
+                print(f"      Warning: Failed {job.language} set {job.set_id}: {outcome.error}")
+                self._incomplete += 1
+                continue
 
-            try:
-                response = requests.get(lang_url, timeout=30)
-                response.raise_for_status()
-                sets = response.json()
-
-                for set_data in sets:
-                    set_id = set_data.get('id')
-                    if not set_id:
-                        continue
-
-                    # Fetch cards for this set
-                    set_url = f"{TCGDEX_BASE_URL}/{lang}/sets/{set_id}"
-                    set_response = requests.get(set_url, timeout=30)
-                    set_response.raise_for_status()
-                    set_details = set_response.json()
-
-                    for card in set_details.get('cards', []):
-                        cards.append({
-                            'id': f"{card['id']}-{lang}",
-                            'name': card.get('name', ''),
-                            'set_id': set_id,
-                            'set_name': set_details.get('name', ''),
-                            'card_number': card.get('localId', ''),
-                            'language': lang,
-                            'image_url_small': card.get('image', {}).get('small'),
-                            'rarity': card.get('rarity'),
-                            'source': 'tcgdex'
-                        })
-
-                    time.sleep(0.2)  # Rate limiting
+            set_details = outcome.result or {}
+            set_cards = set_details.get('cards', [])
+            snapshot = SetSnapshot(
+                'tcgdex', job.language, job.set_id, job.set_name,
+                release_date=set_details.get('releaseDate'),
+                card_count=job.card_count,
+                fingerprint=fingerprint(set_cards)
+            )
 
-            except Exception as e:
-                print(f"      Warning: Failed to fetch {lang} cards: {e}")
-                continue
+            if previous_state is not None:
+                previous = previous_state.get(job.language, {}).get(job.set_id)
+                if previous is not None and previous.fingerprint == snapshot.fingerprint:
+                    continue
+
+            yield CardPage(
+                f"{job.language} set {job.set_id}",
+                [self._tcgdex_card_dict(card, job, set_details) for card in set_cards],
+                snapshot=snapshot,
+                prune=previous_state is not None,
+                checkpoint=('tcgdex', job.language, job.set_id)
+            )
 
-        return cards
+    def _remove_vanished_tcgdex_sets(self, jobs_by_language: Dict[str, List[TCGdexSetJob]],
+                                     previous_state: Dict[str, Dict[str, SetSnapshot]]):
+        """Delete printings of TCGdex sets the source no longer lists"""
+        for language, jobs in jobs_by_language.items():
+            current = [SetSnapshot('tcgdex', language, job.set_id, job.set_name) for job in jobs]
+            diff = diff_sets(current, previous_state.get(language, {}))
+            print(f"    {language} sets: {diff.summary()}")
+
+            for set_id in diff.removed:
+                removed = self.sets.remove('printing_rows', set_id, language)
+                forget_set_state(self.conn, 'tcgdex', language, set_id)
+                print(f"    Removed {language} set {set_id}: {removed} printings")
+        self.conn.commit()
 
-    def insert_printings(self, cards: List[Dict]):
-        """Insert card printings into database"""
-        cursor = self.conn.cursor()
+    @staticmethod
+    def _pokemontcg_card_dict(card: Dict) -> Dict:
+        """Printing row for a PokemonTCG.io card"""
+        return {
+            'id': card['id'],
+            'name': card['name'],
+            'set': SetInfo.from_pokemontcg(card['set']),
+            'card_number': card['number'],
+            'language': 'en',  # PokemonTCG.io is English only
+            'image_url_small': card['images'].get('small'),
+            'rarity': card.get('rarity'),
+            'source': 'pokemontcg'
+        }
 
-        for card in cards:
-            cursor.execute("""
-                INSERT OR REPLACE INTO printings (
-                    printing_id, set_id, set_name, card_number, language,
-                    image_url_small, rarity, source
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                card['id'],
-                card['set_id'],
-                card['set_name'],
-                card['card_number'],
-                card['language'],
-                card.get('image_url_small'),
-                card.get('rarity'),
-                card['source']
-            ))
+    @staticmethod
+    def _tcgdex_card_dict(card: Dict, job: TCGdexSetJob, set_details: Dict) -> Dict:
+        """Printing row for a card from a TCGdex set payload"""
+        image_base = card.get('image')
+        return {
+            'id': f"{card['id']}-{job.language}",
+            'name': card.get('name', ''),
+            'set': SetInfo.from_tcgdex(set_details, job.language, set_id=job.set_id),
+            'card_number': card.get('localId', ''),
+            'language': job.language,
+            'image_url_small': f"{image_base}{TCGDEX_SMALL_IMAGE}" if image_base else None,
+            'rarity': card.get('rarity'),
+            'source': 'tcgdex'
+        }
+
+    def _start_mapping_pool(self, mapper: SpeciesMapper) -> Optional[MappingPool]:
+        """Process pool for the map stage, or None to map on the pipeline thread"""
+        workers = self.map_workers if self.map_workers > 0 else default_workers()
+        if workers <= 1:
+            print("  Species mapping: 1 process")
+            return None
+        print(f"  Species mapping: {workers} worker processes")
+        return MappingPool(mapper, workers)
+
+    def _map_pages(self, pages: Iterable[CardPage], mapper: SpeciesMapper) -> Iterator[CardPage]:
+        """Map stage: resolve species per page, in page order"""
+        if self.mapping_pool is None:
+            for page in pages:
+                yield self._apply_mappings(page, [
+                    mapper.map_card_to_species(card['id'], card['name']) for card in page.cards
+                ])
+            return
+
+        # Only (id, name) pairs cross the process boundary; pages wait here
+        in_flight: deque = deque()
+
+        def chunks() -> Iterator[List[Tuple[str, str]]]:
+            for page in pages:
+                in_flight.append(page)
+                yield [(card['id'], card['name']) for card in page.cards]
+
+        for outcome in self.mapping_pool.imap(chunks()):
+            page = in_flight.popleft()
+            if not outcome.ok:
+                raise outcome.error
+            yield self._apply_mappings(page, outcome.result)
+
+    @staticmethod
+    def _apply_mappings(page: CardPage, mappings: List[CardSpeciesMapping]) -> CardPage:
+        """Attach each printing's species links and variant to its page"""
+        for card, mapping in zip(page.cards, mappings):
+            card['variant'] = mapping.variant
+            if not mapping.species_ids:
+                page.unmapped += 1
+                continue
+            for species_id, is_primary in zip(mapping.species_ids, mapping.is_primary):
+                page.mappings.append((card['id'], species_id, is_primary))
+        return page
+
+    def _printing_row(self, card: Dict) -> Tuple:
+        """UPSERT_PRINTING_SQL parameters for a printing dict (set and image URL are registered here)"""
+        return (
+            card['id'],
+            self.sets.key(card['set']),
+            card['card_number'],
+            card['language'],
+            *self.images.encode(card.get('image_url_small'), card['card_number']),
+            card.get('rarity'),
+            card.get('variant'),
+            card['source']
+        )
+
+    def insert_printings(self, cards: List[Dict]) -> int:
+        """Insert (or update changed) card printings in executemany batches"""
+        rows = to_rows(cards, self._printing_row, self.ingest,
+                       describe=lambda card: card.get('id', 'unknown'))
+        return write_rows(self.conn, UPSERT_PRINTING_SQL, rows, self.batch_size, self.ingest,
+                          sort_by_key=True)
+
+    def write_page(self, page: CardPage, replace_mappings: bool = False):
+        """
+        Insert stage: upsert a page's printings and species mappings, prune
+        printings its set no longer has, record its set state and commit
+
+        Args:
+            page: Mapped page from the pipeline
+            replace_mappings: Drop previous mappings of these printings first (incremental)
+        """
+        self.stats['printing_count'] += self.insert_printings(page.cards)
+
+        printing_ids = [card['id'] for card in page.cards]
+        if replace_mappings:
+            self.conn.execute(
+                "DELETE FROM printing_species_map WHERE printing_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(printing_ids),)
+            )
+        self.stats['mapping_count'] += write_rows(
+            self.conn,
+            "INSERT OR REPLACE INTO printing_species_map (printing_id, species_id, is_primary) VALUES (?, ?, ?)",
+            page.mappings, self.batch_size, sort_by_key=True
+        )
+        self.stats['unmapped_count'] += page.unmapped
+
+        if page.snapshot is not None:
+            if page.prune:
+                delete_vanished_rows(
+                    self.conn, 'printing_rows', 'printing_id', printing_ids,
+                    set_key=self.sets.lookup(page.snapshot.set_id, page.snapshot.language),
+                    source=page.snapshot.source
+                )
+            record_set_state(self.conn, page.snapshot)
+
+        if self.checkpoint is not None and page.checkpoint is not None:
+            source, language, unit = page.checkpoint
+            self.checkpoint.mark(source, unit, language)
 
         self.conn.commit()
-        self.stats['printing_count'] = len(cards)
-        print(f"  Inserted {len(cards)} printings")
 
-    def map_printings_to_species(self, cards: List[Dict], species_list: List[Species]):
-        """Map card printings to species using name matching"""
-        # Build species name dictionary for mapper
-        species_dict = {}
-        for species in species_list:
-            all_names = [name.name for name in species.names]
-            species_dict[species.species_id] = all_names
+    def record_pokemontcg_baseline(self):
+        """Record English sets after a complete full fetch so --incremental can diff later"""
+        if not self._pokemontcg_complete:
+            print("  Warning: English fetch incomplete; not recording its set state for --incremental")
+            return
 
-        # Create mapper
+        try:
+            for snapshot in fetch_pokemontcg_set_snapshots(self.http, POKEMONTCG_BASE_URL, self.api_key):
+                record_set_state(self.conn, snapshot)
+        except Exception as e:
+            print(f"  Warning: could not record set state for incremental builds: {e}")
+        self.conn.commit()
+
+    @staticmethod
+    def _species_dict(species_list: List[Species]) -> Dict[str, List[str]]:
+        """Species ID -> every official name, as SpeciesMapper expects"""
+        return {
+            species.species_id: [name.name for name in species.names]
+            for species in species_list
+        }
+
+    def _species_dict_from_database(self) -> Dict[str, List[str]]:
+        """Rebuild the mapper's species dictionary from stored official aliases"""
+        species_dict: Dict[str, List[str]] = {}
+        for species_id, alias in self.conn.execute(
+            "SELECT species_id, alias FROM species_aliases WHERE language != 'ja-Latn' ORDER BY alias_id"
+        ):
+            species_dict.setdefault(species_id, []).append(alias)
+        return species_dict
+
+    def build_incremental(self):
+        """
+        Refresh an existing database in place: only new or changed sets are
+        fetched and upserted, vanished printings are deleted and the FTS
+        index is kept current by triggers. Species and aliases are kept as is.
+        """
+        print(f"\n[Incremental] Refreshing {self.output_path}")
+        # Schema first: the FTS triggers are defined on printing_rows and sets
+        self._ensure_printing_variant()
+        self._upgrade_printing_schema()
+        self._ensure_printing_triggers()
+        self._ensure_unique_aliases()
+        self.sets = SetRegistry(self.conn)
+        self.images = UrlTemplates(self.conn)
+        create_indexes(self.conn, V2_INDEXES)
+
+        species_dict = self._species_dict_from_database()
+        if not species_dict:
+            print("  Warning: no species aliases in the database; run a full build first")
         mapper = SpeciesMapper(species_dict)
+        self.mapping_pool = self._start_mapping_pool(mapper)
 
-        # Map all cards
-        cursor = self.conn.cursor()
-        mapped_count = 0
-        unmapped_count = 0
+        print("\n[Phase 1/2] Refreshing PokemonTCG.io sets (English)...")
+        diff = self._plan_pokemontcg_refresh()
+        self.stream_pages(self._iter_pokemontcg_sets(diff.to_fetch), mapper, replace_mappings=True)
+
+        print("\n[Phase 2/2] Refreshing TCGdex sets (Japanese, Chinese)...")
+        previous_state = {
+            language: load_set_state(self.conn, 'tcgdex', language)
+            for language in ('ja', 'zh-tw')
+        }
+        jobs = self._plan_tcgdex_jobs(previous_state)
+        self.stream_pages(self._iter_tcgdex_pages(jobs, previous_state), mapper, replace_mappings=True)
 
-        for card in cards:
-            mapping = mapper.map_card_to_species(
-                card['id'],
-                card['name']
+        orphans = self.conn.execute("""
+            DELETE FROM printing_species_map
+            WHERE printing_id NOT IN (SELECT printing_id FROM printing_rows)
+        """).rowcount
+        print(f"\n  Refreshed {self.stats['printing_count']:,} printings, "
+              f"dropped {orphans} mappings of removed printings")
+
+        self.stats['species_count'] = self.conn.execute("SELECT COUNT(*) FROM species").fetchone()[0]
+        self.stats['alias_count'] = self.conn.execute("SELECT COUNT(*) FROM species_aliases").fetchone()[0]
+
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('build_date', datetime('now'))")
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+        finalize_for_shipping(self.conn)
+
+        self.print_summary()
+
+    def _plan_pokemontcg_refresh(self) -> SetDiff:
+        """Diff English sets against set_state and delete sets that vanished"""
+        previous = load_set_state(self.conn, 'pokemontcg', 'en')
+        diff = diff_sets(
+            fetch_pokemontcg_set_snapshots(self.http, POKEMONTCG_BASE_URL, self.api_key),
+            previous
+        )
+        print(f"    Sets: {diff.summary()}")
+
+        for set_id in diff.removed:
+            removed = self.sets.remove('printing_rows', set_id, 'en')
+            forget_set_state(self.conn, 'pokemontcg', 'en', set_id)
+            print(f"    Removed set {set_id}: {removed} printings")
+        self.conn.commit()
+
+        return diff
+
+    def _iter_pokemontcg_sets(self, snapshots: List[SetSnapshot]) -> Iterator[CardPage]:
+        """Fetch stage: yield every card of each new or changed English set"""
+        for snapshot in snapshots:
+            try:
+                cards = fetch_pokemontcg_set_cards(
+                    self.http, POKEMONTCG_BASE_URL, snapshot.set_id, self.api_key
+                )
+            except Exception as e:
+                # State is not recorded, so the set is retried on the next run
+                print(f"      Warning: Failed set {snapshot.set_id}: {e}")
+                continue
+
+            yield CardPage(
+                f"en set {snapshot.set_id}",
+                [self._pokemontcg_card_dict(card) for card in cards],
+                snapshot=snapshot,
+                prune=True
             )
 
-            if mapping.species_ids:
-                # Insert mappings
-                for i, species_id in enumerate(mapping.species_ids):
-                    cursor.execute("""
-                        INSERT INTO printing_species_map (printing_id, species_id, is_primary)
-                        VALUES (?, ?, ?)
-                    """, (
-                        card['id'],
-                        species_id,
-                        mapping.is_primary[i]
-                    ))
-                    mapped_count += 1
-            else:
-                unmapped_count += 1
+    def _ensure_printing_variant(self):
+        """Add printings.variant to databases built before it existed"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(printings)")}
+        if 'variant' in columns:
+            return
+
+        print("  Adding printings.variant (filled as sets are refreshed)")
+        self.conn.execute("ALTER TABLE printings ADD COLUMN variant TEXT")
+        self.conn.commit()
 
+    def _upgrade_printing_schema(self):
+        """Move databases built before the sets and url_templates tables onto them"""
+        if has_table(self.conn, 'printing_rows'):
+            if adopt_url_templates(self.conn, 'printing_rows', 'printing_id',
+                                   view='printings', view_schema=PRINTINGS_VIEW_SCHEMA):
+                print("  Moved printing image URLs onto URL templates")
+            return
+
+        adopt_url_templates(self.conn, 'printings', 'printing_id')
+        if not adopt_set_keys(self.conn, 'printings', 'printing_rows', PRINTING_ROWS_SCHEMA,
+                              PRINTINGS_VIEW_SCHEMA, 't.language', 't.source'):
+            return
+
+        print("  Moved printings onto set keys and URL templates (printings view)")
+        # The old table's triggers went with it: _ensure_printing_triggers adds
+        # them back with one FTS rebuild (a full build adds them in finalize_database)
+        self.conn.commit()
+
+    def _ensure_unique_aliases(self):
+        """
+        Drop the duplicate aliases older builds stored (ja and ja-Hrkt spellings),
+        so idx_species_aliases_unique can be built over the rest
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_species_aliases_unique'"
+        ).fetchone()
+        if exists:
+            return
+
+        self.conn.execute("DROP INDEX IF EXISTS idx_species_aliases_norm")
+        # The surviving row (lowest alias_id) is canonical if any duplicate was
+        self.conn.execute("""
+            UPDATE species_aliases SET is_canonical = 1
+            WHERE alias_id IN (
+                SELECT MIN(alias_id) FROM species_aliases
+                GROUP BY species_id, alias_normalized, language
+                HAVING COUNT(*) > 1 AND MAX(is_canonical)
+            )
+        """)
+        removed = self.conn.execute("""
+            DELETE FROM species_aliases
+            WHERE alias_id NOT IN (
+                SELECT MIN(alias_id) FROM species_aliases
+                GROUP BY species_id, alias_normalized, language
+            )
+        """).rowcount
+        if removed:
+            print(f"  Dropped {removed:,} duplicate aliases (one-time species_aliases_fts rebuild)")
+            self.conn.execute("INSERT INTO species_aliases_fts(species_aliases_fts) VALUES('rebuild')")
+        self.conn.commit()
+
+    def _ensure_printing_triggers(self):
+        """Add the printings FTS triggers to databases built before they existed"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'printings_au'"
+        ).fetchone()
+        if exists:
+            return
+
+        print("  Adding printings FTS triggers (one-time FTS rebuild)")
+        self.conn.execute("INSERT INTO printings_fts(printings_fts) VALUES('rebuild')")
+        self.conn.executescript(PRINTINGS_FTS_TRIGGERS)
         self.conn.commit()
-        self.stats['mapping_count'] = mapped_count
-        print(f"  Created {mapped_count} card→species mappings")
-        print(f"  Unmapped cards (trainers/energy): {unmapped_count}")
 
     def finalize_database(self):
         """Optimize and finalize the database"""
@@ -474,18 +966,40 @@ class DatabaseBuilder:
 
         cursor = self.conn.cursor()
 
+        # Secondary indexes over the loaded tables, one sort each
+        print("  Building indexes...")
+        index_time = create_indexes(self.conn, V2_INDEXES)
+
         # Rebuild FTS5 indexes
         print("  Rebuilding FTS5 indexes...")
-        cursor.execute("INSERT INTO species_aliases_fts(species_aliases_fts) VALUES('rebuild')")
-        cursor.execute("INSERT INTO printings_fts(printings_fts) VALUES('rebuild')")
+        for fts_table in ('species_aliases_fts', 'printings_fts'):
+            start = time.perf_counter()
+            cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES('rebuild')")
+            elapsed = time.perf_counter() - start
+            index_time += elapsed
+            print(f"  {fts_table}: {elapsed:.2f}s")
+        print(f"  Indexes and FTS built in {index_time:.2f}s")
+        set_rank(self.conn, 'species_aliases_fts', SPECIES_ALIASES_FTS_WEIGHTS)
+        aliases = [row[0] for row in self.conn.execute("SELECT alias FROM species_aliases")]
+        for line in compare_prefix_index(self.conn, 'species_aliases_fts', aliases).summary():
+            print(f"  {line}")
+
+        # Keep printings_fts current for later --incremental refreshes
+        cursor.executescript(PRINTINGS_FTS_TRIGGERS)
+
+        # Drop the checkpoint journal once nothing is left to resume
+        if self.checkpoint is not None:
+            if self._incomplete:
+                print(f"  {self._incomplete} pages/sets failed; rerun with --resume to fetch only those")
+            else:
+                self.checkpoint.clear()
 
-        # Optimize database
-        print("  Optimizing database...")
-        cursor.execute("VACUUM")
         cursor.execute("ANALYZE")
 
-        self.conn.commit()
-        print("  Database optimized")
+        # Switch to the shipped configuration (rollback journal, compact pages)
+        print("  Optimizing database...")
+        ship_time = finalize_for_shipping(self.conn)
+        print(f"  Finalized for shipping in {ship_time:.2f}s")
 
     def print_summary(self):
         """Print build summary"""
@@ -502,12 +1016,32 @@ class DatabaseBuilder:
         print(f"  Printings: {self.stats['printing_count']:,}")
         print(f"  Mappings: {self.stats['mapping_count']:,}")
         print(f"\nBuild Time: {elapsed:.1f} seconds")
+        print(f"Ingest: {self.ingest.summary()}")
+        print(f"HTTP: {self.http.stats.summary()}")
+        print(f"Rate limits: {self.http.rate_limits.summary()}")
+        peak_rss = self._peak_rss_mb()
+        if peak_rss is not None:
+            print(f"Peak RSS: {peak_rss:.1f} MB")
 
         # Database size
         db_size = Path(self.output_path).stat().st_size / (1024 * 1024)
         print(f"Database Size: {db_size:.1f} MB")
+        for table, pages, size in page_usage(self.conn):
+            print(f"  {table}: {pages:,} pages ({size / 1024:,.0f} KB)")
+        print(f"  {url_stats(self.conn, 'printing_rows', 'printings').summary()}")
         print("=" * 70)
 
+    @staticmethod
+    def _peak_rss_mb() -> Optional[float]:
+        """Peak resident memory of this process (None where unsupported)"""
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
     @staticmethod
     def _normalize_text(text: str) -> str:
         """Normalize text for searching"""
@@ -533,9 +1067,93 @@ def main():
         help='PokemonTCG.io API key (optional, increases rate limit)'
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        '--http-cache',
+        type=Path,
+        default=None,
+        metavar='DIR',
+        help='Cache API responses in DIR and revalidate them with ETag/If-Modified-Since'
+    )
+    parser.add_argument(
+        '--http-cache-size-mb',
+        type=int,
+        default=512,
+        help='Size cap for --http-cache before LRU eviction (default: 512)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Refresh an existing --out database: only new or changed sets are fetched'
+    )
+    parser.add_argument(
+        '--max-rate',
+        type=float,
+        default=DEFAULT_MAX_RATE,
+        help=f'PokemonTCG.io requests/sec ceiling; backs off on 429/503 and '
+             f'honors Retry-After (default: {DEFAULT_MAX_RATE:g}, 0 = uncapped)'
+    )
+    parser.add_argument(
+        '--rate-log',
+        type=Path,
+        default=None,
+        metavar='FILE',
+        help='Append rate limiter decisions (backoffs, give-ups) to FILE as JSON lines'
+    )
+    parser.add_argument(
+        '--species-concurrency',
+        type=int,
+        default=SpeciesFetcher.DEFAULT_CONCURRENCY,
+        help=f'Uncached PokéAPI species requests kept in flight; the PokéAPI rate '
+             f'limit still applies (default: {SpeciesFetcher.DEFAULT_CONCURRENCY}, 1 = sequential)'
+    )
+    parser.add_argument(
+        '--map-workers',
+        type=int,
+        default=0,
+        help='Processes mapping card names to species (default: 0 = one per core, 1 = no pool)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted build of --out from its checkpoint journal'
+    )
+    parser.add_argument(
+        '--profile',
+        choices=sorted(PROFILES),
+        default=DEFAULT_PROFILE,
+        help='SQLite settings while building: safe (WAL) or bulk (no fsyncs, exclusive lock; '
+             'faster, but a crashed build may not be resumable). Output is always finalized '
+             f'for the app bundle (default: {DEFAULT_PROFILE})'
+    )
+    parser.add_argument(
+        '--fts-detail',
+        choices=FTS_DETAIL_LEVELS,
+        default=DEFAULT_FTS_DETAIL,
+        help='FTS5 detail level: full, or column/none for smaller indexes without phrase '
+             f'queries (prefix and AND queries still work) (default: {DEFAULT_FTS_DETAIL})'
+    )
+    parser.add_argument(
+        '--ingest-batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Rows per executemany batch (default: {DEFAULT_BATCH_SIZE}; 1 = row-at-a-time)'
+    )
 
-    builder = DatabaseBuilder(args.out, args.api_key)
+    args = parser.parse_args()
+    if args.resume and args.incremental:
+        parser.error('--resume continues an interrupted full build; --incremental runs can simply be rerun')
+
+    http_cache = None
+    if args.http_cache:
+        http_cache = HttpCache(args.http_cache, max_bytes=args.http_cache_size_mb * 1024 * 1024)
+
+    builder = DatabaseBuilder(
+        args.out, args.api_key, http_cache,
+        incremental=args.incremental, batch_size=args.ingest_batch_size,
+        resume=args.resume, max_rate=args.max_rate, rate_log=args.rate_log,
+        species_concurrency=args.species_concurrency, map_workers=args.map_workers,
+        profile=args.profile, fts_detail=args.fts_detail
+    )
     builder.build()
 
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Journal - Resumable builds for the database builders
+Records completed pages, sets and build phases per source and language in a
+`build_checkpoint` table inside the output database, so a build that was
+interrupted (crash, CI preemption, pages that failed twice) can continue
+with `--resume` instead of starting over. The table is dropped once a build
+finishes cleanly
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Optional, Set
+
+from db_profiles import DEFAULT_PROFILE, apply_profile
+
+
+CHECKPOINT_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS build_checkpoint (
+        source TEXT NOT NULL,
+        language TEXT NOT NULL DEFAULT '',
+        unit TEXT NOT NULL,
+        detail TEXT,
+        completed_at INTEGER DEFAULT (strftime('%s', 'now')),
+        PRIMARY KEY (source, language, unit)
+    );
+"""
+
+# Pseudo-sources for build phases and run settings
+PHASE = "phase"
+SETTING = "setting"
+
+
+class Checkpoint:
+    """Completed-work journal stored alongside the data it describes"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.conn.executescript(CHECKPOINT_SCHEMA)
+
+    def completed(self, source: str, language: str = "") -> Set[str]:
+        """Units (page numbers, set IDs, phase names) already finished"""
+        rows = self.conn.execute(
+            "SELECT unit FROM build_checkpoint WHERE source = ? AND language = ?",
+            (source, language)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def is_done(self, source: str, unit: str, language: str = "") -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM build_checkpoint WHERE source = ? AND language = ? AND unit = ?",
+            (source, language, unit)
+        ).fetchone() is not None
+
+    def mark(self, source: str, unit: str, language: str = "", detail: Optional[str] = None):
+        """Record a unit as finished (caller commits, ideally with the unit's rows)"""
+        self.conn.execute("""
+            INSERT OR REPLACE INTO build_checkpoint (source, language, unit, detail, completed_at)
+            VALUES (?, ?, ?, ?, strftime('%s', 'now'))
+        """, (source, language, str(unit), detail))
+
+    def setting(self, key: str, value: str) -> str:
+        """
+        Pin a run setting (e.g. page size) on first use and return the pinned
+        value, so a resumed build addresses the same pages as the original
+        """
+        row = self.conn.execute(
+            "SELECT detail FROM build_checkpoint WHERE source = ? AND language = '' AND unit = ?",
+            (SETTING, key)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        self.mark(SETTING, key, detail=value)
+        self.conn.commit()
+        return value
+
+    def count(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM build_checkpoint WHERE source != ?", (SETTING,)
+        ).fetchone()[0]
+
+    def clear(self):
+        """Drop the journal after a clean build so it isn't shipped with the data"""
+        self.conn.execute("DROP TABLE IF EXISTS build_checkpoint")
+        self.conn.commit()
+
+
+def open_for_resume(db_path: str, profile: str = DEFAULT_PROFILE) -> Optional[sqlite3.Connection]:
+    """
+    Reopen an interrupted build's output (None if there is nothing to resume)
+
+    A database without a checkpoint table either finished cleanly or predates
+    checkpoints; neither can be resumed safely. Nor can one that fails an
+    integrity check, as a crashed `--profile bulk` build may.
+    """
+    if not Path(db_path).exists():
+        return None
+
+    conn = sqlite3.connect(db_path)
+    try:
+        has_journal = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'build_checkpoint'"
+        ).fetchone()
+        intact = has_journal and conn.execute("PRAGMA quick_check").fetchone()[0] == 'ok'
+    except sqlite3.DatabaseError:
+        intact = False
+    if not intact:
+        conn.close()
+        return None
+
+    apply_profile(conn, profile)
+    return conn
+
+
+def main():
+    """Simulate an interrupted build and its resume on an in-memory database"""
+    conn = sqlite3.connect(":memory:")
+    checkpoint = Checkpoint(conn)
+    page_size = int(checkpoint.setting("page_size", "250"))
+
+    for page in range(1, 4):
+        checkpoint.mark("pokemontcg", str(page), language="en")
+    conn.commit()
+    print(f"Interrupted after {checkpoint.count()} pages (page size {page_size})")
+
+    resumed = Checkpoint(conn)
+    pending = [p for p in range(1, 8) if str(p) not in resumed.completed("pokemontcg", "en")]
+    print(f"Resume fetches pages {pending} (page size {resumed.setting('page_size', '100')})")
+
+    resumed.clear()
+    print("Journal dropped after a clean finish")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Concurrent Fetch - Bounded-concurrency helpers for the database builders
+Keeps N network requests in flight on a thread pool while the caller's
+thread consumes results, so SQLite writes stay on a single connection, and
+chains generator stages through bounded queues for streaming pipelines
+"""
+
+import queue
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Generic, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class FetchOutcome(Generic[T, R]):
+    """Result of one fetch job (exactly one of result/error is meaningful)"""
+    item: T
+    result: Optional[R] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def bounded_imap(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    concurrency: int = 4,
+    executor: Optional[Executor] = None,
+) -> Iterator[FetchOutcome[T, R]]:
+    """
+    Run func over items with at most `concurrency` calls in flight.
+
+    Results are yielded in submission order, so the consumer sees pages in
+    the same order a sequential loop would. Exceptions are captured per item
+    instead of aborting the whole run.
+
+    Args:
+        func: Function executed on a worker thread for each item
+        items: Work items (consumed lazily)
+        concurrency: Maximum number of in-flight calls
+        executor: Run on this pool (e.g. a process pool) instead of a private
+            thread pool; the caller owns it and shuts it down
+
+    Yields:
+        FetchOutcome for each item
+    """
+    concurrency = max(1, concurrency)
+    pending: Deque[Tuple[T, Future]] = deque()
+    item_iter = iter(items)
+
+    with _borrowed(executor) if executor else ThreadPoolExecutor(max_workers=concurrency) as pool:
+        def submit_next() -> bool:
+            try:
+                item = next(item_iter)
+            except StopIteration:
+                return False
+            pending.append((item, pool.submit(func, item)))
+            return True
+
+        for _ in range(concurrency):
+            if not submit_next():
+                break
+
+        while pending:
+            item, future = pending.popleft()
+            try:
+                outcome: FetchOutcome[T, R] = FetchOutcome(item, result=future.result())
+            except Exception as e:
+                outcome = FetchOutcome(item, error=e)
+
+            # Refill the window before handing control back to the consumer
+            submit_next()
+            yield outcome
+
+
+@contextmanager
+def _borrowed(executor: Executor) -> Iterator[Executor]:
+    """Use a caller-owned executor without shutting it down afterwards"""
+    yield executor
+
+
+_STAGE_DONE = object()
+
+
+def bounded_stage(items: Iterable[T], depth: int = 4, name: str = "stage") -> Iterator[T]:
+    """
+    Drain an iterable on a background thread into a queue of at most `depth`.
+
+    The producer blocks once `depth` items are waiting, so a fast fetch stage
+    can run ahead of a slow writer by a bounded amount and memory stays flat.
+    An exception raised by the producer is re-raised in the consumer. If the
+    consumer stops early, the producer is released at its next put.
+
+    Args:
+        items: Upstream iterable (e.g. a page generator)
+        depth: Maximum number of items buffered between the stages
+        name: Thread name, for debugging
+
+    Yields:
+        Items of `items`, in order
+    """
+    buffer: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, depth))
+    stopped = threading.Event()
+
+    def put(value: Any) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_STAGE_DONE)
+        except BaseException as e:
+            put(e)
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            value = buffer.get()
+            if value is _STAGE_DONE:
+                break
+            if isinstance(value, BaseException):
+                raise value
+            yield value
+    finally:
+        stopped.set()
+        thread.join(timeout=1)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+DB Profiles - Build-time SQLite pragma profiles for the database builders
+`safe` keeps the crash-safe WAL journal that --resume relies on; `bulk`
+trades durability for load speed (in-memory rollback journal, no fsyncs,
+exclusive lock, large page cache and mmap). Either way finalize_for_shipping
+rewrites the output as one self-contained rollback-journal file, ready to
+bundle into CardShowPro/Resources; page_usage() reports what each table
+costs in it
+"""
+
+import sqlite3
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+SAFE = "safe"
+BULK = "bulk"
+
+PROFILES: Dict[str, Tuple[str, ...]] = {
+    SAFE: (
+        "journal_mode=WAL",
+        "synchronous=NORMAL",
+        "temp_store=MEMORY",
+        "cache_size=-64000",
+    ),
+    # journal_mode=MEMORY rather than OFF: write_rows rolls back a failing
+    # batch's savepoint, which needs a rollback journal. A crash mid-build can
+    # still leave the file damaged, so bulk output is rebuilt, not resumed
+    BULK: (
+        "journal_mode=MEMORY",
+        "synchronous=OFF",
+        "locking_mode=EXCLUSIVE",
+        "temp_store=MEMORY",
+        "cache_size=-262144",
+        "mmap_size=268435456",
+    ),
+}
+
+DEFAULT_PROFILE = SAFE
+
+# Page size of the bundled file (matches the iOS filesystem block size)
+SHIP_PAGE_SIZE = 4096
+
+
+def apply_profile(conn: sqlite3.Connection, profile: str = DEFAULT_PROFILE):
+    """Set the profile's pragmas on a build connection"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile {profile!r} (expected one of {', '.join(PROFILES)})")
+    conn.executescript("".join(f"PRAGMA {pragma};\n" for pragma in PROFILES[profile]))
+
+
+def finalize_for_shipping(conn: sqlite3.Connection, page_size: int = SHIP_PAGE_SIZE) -> float:
+    """
+    Switch a finished build to the configuration the app opens it with
+
+    Leaves WAL (whose -wal/-shm files a read-only bundle can't carry) for the
+    DELETE rollback journal, drops the exclusive lock and rewrites the file at
+    page_size with VACUUM, which also packs it.
+
+    Returns:
+        Seconds spent, VACUUM included
+    """
+    start = time.perf_counter()
+    conn.commit()
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("PRAGMA locking_mode=NORMAL")
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.execute(f"PRAGMA page_size={int(page_size)}")
+    conn.execute("VACUUM")
+    return time.perf_counter() - start
+
+
+def page_usage(conn: sqlite3.Connection) -> List[Tuple[str, int, int]]:
+    """
+    (table, pages, bytes) per table, largest first, from the dbstat table
+
+    Indexes count toward their table and FTS5 shadow tables (`_data`, `_idx`,
+    `_docsize`, `_config`, `_content`) toward their FTS table. Empty if this
+    SQLite was built without dbstat.
+    """
+    try:
+        stats = conn.execute("SELECT name, COUNT(*), SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+    except sqlite3.OperationalError:
+        return []
+
+    schema = conn.execute("SELECT name, tbl_name, sql FROM sqlite_master").fetchall()
+    owners = {name: table for name, table, _ in schema}
+    for name, _, sql in schema:
+        if sql and 'USING FTS5' in sql.upper():
+            for shadow in ('data', 'idx', 'docsize', 'config', 'content'):
+                owners[f"{name}_{shadow}"] = name
+
+    totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for name, pages, size in stats:
+        total = totals[owners.get(name, name)]
+        total[0] += pages
+        total[1] += size
+    return sorted(((table, pages, size) for table, (pages, size) in totals.items()),
+                  key=lambda usage: (-usage[2], usage[0]))
+
+
+def main():
+    """Load the same rows under each profile, then finalize, and compare timings"""
+    import random
+    import string
+    import tempfile
+    from pathlib import Path
+
+    from batch_ingest import IngestStats, write_rows
+
+    random.seed(3)
+    rows = [
+        (f"card-{i}", ''.join(random.choices(string.ascii_lowercase, k=12)), random.randint(1, 300))
+        for i in range(200_000)
+    ]
+    random.shuffle(rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in PROFILES:
+            path = Path(tmp) / f"{profile}.db"
+            conn = sqlite3.connect(path)
+            apply_profile(conn, profile)
+            conn.execute("CREATE TABLE cards (id TEXT PRIMARY KEY, name TEXT, number INTEGER)")
+            stats = IngestStats()
+            for offset in range(0, len(rows), 250):  # one commit per API page
+                write_rows(conn, "INSERT INTO cards VALUES (?, ?, ?)", rows[offset:offset + 250], stats=stats)
+                conn.commit()
+            ship_time = finalize_for_shipping(conn)
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            usage = ", ".join(f"{table} {pages} pages" for table, pages, _ in page_usage(conn))
+            conn.close()
+            sidecars = [p.name for p in Path(tmp).glob(f"{profile}.db-*")]
+            print(f"{profile}: {stats.summary()}; finalized in {ship_time:.2f}s "
+                  f"(journal_mode={mode}, sidecar files: {sidecars or 'none'}; {usage})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+FTS Tuning - Prefix indexes, detail levels, bm25 weights and benchmarks
+The builders declare their FTS5 tables with PREFIX_OPTION so as-you-type
+queries ("pik"*) read a prefix index instead of walking every term that
+starts with the prefix, and with a detail level that trades phrase queries
+for a smaller index. Column weights are stored as each table's `rank` and
+mirrored in `meta`, and compare_prefix_index() measures 1-4 character
+prefix queries with and without the prefix index against its size
+"""
+
+import re
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence
+
+# Prefix lengths with their own index; 1-character prefixes match too much
+# of the vocabulary to be worth one
+PREFIX_LENGTHS = (2, 3, 4)
+PREFIX_OPTION = f"prefix='{' '.join(map(str, PREFIX_LENGTHS))}'"
+
+# FTS5 detail levels: `full` stores token positions (phrase and NEAR queries),
+# `column` only which columns hold a token (column filters still work),
+# `none` only which rows do. Prefix and AND queries work at every level
+FTS_DETAIL_LEVELS = ("full", "column", "none")
+DEFAULT_FTS_DETAIL = "full"
+
+BENCHMARK_LENGTHS = (1, 2, 3, 4)
+BENCHMARK_PREFIXES = 25  # most common prefixes timed per length
+BENCHMARK_LIMIT = 20  # rows an as-you-type query shows
+
+WORD_PATTERN = re.compile(r'\w+')
+PREFIX_OPTION_PATTERN = re.compile(r",?\s*prefix\s*=\s*'[^']*'", re.IGNORECASE)
+
+
+def prefix_query(prefix: str) -> str:
+    """FTS5 MATCH string for names containing a word starting with prefix"""
+    return '"' + prefix.replace('"', '""') + '"*'
+
+
+def fts_options(detail: str = DEFAULT_FTS_DETAIL, prefix: bool = True) -> str:
+    """Detail (and prefix index) options for a builder's unicode61 FTS5 table"""
+    if detail not in FTS_DETAIL_LEVELS:
+        raise ValueError(f"Unknown FTS detail {detail!r} (expected one of {', '.join(FTS_DETAIL_LEVELS)})")
+    return f"{PREFIX_OPTION}, detail={detail}" if prefix else f"detail={detail}"
+
+
+def set_rank(conn: sqlite3.Connection, table: str, weights: Sequence[float]):
+    """
+    Persist bm25 column weights as the table's default rank and in meta
+
+    `ORDER BY rank` on the table then uses them; meta's `<table>_rank` holds
+    the same expression for clients that call bm25() explicitly.
+    """
+    rank = f"bm25({', '.join(f'{w:.1f}' for w in weights)})"
+    conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('rank', ?)", (rank,))
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"{table}_rank", rank))
+    conn.commit()
+
+
+def index_bytes(conn: sqlite3.Connection, table: str) -> int:
+    """Bytes of index data an FTS5 table stores (its %_data shadow table)"""
+    return conn.execute(f"SELECT COALESCE(SUM(LENGTH(block)), 0) FROM {table}_data").fetchone()[0]
+
+
+def sample_prefixes(texts: Iterable[str], length: int, limit: int = BENCHMARK_PREFIXES) -> List[str]:
+    """The most common word prefixes of a given length (ties in first-seen order)"""
+    counts = Counter(
+        word[:length]
+        for text in texts
+        for word in WORD_PATTERN.findall(text.lower())
+        if len(word) >= length
+    )
+    return [prefix for prefix, _ in counts.most_common(limit)]
+
+
+def time_prefix_queries(conn: sqlite3.Connection, table: str, prefixes: Sequence[str],
+                        ranked: bool = False) -> float:
+    """Mean milliseconds of a limited prefix query (ranked: ORDER BY rank first)"""
+    if not prefixes:
+        return 0.0
+    order = "ORDER BY rank " if ranked else ""
+    sql = f"SELECT rowid FROM {table} WHERE {table} MATCH ? {order}LIMIT {BENCHMARK_LIMIT}"
+    start = time.perf_counter()
+    for prefix in prefixes:
+        conn.execute(sql, (prefix_query(prefix),)).fetchall()
+    return (time.perf_counter() - start) * 1000 / len(prefixes)
+
+
+@dataclass
+class PrefixBenchmark:
+    """Prefix-query latency and index size with and without the prefix index"""
+    table: str
+    bytes_without: int = 0
+    bytes_with: int = 0
+    ms_without: Dict[int, float] = field(default_factory=dict)
+    ms_with: Dict[int, float] = field(default_factory=dict)
+    # ORDER BY rank scores every match, so ranked queries gain less
+    ranked_without: Dict[int, float] = field(default_factory=dict)
+    ranked_with: Dict[int, float] = field(default_factory=dict)
+
+    def summary(self) -> List[str]:
+        growth = self.bytes_with / self.bytes_without if self.bytes_without else 0.0
+        lines = [f"{self.table}: index {self.bytes_without / 1024:,.0f} KB -> "
+                 f"{self.bytes_with / 1024:,.0f} KB ({growth:.2f}x) with {PREFIX_OPTION}"]
+        for length in self.ms_with:
+            lines.append(f"  {length}-char prefix: {self.ms_without[length]:.2f}ms -> "
+                         f"{self.ms_with[length]:.2f}ms (ranked {self.ranked_without[length]:.2f}ms -> "
+                         f"{self.ranked_with[length]:.2f}ms)")
+        return lines
+
+
+def compare_prefix_index(conn: sqlite3.Connection, table: str, texts: Iterable[str]) -> PrefixBenchmark:
+    """
+    Time prefix queries on table and on a scratch copy without its prefix index
+
+    The copy is declared from the table's own CREATE statement minus the
+    prefix option, filled with 'rebuild' and dropped again, so the builder's
+    output is unchanged (VACUUM reclaims the space).
+
+    Args:
+        table: External-content FTS5 table declared with PREFIX_OPTION
+        texts: Sample of the indexed text, to draw common prefixes from
+    """
+    scratch = f"{table}_noprefix"
+    create_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    scratch_sql = PREFIX_OPTION_PATTERN.sub("", create_sql).replace(table, scratch, 1)
+
+    conn.execute(f"DROP TABLE IF EXISTS {scratch}")
+    conn.execute(scratch_sql)
+    conn.execute(f"INSERT INTO {scratch}({scratch}) VALUES ('rebuild')")
+    rank = conn.execute(f"SELECT v FROM {table}_config WHERE k = 'rank'").fetchone()
+    if rank:
+        conn.execute(f"INSERT INTO {scratch}({scratch}, rank) VALUES ('rank', ?)", rank)
+    conn.commit()  # FTS5 holds pending index data in memory until commit
+
+    texts = list(texts)
+    benchmark = PrefixBenchmark(table, index_bytes(conn, scratch), index_bytes(conn, table))
+    for length in BENCHMARK_LENGTHS:
+        prefixes = sample_prefixes(texts, length)
+        time_prefix_queries(conn, table, prefixes)  # warm the page cache
+        benchmark.ms_without[length] = time_prefix_queries(conn, scratch, prefixes)
+        benchmark.ms_with[length] = time_prefix_queries(conn, table, prefixes)
+        benchmark.ranked_without[length] = time_prefix_queries(conn, scratch, prefixes, ranked=True)
+        benchmark.ranked_with[length] = time_prefix_queries(conn, table, prefixes, ranked=True)
+
+    conn.execute(f"DROP TABLE {scratch}")
+    conn.commit()
+    return benchmark
+
+
+def main():
+    """Index a synthetic card catalog and compare prefix queries"""
+    import random
+    import string
+
+    random.seed(5)
+    syllables = [a + b for a in "bdgkmnprstz" for b in "aeiou"]
+    species = [''.join(random.choices(syllables, k=random.randint(2, 4))) for _ in range(1000)]
+    sets = [f"{random.choice(string.ascii_uppercase)}{''.join(random.choices(syllables, k=3))}" for _ in range(150)]
+
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(f"""
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE cards (name TEXT, set_name TEXT, card_number TEXT);
+        CREATE VIRTUAL TABLE cards_fts USING fts5(
+            name, set_name, card_number,
+            content='cards', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2', {PREFIX_OPTION}
+        );
+    """)
+    conn.executemany("INSERT INTO cards VALUES (?, ?, ?)", [
+        (f"{random.choice(species)} {random.choice(['', 'ex', 'V', 'GX'])}".strip(),
+         random.choice(sets), str(random.randint(1, 250)))
+        for _ in range(40000)
+    ])
+    conn.execute("INSERT INTO cards_fts(cards_fts) VALUES ('rebuild')")
+    set_rank(conn, "cards_fts", (10.0, 2.0, 1.0))
+
+    names = [row[0] for row in conn.execute("SELECT name FROM cards")]
+    for line in compare_prefix_index(conn, "cards_fts", names).summary():
+        print(line)
+    print(f"meta: {conn.execute('SELECT value FROM meta').fetchone()[0]}")
+
+
+if __name__ == "__main__":
+    main()
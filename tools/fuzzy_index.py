@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Index - Trigram postings for approximate species-name lookup
+Candidates sharing enough character trigrams with the query are pulled from
+an inverted index, then re-scored by edit similarity (difflib ratio), so
+typos and alternate romanizations get ranked matches with real scores
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+@dataclass(frozen=True)
+class FuzzyCandidate:
+    """One approximate match: the alias hit, its value and a 0.0-1.0 score"""
+    value: str
+    alias: str
+    score: float
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of text, padded so short names still produce some"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Edit similarity of two strings (difflib ratio, 1.0 = identical)"""
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+class TrigramIndex:
+    """Inverted trigram index over aliases (first value for an alias wins)"""
+
+    # Query trigram overlap (Dice) a candidate needs before it is re-scored
+    MIN_OVERLAP = 0.3
+    # Candidates re-scored per query, best overlap first
+    RESCORE_LIMIT = 25
+
+    def __init__(self, aliases: Iterable[Tuple[str, str]]):
+        """
+        Args:
+            aliases: (alias, value) pairs, already normalized
+        """
+        self._aliases: List[Tuple[str, str]] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        seen = set()
+        for alias, value in aliases:
+            if not alias or alias in seen:
+                continue
+            seen.add(alias)
+            alias_id = len(self._aliases)
+            grams = trigrams(alias)
+            self._aliases.append((alias, value))
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(alias_id)
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def query(self, text: str, limit: int = 5, min_score: float = 0.0) -> List[FuzzyCandidate]:
+        """
+        Aliases most similar to text, best first.
+
+        Args:
+            text: Normalized name to look up
+            limit: Maximum candidates returned (one per value)
+            min_score: Drop candidates scoring below this
+
+        Returns:
+            Candidates ordered by score, then alias and value (deterministic)
+        """
+        grams = trigrams(text)
+        if not text or not grams:
+            return []
+
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        # Dice coefficient on trigram sets prunes to a few promising aliases
+        overlaps = []
+        for alias_id, count in shared.items():
+            dice = 2 * count / (len(grams) + self._sizes[alias_id])
+            if dice >= self.MIN_OVERLAP:
+                overlaps.append((-dice, alias_id))
+        overlaps.sort()
+
+        best: Dict[str, FuzzyCandidate] = {}
+        for _, alias_id in overlaps[:self.RESCORE_LIMIT]:
+            alias, value = self._aliases[alias_id]
+            score = similarity(text, alias)
+            if score >= min_score and (value not in best or score > best[value].score):
+                best[value] = FuzzyCandidate(value, alias, score)
+
+        ranked = sorted(best.values(), key=lambda c: (-c.score, c.alias, c.value))
+        return ranked[:limit]
+
+
+def main():
+    """Look up a few misspelled names in a small index"""
+    index = TrigramIndex([
+        ('charizard', 'charizard'), ('pikachu', 'pikachu'), ('pikachuu', 'pikachu'),
+        ('mewtwo', 'mewtwo'), ('myuutsuu', 'mewtwo'), ('rizaadon', 'charizard'),
+    ])
+    print(f"{len(index)} aliases")
+    for text in ['charzard', 'pickachu', 'myuutsu', 'rizadon', 'eevee']:
+        hits = index.query(text, limit=3)
+        print(f"{text!r}: " + ", ".join(f"{c.value} ({c.alias}, {c.score:.2f})" for c in hits))
+
+
+if __name__ == "__main__":
+    main()
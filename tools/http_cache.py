@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+HTTP Cache - On-disk response cache with conditional revalidation
+Stores response bodies content-addressed (sha256) plus their ETag /
+Last-Modified validators, revalidates with If-None-Match /
+If-Modified-Since so unchanged catalog pages come back as bodiless 304s,
+and evicts least-recently-used entries past a size cap
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".http_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+@dataclass
+class CachedResponse:
+    """A stored response body with its validators"""
+    url: str
+    body: bytes
+    body_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_type: Optional[str]
+    stored_at: float
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that turn a GET into a revalidation request"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Content-addressed response store with an LRU size cap"""
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 fresh_for: float = 0):
+        """
+        Args:
+            directory: Cache root (index.db + objects/)
+            max_bytes: Total body bytes kept before LRU eviction
+            fresh_for: Seconds an entry is served without revalidating (0 = always revalidate)
+        """
+        self.directory = Path(directory)
+        self.objects_dir = self.directory / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.directory / "index.db", check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS objects (
+                body_hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+            CREATE INDEX IF NOT EXISTS idx_entries_body_hash ON entries(body_hash);
+        """)
+        self._db.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        self._db.commit()
+
+    @staticmethod
+    def key_for(url: str, vary: Optional[str] = None) -> str:
+        """Cache key for a fully-qualified URL (plus anything the response varies on)"""
+        return hashlib.sha256(f"{url}\n{vary or ''}".encode('utf-8')).hexdigest()
+
+    def _object_path(self, body_hash: str) -> Path:
+        return self.objects_dir / body_hash[:2] / body_hash
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response for key (and mark it recently used)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, body_hash, etag, last_modified, content_type, stored_at "
+                "FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+
+            path = self._object_path(row[1])
+            try:
+                body = path.read_bytes()
+            except OSError:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+        return CachedResponse(row[0], body, row[1], row[2], row[3], row[4], row[5])
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """Whether entry can be served without revalidating"""
+        return self.fresh_for > 0 and time.time() - entry.stored_at < self.fresh_for
+
+    def store(self, key: str, url: str, body: bytes, etag: Optional[str] = None,
+              last_modified: Optional[str] = None, content_type: Optional[str] = None):
+        """Store a response body and its validators, then enforce the size cap"""
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(body_hash)
+
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix('.tmp')
+                tmp.write_bytes(body)
+                tmp.replace(path)
+
+            now = time.time()
+            self._db.execute(
+                "INSERT OR IGNORE INTO objects (body_hash, size) VALUES (?, ?)",
+                (body_hash, len(body))
+            )
+            self._db.execute("""
+                INSERT OR REPLACE INTO entries
+                (key, url, body_hash, etag, last_modified, content_type, stored_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (key, url, body_hash, etag, last_modified, content_type, now, now))
+            self._evict_locked()
+            self._db.commit()
+
+    def refresh(self, key: str):
+        """Reset an entry's freshness after a successful 304 revalidation"""
+        with self._lock:
+            now = time.time()
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, last_access = ? WHERE key = ?",
+                (now, now, key)
+            )
+            self._db.commit()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def _evict_locked(self):
+        """Drop least-recently-used entries until bodies fit in max_bytes"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, body_hash in self._db.execute(
+            "SELECT key, body_hash FROM entries ORDER BY last_access"
+        ).fetchall():
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+            # Bodies are shared between entries; only delete unreferenced ones
+            still_used = self._db.execute(
+                "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)
+            ).fetchone()
+            if not still_used:
+                size = self._db.execute(
+                    "SELECT size FROM objects WHERE body_hash = ?", (body_hash,)
+                ).fetchone()
+                self._db.execute("DELETE FROM objects WHERE body_hash = ?", (body_hash,))
+                self._object_path(body_hash).unlink(missing_ok=True)
+                total -= size[0] if size else 0
+
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+HTTP Client - Shared pooled session for all database-builder fetchers
+Keeps connections alive across requests, negotiates gzip (and brotli when
+the `brotli` package is installed), sizes connection pools per host,
+paces and retries every request through per-host adaptive rate limiters,
+counts connection reuse and bytes on the wire, and optionally revalidates
+responses against an on-disk HttpCache
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from http_cache import CachedResponse, HttpCache
+from rate_limiter import AdaptiveRateLimiter, HostRateLimits, parse_retry_after
+
+try:
+    import brotli  # noqa: F401 - urllib3 decodes 'br' when this is importable
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+Timeout = Union[float, Tuple[float, float]]
+
+DEFAULT_TIMEOUT: Tuple[float, float] = (10, 30)  # (connect, read) seconds
+DEFAULT_POOL_SIZE = 10
+USER_AGENT = "CardShowPro-DB-Builder/2"
+
+
+@dataclass
+class HttpStats:
+    """Connection and transfer counters for one client"""
+    requests: int = 0
+    connections_opened: int = 0
+    bytes_on_wire: int = 0
+    bytes_decoded: int = 0
+    cache_revalidated: int = 0
+    cache_fresh_hits: int = 0
+    cache_bytes_saved: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        return max(0, self.requests - self.connections_opened)
+
+    def summary(self) -> str:
+        ratio = self.bytes_decoded / self.bytes_on_wire if self.bytes_on_wire else 1.0
+        return (f"{self.requests:,} requests, {self.connections_opened:,} connections opened "
+                f"({self.connections_reused:,} reused), "
+                f"{self.bytes_on_wire / (1024 * 1024):.2f} MB on wire "
+                f"({self.bytes_decoded / (1024 * 1024):.2f} MB decoded, {ratio:.1f}x)"
+                + (f", cache: {self.cache_revalidated:,} not modified + "
+                   f"{self.cache_fresh_hits:,} fresh, "
+                   f"{self.cache_bytes_saved / (1024 * 1024):.2f} MB saved"
+                   if self.cache_revalidated or self.cache_fresh_hits else ""))
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report every new TCP/TLS connection"""
+
+    def __init__(self, on_new_connection, **kwargs):
+        self._on_new_connection = on_new_connection
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_new_connection = self._on_new_connection
+
+        class CountingHTTPPool(HTTPConnectionPool):
+            def _new_conn(self):
+                on_new_connection()
+                return super()._new_conn()
+
+        class CountingHTTPSPool(HTTPSConnectionPool):
+            def _new_conn(self):
+                on_new_connection()
+                return super()._new_conn()
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPPool,
+            'https': CountingHTTPSPool,
+        }
+
+
+class HttpClient:
+    """Thread-safe pooled HTTP client shared by the builders and SpeciesFetcher"""
+
+    def __init__(self, timeout: Timeout = DEFAULT_TIMEOUT,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 pool_sizes: Optional[Dict[str, int]] = None,
+                 cache: Optional[HttpCache] = None,
+                 rate_limits: Optional[HostRateLimits] = None):
+        """
+        Args:
+            timeout: Default timeout, seconds or (connect, read)
+            pool_size: Keep-alive connections kept per host by default
+            pool_sizes: Per-host overrides, e.g. {"api.tcgdex.net": 8}
+            cache: On-disk response cache used to revalidate GETs
+            rate_limits: Per-host pacing and retry policy (default: uncapped hosts,
+                backoff only when the server pushes back)
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limits = rate_limits or HostRateLimits()
+        self.stats = HttpStats()
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'User-Agent': USER_AGENT,
+        })
+        self._mount('http://', pool_size)
+        self._mount('https://', pool_size)
+        for host, size in (pool_sizes or {}).items():
+            self.set_pool_size(host, size)
+
+    def _mount(self, prefix: str, size: int):
+        self.session.mount(prefix, _CountingAdapter(
+            self._record_new_connection,
+            pool_connections=size,
+            pool_maxsize=size,
+            pool_block=True,
+        ))
+
+    def set_pool_size(self, host: str, size: int):
+        """Size the keep-alive pool for one host (e.g. to match its concurrency)"""
+        for scheme in ('https', 'http'):
+            self._mount(f"{scheme}://{host}/", max(1, size))
+
+    def _record_new_connection(self):
+        with self._lock:
+            self.stats.connections_opened += 1
+
+    def set_rate_limit(self, host: str, max_rate: float, min_rate: float = 0.5,
+                       capacity: Optional[float] = None):
+        """Cap a host at max_rate requests/sec (the limiter adapts below that)"""
+        self.rate_limits.configure(host, max_rate, min_rate, capacity)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[Timeout] = None) -> requests.Response:
+        """
+        GET a URL through the pooled session (body is fully read).
+
+        Every attempt is paced by the host's adaptive limiter. 429/5xx
+        responses and connection failures are retried with jittered
+        exponential backoff (or the server's Retry-After); once attempts run
+        out the last response is returned, or the last error re-raised.
+
+        With a cache attached, stored validators are sent as conditional
+        headers and a 304 is turned back into a 200 carrying the cached body;
+        such responses have `from_cache = True`.
+        """
+        host = urlparse(url).netloc
+        attempt = 0
+
+        while True:
+            self.rate_limits.acquire(host)
+            try:
+                response = self._get_once(url, params, headers, timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = self.rate_limits.record_throttle(host, attempt, error=type(e).__name__)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in AdaptiveRateLimiter.THROTTLE_STATUSES:
+                    self.rate_limits.record_success(host)
+                    return response
+                delay = self.rate_limits.record_throttle(
+                    host, attempt, status=response.status_code,
+                    retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                )
+                if delay is None:
+                    return response
+
+            time.sleep(delay)
+            attempt += 1
+
+    def _get_once(self, url: str, params: Optional[Dict[str, Any]],
+                  headers: Optional[Dict[str, str]],
+                  timeout: Optional[Timeout]) -> requests.Response:
+        """One GET attempt, including cache lookup and revalidation"""
+        cache_key = None
+        cached = None
+        request_headers = dict(headers or {})
+
+        if self.cache is not None:
+            full_url = requests.Request('GET', url, params=params).prepare().url
+            cache_key = HttpCache.key_for(full_url)
+            cached = self.cache.lookup(cache_key)
+            if cached and self.cache.is_fresh(cached):
+                with self._lock:
+                    self.stats.cache_fresh_hits += 1
+                    self.stats.cache_bytes_saved += len(cached.body)
+                return self._cached_response(cached)
+            if cached:
+                request_headers.update(cached.conditional_headers())
+
+        response = self.session.get(
+            url,
+            params=params,
+            headers=request_headers,
+            timeout=timeout if timeout is not None else self.timeout,
+        )
+        decoded = len(response.content)
+
+        # urllib3 tracks raw (compressed) bytes read off the socket
+        try:
+            on_wire = response.raw.tell()
+        except Exception:
+            on_wire = decoded
+
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.bytes_decoded += decoded
+            self.stats.bytes_on_wire += on_wire or decoded
+
+        if cache_key is None:
+            return response
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(cache_key)
+            with self._lock:
+                self.stats.cache_revalidated += 1
+                self.stats.cache_bytes_saved += len(cached.body)
+            return self._cached_response(cached)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 200 and (etag or last_modified or self.cache.fresh_for > 0):
+            self.cache.store(
+                cache_key, response.url, response.content,
+                etag, last_modified, response.headers.get('Content-Type')
+            )
+
+        response.from_cache = False
+        return response
+
+    @staticmethod
+    def _cached_response(cached: CachedResponse) -> requests.Response:
+        """Wrap a cached body in a Response so callers can't tell the difference"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = cached.url
+        response._content = cached.body
+        response.encoding = 'utf-8'
+        if cached.content_type:
+            response.headers['Content-Type'] = cached.content_type
+        if cached.etag:
+            response.headers['ETag'] = cached.etag
+        response.from_cache = True
+        return response
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                 headers: Optional[Dict[str, str]] = None,
+                 timeout: Optional[Timeout] = None,
+                 allow_404: bool = False) -> Optional[Any]:
+        """GET a URL and decode JSON (None for a 404 when allow_404 is set)"""
+        response = self.get(url, params=params, headers=headers, timeout=timeout)
+        if allow_404 and response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def close(self):
+        self.session.close()
+        self.rate_limits.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def shared_client() -> HttpClient:
+    """Process-wide client used when a fetcher isn't handed one explicitly"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
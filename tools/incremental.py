@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Incremental Builds - Delta refresh support shared by the database builders
+Records a per-set snapshot (release date, card count, fingerprint) in a
+`set_state` table so later `--incremental` runs can fetch only the sets that
+are new or changed, upsert their rows and delete cards that vanished
+"""
+
+import hashlib
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from db_profiles import DEFAULT_PROFILE, apply_profile
+from http_client import HttpClient
+
+
+SET_STATE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS set_state (
+        source TEXT NOT NULL,
+        language TEXT NOT NULL,
+        set_id TEXT NOT NULL,
+        set_name TEXT,
+        release_date TEXT,
+        card_count INTEGER,
+        fingerprint TEXT,
+        updated_at INTEGER DEFAULT (strftime('%s', 'now')),
+        PRIMARY KEY (source, language, set_id)
+    );
+"""
+
+
+@dataclass
+class SetSnapshot:
+    """What a set looked like at the source when it was last ingested"""
+    source: str
+    language: str
+    set_id: str
+    set_name: str = ""
+    release_date: Optional[str] = None
+    card_count: Optional[int] = None
+    fingerprint: Optional[str] = None
+
+    def differs_from(self, other: "SetSnapshot") -> bool:
+        """Whether any signal we have for both snapshots has changed"""
+        for mine, theirs in (
+            (self.release_date, other.release_date),
+            (self.card_count, other.card_count),
+            (self.fingerprint, other.fingerprint),
+        ):
+            if mine is not None and theirs is not None and mine != theirs:
+                return True
+        return False
+
+
+@dataclass
+class SetDiff:
+    """Sets to (re)fetch and sets that disappeared from the source"""
+    new: List[SetSnapshot] = field(default_factory=list)
+    changed: List[SetSnapshot] = field(default_factory=list)
+    unchanged: List[SetSnapshot] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def to_fetch(self) -> List[SetSnapshot]:
+        return self.new + self.changed
+
+    def summary(self) -> str:
+        return (f"{len(self.new)} new, {len(self.changed)} changed, "
+                f"{len(self.unchanged)} unchanged, {len(self.removed)} removed")
+
+
+def fingerprint(data: Any) -> str:
+    """Stable hash of a JSON-serializable payload"""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def open_existing_database(db_path: str, profile: str = DEFAULT_PROFILE) -> Optional[sqlite3.Connection]:
+    """Open an existing build output for an incremental refresh (None if missing)"""
+    path = Path(db_path)
+    if not path.exists():
+        return None
+
+    conn = sqlite3.connect(db_path)
+    apply_profile(conn, profile)
+    conn.executescript(SET_STATE_SCHEMA)
+    return conn
+
+
+def load_set_state(conn: sqlite3.Connection, source: str, language: str) -> Dict[str, SetSnapshot]:
+    """Snapshots recorded by the previous build, keyed by set_id"""
+    conn.executescript(SET_STATE_SCHEMA)
+    rows = conn.execute("""
+        SELECT set_id, set_name, release_date, card_count, fingerprint
+        FROM set_state WHERE source = ? AND language = ?
+    """, (source, language)).fetchall()
+
+    return {
+        row[0]: SetSnapshot(source, language, row[0], row[1] or "", row[2], row[3], row[4])
+        for row in rows
+    }
+
+
+def diff_sets(current: Iterable[SetSnapshot], previous: Dict[str, SetSnapshot]) -> SetDiff:
+    """Compare the source's current set list against the recorded state"""
+    diff = SetDiff()
+    seen = set()
+
+    for snapshot in current:
+        seen.add(snapshot.set_id)
+        old = previous.get(snapshot.set_id)
+        if old is None:
+            diff.new.append(snapshot)
+        elif snapshot.differs_from(old):
+            diff.changed.append(snapshot)
+        else:
+            diff.unchanged.append(snapshot)
+
+    diff.removed = sorted(set(previous) - seen)
+    return diff
+
+
+def record_set_state(conn: sqlite3.Connection, snapshot: SetSnapshot):
+    """Remember a set as ingested (caller commits)"""
+    conn.execute("""
+        INSERT INTO set_state (source, language, set_id, set_name, release_date, card_count, fingerprint, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, strftime('%s', 'now'))
+        ON CONFLICT(source, language, set_id) DO UPDATE SET
+            set_name = excluded.set_name,
+            release_date = excluded.release_date,
+            card_count = excluded.card_count,
+            fingerprint = excluded.fingerprint,
+            updated_at = excluded.updated_at
+    """, (snapshot.source, snapshot.language, snapshot.set_id, snapshot.set_name,
+          snapshot.release_date, snapshot.card_count, snapshot.fingerprint))
+
+
+def forget_set_state(conn: sqlite3.Connection, source: str, language: str, set_id: str):
+    """Drop a set that no longer exists at the source (caller commits)"""
+    conn.execute(
+        "DELETE FROM set_state WHERE source = ? AND language = ? AND set_id = ?",
+        (source, language, set_id)
+    )
+
+
+def delete_vanished_rows(conn: sqlite3.Connection, table: str, id_column: str,
+                         keep_ids: List[str], **filters: str) -> int:
+    """
+    Delete rows of one set that the source no longer returns.
+
+    Args:
+        table: Table to prune (e.g. "cards")
+        id_column: Primary key column (e.g. "id")
+        keep_ids: IDs the source returned for this set
+        filters: Column equality filters selecting the set (e.g. set_id=..., language=...)
+
+    Returns:
+        Number of rows deleted (delete triggers keep FTS in sync)
+    """
+    where = " AND ".join(f"{column} = ?" for column in filters)
+    cursor = conn.execute(
+        f"DELETE FROM {table} WHERE {where} "
+        f"AND {id_column} NOT IN (SELECT value FROM json_each(?))",
+        (*filters.values(), json.dumps(keep_ids))
+    )
+    return cursor.rowcount
+
+
+def fetch_pokemontcg_set_snapshots(client: HttpClient, base_url: str,
+                                   api_key: Optional[str] = None) -> List[SetSnapshot]:
+    """List PokemonTCG.io sets with their release date, size and last update"""
+    headers = {"X-Api-Key": api_key} if api_key else {}
+    snapshots = []
+    page = 1
+
+    while True:
+        data = client.get_json(
+            f"{base_url}/sets",
+            params={"page": page, "pageSize": 250, "orderBy": "releaseDate"},
+            headers=headers
+        )
+        sets = data.get("data", [])
+        for s in sets:
+            snapshots.append(SetSnapshot(
+                source="pokemontcg",
+                language="en",
+                set_id=s.get("id", ""),
+                set_name=s.get("name", ""),
+                release_date=s.get("releaseDate"),
+                card_count=s.get("total"),
+                fingerprint=s.get("updatedAt"),
+            ))
+
+        if not sets or len(snapshots) >= data.get("totalCount", 0):
+            break
+        page += 1
+
+    return snapshots
+
+
+def fetch_pokemontcg_set_cards(client: HttpClient, base_url: str, set_id: str,
+                               api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Fetch every card of one PokemonTCG.io set"""
+    headers = {"X-Api-Key": api_key} if api_key else {}
+    cards: List[Dict[str, Any]] = []
+    page = 1
+
+    while True:
+        data = client.get_json(
+            f"{base_url}/cards",
+            params={"q": f"set.id:{set_id}", "page": page, "pageSize": 250},
+            headers=headers
+        )
+        page_cards = data.get("data", [])
+        cards.extend(page_cards)
+
+        if not page_cards or len(cards) >= data.get("totalCount", 0):
+            break
+        page += 1
+
+    return cards
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Mock API Server - Local stand-in for PokemonTCG.io and TCGdex
+
+Serves recorded (or synthetic) API pages with configurable latency so the
+builders' fetch paths can be exercised and timed without hitting the real API.
+
+Usage:
+    # Record real pages once
+    python mock_api_server.py --record-from https://api.pokemontcg.io --recordings recorded/
+
+    # Serve them back with 300ms latency
+    python mock_api_server.py --recordings recorded/ --latency-ms 300
+
+    # Point a builder at it
+    python build_pokemon_db_multilang.py --pokemontcg-url http://127.0.0.1:8765/v2 \\
+        --concurrency 8 --skip-japanese --skip-chinese
+
+Without --recordings, pages are synthesized from --synthetic-cards fake cards
+(PokemonTCG.io), --synthetic-sets fake sets per language (TCGdex) and one fake
+species per National Dex number (PokéAPI, under /api/v2).
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import Request, urlopen
+
+
+class MockApiState:
+    """Configuration and counters shared by all request handlers"""
+
+    def __init__(self, latency_ms: int = 0, recordings: Optional[Path] = None,
+                 record_from: Optional[str] = None, synthetic_cards: int = 2000,
+                 synthetic_sets: int = 20, revision: int = 0,
+                 throttle_every: int = 0, retry_after: int = 1):
+        self.latency_ms = latency_ms
+        self.recordings = recordings
+        self.record_from = record_from.rstrip('/') if record_from else None
+        self.synthetic_cards = synthetic_cards
+        self.synthetic_sets = synthetic_sets
+        self.revision = revision
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.request_count = 0
+        self.throttled_count = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def enter(self) -> bool:
+        """Count a request in; returns True if it should be answered with 429"""
+        with self._lock:
+            self.request_count += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            throttle = self.throttle_every > 0 and self.request_count % self.throttle_every == 0
+            if throttle:
+                self.throttled_count += 1
+            return throttle
+
+    def leave(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    @staticmethod
+    def recording_key(path: str, query: Dict[str, list]) -> str:
+        """File name for a recorded response (path + sorted query)"""
+        flat = sorted((k, v[0]) for k, v in query.items())
+        raw = path.strip('/') + ('?' + urlencode(flat) if flat else '')
+        return re.sub(r'[^A-Za-z0-9._=-]+', '_', raw) + '.json'
+
+    def _synthetic_card(self, n: int) -> Dict[str, Any]:
+        set_no = n // 100 + 1
+        set_id = f"mock{set_no}"
+        number = str(n % 100 + 1)
+        # --revision renames the first set's cards to simulate an upstream edit
+        suffix = f" r{self.revision}" if self.revision and set_no == 1 else ""
+        return {
+            'id': f"{set_id}-{number}",
+            'name': f"Mock Pokemon {n}{suffix}",
+            'number': number,
+            'rarity': 'Common',
+            'set': {'id': set_id, 'name': f"Mock Set {set_no}"},
+            'images': {'small': f"https://images.pokemontcg.io/{set_id}/{number}.png"},
+        }
+
+    def synthetic_cards_page(self, query: Dict[str, list]) -> Dict[str, Any]:
+        """PokemonTCG.io-shaped /cards page built from fake cards (supports q=set.id:X)"""
+        page = int(query.get('page', ['1'])[0])
+        page_size = int(query.get('pageSize', ['250'])[0])
+
+        numbers = range(self.synthetic_cards)
+        set_filter = re.fullmatch(r'set\.id:mock(\d+)', query.get('q', [''])[0])
+        if set_filter:
+            set_no = int(set_filter.group(1))
+            numbers = range((set_no - 1) * 100, min(set_no * 100, self.synthetic_cards))
+
+        matching = list(numbers)
+        start = (page - 1) * page_size
+        cards = [self._synthetic_card(n) for n in matching[start:start + page_size]]
+
+        return {
+            'data': cards,
+            'page': page,
+            'pageSize': page_size,
+            'count': len(cards),
+            'totalCount': len(matching),
+        }
+
+    def synthetic_sets_page(self) -> Dict[str, Any]:
+        """PokemonTCG.io-shaped /sets listing for the fake cards"""
+        set_count = (self.synthetic_cards + 99) // 100
+        sets = []
+        for set_no in range(1, set_count + 1):
+            total = min(100, self.synthetic_cards - (set_no - 1) * 100)
+            sets.append({
+                'id': f"mock{set_no}",
+                'name': f"Mock Set {set_no}",
+                'series': 'Mock',
+                'total': total,
+                'printedTotal': total,
+                'releaseDate': f"2020/01/{set_no % 28 + 1:02d}",
+                'updatedAt': f"2024/01/01 00:00:{self.revision if set_no == 1 else 0:02d}",
+            })
+        return {'data': sets, 'page': 1, 'pageSize': 250, 'count': len(sets), 'totalCount': len(sets)}
+
+    def synthetic_tcgdex(self, language: str, set_id: Optional[str]) -> Optional[Any]:
+        """TCGdex-shaped set list or set detail"""
+        set_ids = [f"SV{n + 1}" for n in range(self.synthetic_sets)]
+        if set_id is None:
+            return [
+                {'id': s, 'name': f"Mock {language} Set {s}", 'cardCount': {'total': 50, 'official': 50}}
+                for s in set_ids
+            ]
+        if set_id not in set_ids:
+            return None
+
+        return {
+            'id': set_id,
+            'name': f"Mock {language} Set {set_id}",
+            'releaseDate': '2024-01-01',
+            'cards': [
+                {
+                    'id': f"{set_id}-{n:03d}",
+                    'localId': f"{n:03d}",
+                    'name': f"モックポケモン {set_id}-{n}",
+                    'image': f"https://assets.tcgdex.net/{language}/sv/{set_id}/{n:03d}",
+                }
+                for n in range(1, 51)
+            ],
+        }
+
+    @staticmethod
+    def synthetic_species(dex_number: int) -> Dict[str, Any]:
+        """PokéAPI-shaped pokemon-species entry"""
+        return {
+            'id': dex_number,
+            'name': f"mock-{dex_number}",
+            'names': [
+                {'language': {'name': 'en'}, 'name': f"Mock {dex_number}"},
+                {'language': {'name': 'ja-Hrkt'}, 'name': f"モック{dex_number}"},
+                {'language': {'name': 'zh-Hant'}, 'name': f"模擬{dex_number}"},
+            ],
+        }
+
+    def respond(self, path: str, query: Dict[str, list]) -> Tuple[int, Optional[bytes]]:
+        """Resolve a request to (status, body)"""
+        key = self.recording_key(path, query)
+
+        if self.recordings and (self.recordings / key).exists():
+            return 200, (self.recordings / key).read_bytes()
+
+        if self.record_from:
+            flat = {k: v[0] for k, v in query.items()}
+            url = f"{self.record_from}{path}" + (f"?{urlencode(flat)}" if flat else '')
+            with urlopen(Request(url, headers={'User-Agent': 'mock-api-recorder'}), timeout=60) as response:
+                body = response.read()
+            if self.recordings:
+                self.recordings.mkdir(parents=True, exist_ok=True)
+                (self.recordings / key).write_bytes(body)
+            return 200, body
+
+        if path.rstrip('/').endswith('/cards'):
+            return 200, json.dumps(self.synthetic_cards_page(query)).encode('utf-8')
+
+        if path.rstrip('/') == '/v2/sets':
+            return 200, json.dumps(self.synthetic_sets_page()).encode('utf-8')
+
+        species = re.fullmatch(r'/api/v2/pokemon-species/(\d+)/?', path)
+        if species:
+            return 200, json.dumps(self.synthetic_species(int(species.group(1))), ensure_ascii=False).encode('utf-8')
+
+        tcgdex = re.fullmatch(r'/v2/([a-z]{2}(?:-[a-z]{2})?)/sets(?:/([^/]+))?/?', path)
+        if tcgdex:
+            data = self.synthetic_tcgdex(tcgdex.group(1), tcgdex.group(2))
+            if data is not None:
+                return 200, json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+        return 404, None
+
+
+def make_handler(state: MockApiState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            throttle = state.enter()
+            try:
+                if state.latency_ms > 0:
+                    time.sleep(state.latency_ms / 1000)
+
+                if throttle:
+                    body = b'{"error": "rate limit exceeded"}'
+                    self.send_response(429)
+                    self.send_header('Retry-After', str(state.retry_after))
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                parsed = urlparse(self.path)
+                status, body = state.respond(parsed.path, parse_qs(parsed.query))
+                body = body or b'{"error": "not found"}'
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                self.send_response(status)
+                if status == 200:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'application/json')
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                state.leave()
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(state: MockApiState, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """Start the server on a background thread and return it (call .shutdown() to stop)"""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the card APIs')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument('--latency-ms', type=int, default=0,
+                        help='Artificial latency added to every response (default: 0)')
+    parser.add_argument('--recordings', type=Path, default=None,
+                        help='Directory of recorded responses to serve')
+    parser.add_argument('--record-from', default=None,
+                        help='Upstream base URL to proxy and record missing responses from')
+    parser.add_argument('--synthetic-cards', type=int, default=2000,
+                        help='Fake card count when no recording matches (default: 2000)')
+    parser.add_argument('--synthetic-sets', type=int, default=20,
+                        help='Fake TCGdex sets per language (default: 20)')
+    parser.add_argument('--revision', type=int, default=0,
+                        help='Bump to simulate an upstream edit of the first set (default: 0)')
+    parser.add_argument('--throttle-every', type=int, default=0,
+                        help='Answer every Nth request with 429 to exercise backoff (default: off)')
+    parser.add_argument('--retry-after', type=int, default=1,
+                        help='Retry-After seconds sent with throttled responses (default: 1)')
+
+    args = parser.parse_args()
+
+    state = MockApiState(args.latency_ms, args.recordings, args.record_from,
+                         args.synthetic_cards, args.synthetic_sets, args.revision,
+                         args.throttle_every, args.retry_after)
+    server = serve(state, args.host, args.port)
+    print(f"Mock API listening on http://{args.host}:{args.port} (latency {args.latency_ms}ms)")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\nServed {state.request_count} requests (max {state.max_in_flight} in flight, "
+              f"{state.throttled_count} throttled)")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
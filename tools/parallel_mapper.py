@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Parallel Mapper - Species mapping on a process pool
+Each worker receives the prebuilt SpeciesMapper once (pickled a single time
+in the parent) and maps chunks of (card_id, name) pairs; results come back
+in submission order so a single writer can insert them
+"""
+
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from concurrent_fetch import FetchOutcome, bounded_imap
+from species_mapper import CardSpeciesMapping, SpeciesMapper
+
+CardNames = List[Tuple[str, str]]  # (card_id, card_name)
+
+# The worker's mapper, installed by _init_worker
+_worker_mapper: Optional[SpeciesMapper] = None
+
+
+def _init_worker(mapper_blob: bytes):
+    global _worker_mapper
+    _worker_mapper = pickle.loads(mapper_blob)
+
+
+def _map_chunk(cards: CardNames) -> List[CardSpeciesMapping]:
+    """Map one chunk of cards with the worker's mapper"""
+    return [_worker_mapper.map_card_to_species(card_id, name) for card_id, name in cards]
+
+
+def default_workers() -> int:
+    """One worker per available core"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class MappingPool:
+    """Process pool whose workers each hold a read-only copy of one SpeciesMapper"""
+
+    def __init__(self, mapper: SpeciesMapper, workers: int = 0):
+        """
+        Args:
+            mapper: Prebuilt mapper (automaton and fuzzy index included)
+            workers: Worker processes (0 = one per core)
+        """
+        self.workers = workers if workers > 0 else default_workers()
+        # forkserver/spawn children start clean, so the builder's fetch and
+        # HTTP threads are never forked mid-flight
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(pickle.dumps(mapper, protocol=pickle.HIGHEST_PROTOCOL),)
+        )
+
+    def imap(self, chunks: Iterable[CardNames],
+             depth: Optional[int] = None) -> Iterator[FetchOutcome[CardNames, List[CardSpeciesMapping]]]:
+        """
+        Map chunks in parallel, yielding results in submission order
+
+        Args:
+            chunks: Lists of (card_id, card_name), e.g. one per fetched page
+            depth: Chunks in flight (default: two per worker)
+        """
+        return bounded_imap(_map_chunk, chunks, depth or self.workers * 2, executor=self._pool)
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "MappingPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    """Map a synthetic catalog serially and on the pool, and compare timings"""
+    import random
+    import string
+    import time
+
+    random.seed(7)
+    species_dict = {
+        f"species-{i}": [''.join(random.choices(string.ascii_lowercase, k=random.randint(5, 10)))
+                         for _ in range(8)]
+        for i in range(1000)
+    }
+    mapper = SpeciesMapper(species_dict)
+    aliases = [alias for names in species_dict.values() for alias in names]
+    chunks = [
+        [(f"{page}-{n}", random.choice(aliases)[:-1] + random.choice(['', ' V', ' ex', 'x GX']))
+         for n in range(250)]
+        for page in range(40)
+    ]
+
+    start = time.perf_counter()
+    serial = [[mapper.map_card_to_species(card_id, name) for card_id, name in chunk] for chunk in chunks]
+    print(f"Serial: {sum(map(len, serial)):,} cards in {time.perf_counter() - start:.2f}s")
+
+    with MappingPool(mapper) as pool:
+        start = time.perf_counter()
+        parallel = [outcome.result for outcome in pool.imap(chunks)]
+        print(f"{pool.workers} workers: {sum(map(len, parallel)):,} cards in "
+              f"{time.perf_counter() - start:.2f}s (includes worker start-up)")
+    print(f"Identical results: {serial == parallel}")
+
+
+if __name__ == "__main__":
+    main()
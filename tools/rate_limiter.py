@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - Shared request pacing for the database builders
+Token bucket that several fetch threads can draw from, so concurrent
+requests still respect a single requests-per-second budget, an adaptive
+variant that backs off when the server pushes back (429/503, Retry-After),
+and a per-host registry with the jittered exponential backoff policy and
+structured metrics used by every fetcher through HttpClient
+"""
+
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+
+def rate_from_delay_ms(delay_ms: int) -> float:
+    """Requests/sec equivalent of a fixed delay between requests (0 = uncapped)"""
+    return 1000.0 / delay_ms if delay_ms > 0 else 0.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket (rate tokens/sec, bursts up to capacity)"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second (<= 0 disables limiting)
+            capacity: Maximum burst size (default: 1 token)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else 1.0)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay_ms(cls, delay_ms: int, capacity: Optional[float] = None) -> "TokenBucket":
+        """Build a bucket equivalent to a fixed delay between requests"""
+        return cls(rate_from_delay_ms(delay_ms), capacity)
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available, then consume them (returns seconds waited)"""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    Token bucket whose rate adapts to server health (AIMD).
+
+    Successful responses raise the rate additively toward `max_rate`;
+    throttling or server errors (429/5xx) cut it multiplicatively, down to
+    `min_rate`. A Retry-After value pauses every caller until it expires.
+    A `max_rate` of 0 means no ceiling: requests are only paced while the
+    server is pushing back.
+    """
+
+    THROTTLE_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_rate: float, min_rate: float = 1.0,
+                 capacity: Optional[float] = None,
+                 increase_step: Optional[float] = None, decrease_factor: float = 0.5):
+        super().__init__(max_rate, capacity)
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate) if max_rate > 0 else min_rate
+        self.increase_step = increase_step if increase_step is not None else max(max_rate / 20, 0.1)
+        self.decrease_factor = decrease_factor
+        self.throttle_count = 0
+        self._paused_until = 0.0
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Wait out any Retry-After pause, then take tokens (returns seconds waited)"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                pause = self._paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            time.sleep(pause)
+            waited += pause
+        return waited + super().acquire(tokens)
+
+    def record_success(self):
+        """Nudge the rate back up after a healthy response"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.max_rate > 0:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+            elif self.rate > 0:
+                # Uncapped host: recover, then stop pacing altogether
+                self.rate += self.increase_step
+                if self.rate >= self.min_rate * 20:
+                    self.rate = 0.0
+
+    def record_throttle(self, retry_after: Optional[float] = None):
+        """Cut the rate after a 429/5xx response or connection failure"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            current = self.rate if self.rate > 0 else self.min_rate * 4
+            self.rate = max(self.min_rate, current * self.decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+            self.throttle_count += 1
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    def record_status(self, status_code: int):
+        """Feed back an HTTP status code"""
+        if status_code in self.THROTTLE_STATUSES:
+            self.record_throttle()
+        else:
+            self.record_success()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class BackoffPolicy:
+    """Retry schedule: jittered exponential backoff, or the server's Retry-After"""
+    max_attempts: int = 4
+    base: float = 0.5
+    cap: float = 30.0
+    max_retry_after: float = 300.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to sleep before retry number `attempt` (0-based)"""
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after) + random.uniform(0, self.base)
+        # "Equal jitter": half the exponential step is fixed, half random
+        step = min(self.cap, self.base * (2 ** attempt))
+        return step / 2 + random.uniform(0, step / 2)
+
+
+@dataclass
+class HostMetrics:
+    """What the limiter decided for one host"""
+    requests: int = 0
+    throttled: int = 0
+    retries: int = 0
+    gave_up: int = 0
+    wait_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+    rate: float = 0.0
+
+    def summary(self) -> str:
+        rate = f"{self.rate:.1f} req/s" if self.rate > 0 else "uncapped"
+        return (f"{self.requests:,} req, {self.throttled:,} throttled, {self.retries:,} retries, "
+                f"{self.gave_up:,} gave up, {self.wait_seconds:.1f}s paced, "
+                f"{self.backoff_seconds:.1f}s backoff, {rate}")
+
+
+@dataclass
+class HostLimit:
+    """Configured pacing for one host"""
+    max_rate: float
+    min_rate: float = 0.5
+    capacity: Optional[float] = None
+
+
+class HostRateLimits:
+    """
+    Per-host AdaptiveRateLimiters plus the backoff policy, shared by every
+    fetcher through HttpClient. Decisions (throttles, backoffs, give-ups)
+    are counted per host and, with a log file, written as JSON lines.
+    """
+
+    def __init__(self, default_max_rate: float = 0.0, backoff: Optional[BackoffPolicy] = None,
+                 log_path: Optional[Path] = None):
+        """
+        Args:
+            default_max_rate: Ceiling for hosts that weren't configured (0 = uncapped)
+            backoff: Retry policy for throttled or failed requests
+            log_path: Append one JSON object per limiter decision to this file
+        """
+        self.default = HostLimit(default_max_rate)
+        self.backoff = backoff or BackoffPolicy()
+        self.limits: Dict[str, HostLimit] = {}
+        self.metrics: Dict[str, HostMetrics] = {}
+        self._limiters: Dict[str, AdaptiveRateLimiter] = {}
+        self._lock = threading.Lock()
+        self._log: Optional[TextIO] = open(log_path, 'a', encoding='utf-8') if log_path else None
+
+    def configure(self, host: str, max_rate: float, min_rate: float = 0.5,
+                  capacity: Optional[float] = None):
+        """Set a host's requests/sec ceiling (0 = uncapped), floor and burst size"""
+        with self._lock:
+            self.limits[host] = HostLimit(max_rate, min_rate, capacity)
+            self._limiters.pop(host, None)
+
+    def limiter(self, host: str) -> AdaptiveRateLimiter:
+        with self._lock:
+            if host not in self._limiters:
+                limit = self.limits.get(host, self.default)
+                self._limiters[host] = AdaptiveRateLimiter(limit.max_rate, limit.min_rate, limit.capacity)
+                # Reconfiguring a host keeps the counters gathered so far
+                self.metrics.setdefault(host, HostMetrics()).rate = limit.max_rate
+            return self._limiters[host]
+
+    def acquire(self, host: str):
+        """Pace one request to host"""
+        waited = self.limiter(host).acquire()
+        with self._lock:
+            metrics = self.metrics[host]
+            metrics.requests += 1
+            metrics.wait_seconds += waited
+
+    def record_success(self, host: str):
+        limiter = self.limiter(host)
+        limiter.record_success()
+        with self._lock:
+            self.metrics[host].rate = limiter.rate
+
+    def record_throttle(self, host: str, attempt: int, status: Optional[int] = None,
+                        retry_after: Optional[float] = None, error: Optional[str] = None) -> Optional[float]:
+        """
+        Slow host down after a throttled/failed attempt.
+
+        Returns:
+            Seconds to back off before retrying, or None when attempts are exhausted
+        """
+        limiter = self.limiter(host)
+        limiter.record_throttle(retry_after)
+        retry = attempt + 1 < self.backoff.max_attempts
+        delay = self.backoff.delay(attempt, retry_after) if retry else None
+
+        with self._lock:
+            metrics = self.metrics[host]
+            metrics.throttled += 1
+            metrics.rate = limiter.rate
+            if retry:
+                metrics.retries += 1
+                metrics.backoff_seconds += delay
+            else:
+                metrics.gave_up += 1
+
+        reason = status or error
+        if retry:
+            print(f"  Backing off {host} for {delay:.1f}s after {reason} (attempt {attempt + 1})")
+        else:
+            print(f"  Giving up on {host} request after {reason} ({attempt + 1} attempts)")
+
+        self.log_event(
+            "backoff" if retry else "give_up", host,
+            attempt=attempt + 1, status=status, error=error,
+            retry_after=retry_after, delay=round(delay, 3) if delay is not None else None,
+            rate=round(limiter.rate, 3)
+        )
+        return delay
+
+    def log_event(self, event: str, host: str, **fields: Any):
+        """Write one structured decision record (no-op without a log file)"""
+        if self._log is None:
+            return
+        record = {"ts": round(time.time(), 3), "event": event, "host": host}
+        record.update({key: value for key, value in fields.items() if value is not None})
+        with self._lock:
+            self._log.write(json.dumps(record) + "\n")
+            self._log.flush()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Metrics per host as plain dicts (for JSON reports)"""
+        with self._lock:
+            return {host: asdict(metrics) for host, metrics in self.metrics.items()}
+
+    def summary(self) -> str:
+        with self._lock:
+            return "; ".join(f"{host}: {metrics.summary()}" for host, metrics in self.metrics.items())
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def main():
+    """Test the token bucket and the adaptive limiter's reaction to throttling"""
+    bucket = TokenBucket(rate=10, capacity=2)
+    start = time.monotonic()
+    for i in range(12):
+        bucket.acquire()
+        print(f"  token {i + 1:2d} at {time.monotonic() - start:.2f}s")
+
+    limits = HostRateLimits()
+    limits.configure("api.example.com", max_rate=20)
+    for attempt, (status, retry_after) in enumerate([(503, None), (429, 0.5), (429, None), (429, None)]):
+        delay = limits.record_throttle("api.example.com", attempt, status, retry_after)
+        print(f"  {status} (Retry-After {retry_after}) -> "
+              f"{'give up' if delay is None else f'back off {delay:.2f}s'}")
+    for _ in range(40):
+        limits.record_success("api.example.com")
+    print(f"  {limits.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,89 @@
 Romanization - Katakana to Romaji Conversion
 Converts Japanese katakana card names to searchable romaji variants
 Generates variants for common romanization ambiguities (r/l, long vowels, etc.)
+Conversion is table-driven: small tsu, digraphs and the long vowel mark are
+rewritten by precompiled regexes and every other kana by one str.translate,
+so no Python code runs per character; results are LRU-memoized
 """
 
-from typing import List, Set
+import heapq
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+ROMANIZE_CACHE_SIZE = 16384  # distinct names kept by the memoized entry points
+MAX_VARIANTS_PER_NAME = 8  # base spelling included
+MIN_VARIANT_SCORE = 0.05  # combinations less likely than this are never emitted
+
+SMALL_Y = ('ャ', 'ュ', 'ョ', 'ゃ', 'ゅ', 'ょ')
+LONG_VOWEL = 'ー'
+
+# Small tsu (geminate) with the character it doubles, if any
+GEMINATE_PATTERN = re.compile(r'[ッっ](?=(.?))', re.DOTALL)
+# Any character but small tsu / long vowel, followed by a small ya/yu/yo
+DIGRAPH_PATTERN = re.compile(r'[^ッっー][ャュョゃゅょ]', re.DOTALL)
+# Long vowel marks extending a vowel (marks after anything else are dropped)
+LONG_VOWEL_PATTERN = re.compile(r'([aeiou])(ー+)')
+
+
+def _digraph(base: str, small: str) -> str:
+    """Combine a syllable with a small ya/yu/yo (ki + ya -> kya)"""
+    return base[:-1] + small if base.endswith('i') else base + small
+
+
+def _geminate(match: "re.Match") -> str:
+    return Romanizer.KATAKANA_MAP.get(match.group(1), '')[:1]
+
+
+def _combine_digraph(match: "re.Match") -> str:
+    token = match.group()
+    romaji = Romanizer.TOKEN_TABLE.get(token)
+    if romaji is None:
+        # Not kana: keep the character, still combining the small y
+        romaji = _digraph(token[0].lower(), Romanizer.KATAKANA_MAP[token[1]])
+    return romaji
+
+
+def _extend_vowel(match: "re.Match") -> str:
+    return match.group(1) * (len(match.group(2)) + 1)
+
+
+def _build_token_table(katakana_map: Dict[str, str]) -> Dict[str, str]:
+    """Romaji for every single kana and every kana + small ya/yu/yo pair"""
+    table = dict(katakana_map)
+    for char, base in katakana_map.items():
+        for small in SMALL_Y:
+            table[char + small] = _digraph(base, katakana_map[small])
+    return table
+
+
+@dataclass(frozen=True)
+class RankedVariants:
+    """Variants of one name, most likely first"""
+    variants: Tuple[str, ...]
+    combined: int  # variants that needed two or more substitutions
+    capped: bool  # MAX_VARIANTS_PER_NAME cut off further likely variants
+
+
+@dataclass
+class VariantStats:
+    """Alias table growth from romaji variants"""
+    names: int = 0
+    variants: int = 0
+    combined: int = 0
+    capped: int = 0
+
+    def add(self, ranked: RankedVariants):
+        self.names += 1
+        self.variants += len(ranked.variants)
+        self.combined += ranked.combined
+        self.capped += ranked.capped
+
+    def summary(self) -> str:
+        per_name = self.variants / self.names if self.names else 0.0
+        return (f"{self.variants:,} variants for {self.names:,} names ({per_name:.1f}/name, "
+                f"{self.combined:,} combined, {self.capped:,} names capped at {MAX_VARIANTS_PER_NAME})")
 
 
 class Romanizer:
@@ -77,6 +157,39 @@ class Romanizer:
         'ぁ': 'a', 'ぃ': 'i', 'ぅ': 'u', 'ぇ': 'e', 'ぉ': 'o',
     }
 
+    # Kana and kana + small ya/yu/yo -> romaji, built once from KATAKANA_MAP
+    TOKEN_TABLE = _build_token_table(KATAKANA_MAP)
+    # str.translate table for single kana (small tsu and long vowel have their own passes)
+    TRANSLATE_TABLE = str.maketrans({
+        char: romaji for char, romaji in KATAKANA_MAP.items() if char not in ('ッ', LONG_VOWEL)
+    })
+
+    # Spelling substitutions as (old, new, likelihood a searcher types it)
+    # R/L confusion (common for English speakers)
+    R_L_RULES = (
+        ('r', 'l', 0.5),
+    )
+
+    # Long vowel variants (ō → o, oo → o, ...)
+    LONG_VOWEL_RULES = (
+        ('ō', 'o', 0.9), ('oo', 'o', 0.9),
+        ('ū', 'u', 0.9), ('uu', 'u', 0.9),
+        ('ā', 'a', 0.8), ('aa', 'a', 0.8),
+        ('ē', 'e', 0.8), ('ee', 'e', 0.8),
+        ('ī', 'i', 0.7), ('ii', 'i', 0.7),
+    )
+
+    # Hepburn → Kunrei-style spellings
+    SYLLABLE_RULES = (
+        ('shi', 'si', 0.3),
+        ('chi', 'ti', 0.2),
+        ('tsu', 'tu', 0.3),
+        ('fu', 'hu', 0.3),
+        ('ji', 'zi', 0.2),
+    )
+
+    VARIANT_RULES = R_L_RULES + LONG_VOWEL_RULES + SYLLABLE_RULES
+
     @staticmethod
     def to_romaji(text: str) -> str:
         """
@@ -90,53 +203,79 @@ class Romanizer:
         """
         if not text:
             return ""
+        return _to_romaji_cached(text)
 
-        result = []
-        i = 0
-        length = len(text)
-
-        while i < length:
-            char = text[i]
-
-            # Handle small tsu (geminate consonant) - doubles next consonant
-            if char == 'ッ' or char == 'っ':
-                if i + 1 < length:
-                    next_char = text[i + 1]
-                    next_romaji = Romanizer.KATAKANA_MAP.get(next_char, '')
-                    if next_romaji:
-                        result.append(next_romaji[0])  # Double the first consonant
-                i += 1
-                continue
-
-            # Handle long vowel marker
-            if char == 'ー':
-                # Extend the previous vowel
-                if result:
-                    last_char = result[-1][-1] if result[-1] else ''
-                    if last_char in 'aeiou':
-                        result.append(last_char)
-                i += 1
-                continue
-
-            # Check for small ya/yu/yo (combine with previous)
-            if i + 1 < length and text[i + 1] in ('ャ', 'ュ', 'ョ', 'ゃ', 'ゅ', 'ょ'):
-                base_romaji = Romanizer.KATAKANA_MAP.get(char, char.lower())
-                small_romaji = Romanizer.KATAKANA_MAP.get(text[i + 1], '')
-
-                # Remove final 'i' from base and append small character
-                if base_romaji.endswith('i'):
-                    result.append(base_romaji[:-1] + small_romaji)
-                else:
-                    result.append(base_romaji + small_romaji)
-                i += 2
-                continue
-
-            # Regular character conversion
-            romaji = Romanizer.KATAKANA_MAP.get(char, char.lower())
-            result.append(romaji)
-            i += 1
-
-        return ''.join(result).lower()
+    @staticmethod
+    def _convert(text: str) -> str:
+        """Uncached conversion"""
+        # Small tsu doubles the first letter of the next kana's romaji
+        if 'ッ' in text or 'っ' in text:
+            text = GEMINATE_PATTERN.sub(_geminate, text)
+        # Kana + small ya/yu/yo (kya, sho, ...)
+        text = DIGRAPH_PATTERN.sub(_combine_digraph, text)
+        # Every remaining kana in one C-level pass
+        text = text.translate(Romanizer.TRANSLATE_TABLE).lower()
+        # Long vowel marker - extend the previous vowel
+        if LONG_VOWEL in text:
+            text = LONG_VOWEL_PATTERN.sub(_extend_vowel, text).replace(LONG_VOWEL, '')
+        return text
+
+    @staticmethod
+    def iter_variants(romaji: str) -> Iterator[Tuple[str, float, int]]:
+        """
+        Lazily yield spelling variants, most likely first
+
+        Every combination of the substitutions that apply to romaji is a
+        candidate scored by the product of their likelihoods. Combinations
+        are expanded best-first from a heap, so only as many as the caller
+        consumes are ever built.
+
+        Args:
+            romaji: Romanized text
+
+        Yields:
+            (variant, score, substitutions applied) with non-increasing scores;
+            romaji itself comes first as (romaji, 1.0, 0)
+        """
+        if not romaji:
+            return
+
+        rules = sorted((rule for rule in Romanizer.VARIANT_RULES if rule[0] in romaji),
+                       key=lambda rule: -rule[2])
+        # (negated score, index of the last rule applied, rules applied)
+        heap: List[Tuple[float, int, Tuple[int, ...]]] = [(-1.0, -1, ())]
+        seen = set()
+
+        while heap:
+            neg_score, last, applied = heapq.heappop(heap)
+            variant = romaji
+            for index in applied:
+                old, new, _ = rules[index]
+                variant = variant.replace(old, new)
+            if variant and variant not in seen:
+                seen.add(variant)
+                yield variant, -neg_score, len(applied)
+
+            # Children only add rules after `last`, so each combination is built once
+            for index in range(last + 1, len(rules)):
+                heapq.heappush(heap, (neg_score * rules[index][2], index, applied + (index,)))
+
+    @staticmethod
+    def rank_variants(romaji: str, limit: int = MAX_VARIANTS_PER_NAME,
+                      min_score: float = MIN_VARIANT_SCORE) -> RankedVariants:
+        """The `limit` most likely variants of romaji scoring at least min_score"""
+        variants = []
+        combined = 0
+        capped = False
+        for variant, score, substitutions in Romanizer.iter_variants(romaji):
+            if score < min_score:
+                break
+            if len(variants) == limit:
+                capped = True
+                break
+            variants.append(variant)
+            combined += substitutions > 1
+        return RankedVariants(tuple(variants), combined, capped)
 
     @staticmethod
     def generate_variants(romaji: str) -> Set[str]:
@@ -147,41 +286,9 @@ class Romanizer:
             romaji: Romanized text
 
         Returns:
-            Set of variant spellings
+            Set of variant spellings (bounded by MAX_VARIANTS_PER_NAME)
         """
-        variants = {romaji}
-
-        # R/L confusion (common for English speakers)
-        if 'r' in romaji:
-            variants.add(romaji.replace('r', 'l'))
-
-        # Long vowel variants
-        # ō → o, ū → u, etc.
-        replacements = [
-            ('ō', 'o'), ('oo', 'o'),
-            ('ū', 'u'), ('uu', 'u'),
-            ('ā', 'a'), ('aa', 'a'),
-            ('ē', 'e'), ('ee', 'e'),
-            ('ī', 'i'), ('ii', 'i'),
-        ]
-        for old, new in replacements:
-            if old in romaji:
-                variants.add(romaji.replace(old, new))
-
-        # Shi/si, chi/ti, tsu/tu variants
-        replacements = [
-            ('shi', 'si'),
-            ('chi', 'ti'),
-            ('tsu', 'tu'),
-            ('fu', 'hu'),
-            ('ji', 'zi'),
-        ]
-        for old, new in replacements:
-            if old in romaji:
-                variants.add(romaji.replace(old, new))
-
-        # Remove duplicates and empty strings
-        return {v for v in variants if v}
+        return set(Romanizer.rank_variants(romaji).variants)
 
     @staticmethod
     def romanize_with_variants(japanese_text: str) -> List[str]:
@@ -192,11 +299,46 @@ class Romanizer:
             japanese_text: Katakana or hiragana text
 
         Returns:
-            List of romanization variants (includes original romaji)
+            Romanization variants, most likely first (original romaji first)
+        """
+        return list(_romanize_with_variants_cached(japanese_text).variants)
+
+    @staticmethod
+    def romanize_many(names: Iterable[str],
+                       stats: Optional[VariantStats] = None) -> Dict[str, List[str]]:
         """
-        base_romaji = Romanizer.to_romaji(japanese_text)
-        variants = Romanizer.generate_variants(base_romaji)
-        return sorted(variants)
+        Romanize a batch of names (each distinct name is converted once)
+
+        Args:
+            names: Katakana or hiragana texts, duplicates allowed
+            stats: Accumulates variant counts for the distinct names
+
+        Returns:
+            {name: romanization variants, most likely first}
+        """
+        result = {}
+        for name in dict.fromkeys(names):
+            ranked = _romanize_with_variants_cached(name)
+            if stats is not None:
+                stats.add(ranked)
+            result[name] = list(ranked.variants)
+        return result
+
+    @staticmethod
+    def cache_info() -> Dict[str, int]:
+        """Hit/miss counts of the memoized romanize_with_variants"""
+        info = _romanize_with_variants_cached.cache_info()
+        return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+
+
+@lru_cache(maxsize=ROMANIZE_CACHE_SIZE)
+def _to_romaji_cached(text: str) -> str:
+    return Romanizer._convert(text)
+
+
+@lru_cache(maxsize=ROMANIZE_CACHE_SIZE)
+def _romanize_with_variants_cached(japanese_text: str) -> RankedVariants:
+    return Romanizer.rank_variants(Romanizer.to_romaji(japanese_text))
 
 
 def main():
@@ -225,6 +367,14 @@ def main():
         print(f"  Base: {romaji}")
         print(f"  Variants: {', '.join(sorted(variants))}")
 
+    # Batch API: repeated names (forms, reprints) are converted once
+    names = [japanese for japanese, _ in test_cases] * 3
+    stats = VariantStats()
+    batch = Romanizer.romanize_many(names, stats)
+    Romanizer.romanize_many(names)
+    print(f"\nromanize_many: {len(names)} names -> {len(batch)} distinct, cache {Romanizer.cache_info()}")
+    print(f"Alias growth: {stats.summary()}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Set Registry - The `sets` dimension table shared by the database builders
+Each (set_id, language) gets one row with the set's name, series, release
+date and card total, and a compact integer set_key that card rows store
+instead of repeating set_id and set_name. Builders keep a compatibility
+view with the old column names over their keyed table; adopt_set_keys()
+moves a database built before the sets table onto keys in place
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+SETS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sets (
+        set_key INTEGER PRIMARY KEY,
+        set_id TEXT NOT NULL,
+        language TEXT NOT NULL,
+        name TEXT NOT NULL,
+        series TEXT,
+        release_date TEXT,  -- YYYY-MM-DD
+        card_total INTEGER,
+        source TEXT NOT NULL,
+        UNIQUE (set_id, language)
+    );
+"""
+
+# Metadata a later sighting doesn't know (e.g. a set list without series)
+# never overwrites what an earlier one recorded
+UPSERT_SET_SQL = """
+    INSERT INTO sets (set_id, language, name, series, release_date, card_total, source)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(set_id, language) DO UPDATE SET
+        name = CASE WHEN excluded.name != '' THEN excluded.name ELSE sets.name END,
+        series = COALESCE(excluded.series, sets.series),
+        release_date = COALESCE(excluded.release_date, sets.release_date),
+        card_total = COALESCE(excluded.card_total, sets.card_total),
+        source = excluded.source
+    WHERE (sets.name, sets.series, sets.release_date, sets.card_total, sets.source)
+        IS NOT (CASE WHEN excluded.name != '' THEN excluded.name ELSE sets.name END,
+                COALESCE(excluded.series, sets.series),
+                COALESCE(excluded.release_date, sets.release_date),
+                COALESCE(excluded.card_total, sets.card_total),
+                excluded.source)
+"""
+
+
+@dataclass(frozen=True)
+class SetInfo:
+    """What a source says about one set in one language"""
+    set_id: str
+    language: str
+    name: str
+    source: str
+    series: Optional[str] = None
+    release_date: Optional[str] = None
+    card_total: Optional[int] = None
+
+    @classmethod
+    def from_pokemontcg(cls, data: Dict[str, Any]) -> "SetInfo":
+        """From a PokemonTCG.io `set` object (embedded in every card)"""
+        release_date = data.get("releaseDate")
+        return cls(
+            set_id=data.get("id", ""),
+            language="en",
+            name=data.get("name", ""),
+            source="pokemontcg",
+            series=data.get("series"),
+            release_date=release_date.replace("/", "-") if release_date else None,
+            card_total=data.get("total"),
+        )
+
+    @classmethod
+    def from_tcgdex(cls, data: Dict[str, Any], language: str,
+                    set_id: str = "", name: str = "") -> "SetInfo":
+        """
+        From a TCGdex set payload
+
+        set_id is the set list's ID (what set_state records), used over the
+        payload's; name fills in a payload without one.
+        """
+        serie = data.get("serie") or {}
+        card_count = data.get("cardCount") or {}
+        return cls(
+            set_id=set_id or data.get("id", ""),
+            language=language,
+            name=data.get("name") or name,
+            source="tcgdex",
+            series=serie.get("name"),
+            release_date=data.get("releaseDate"),
+            card_total=card_count.get("total"),
+        )
+
+
+class SetRegistry:
+    """Hands out set_keys, writing each set's metadata once per run"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.conn.executescript(SETS_SCHEMA)
+        self._keys: Dict[Tuple[str, str], int] = {}
+
+    def key(self, info: SetInfo) -> int:
+        """set_key for a set, recording (or refreshing) its metadata on first use"""
+        cache_key = (info.set_id, info.language)
+        set_key = self._keys.get(cache_key)
+        if set_key is None:
+            self.conn.execute(UPSERT_SET_SQL, (
+                info.set_id, info.language, info.name, info.series,
+                info.release_date, info.card_total, info.source
+            ))
+            set_key = self.lookup(info.set_id, info.language)
+        return set_key
+
+    def lookup(self, set_id: str, language: str) -> Optional[int]:
+        """set_key of a set already in the table (None if it never was)"""
+        cache_key = (set_id, language)
+        if cache_key not in self._keys:
+            row = self.conn.execute(
+                "SELECT set_key FROM sets WHERE set_id = ? AND language = ?", cache_key
+            ).fetchone()
+            if row is None:
+                return None
+            self._keys[cache_key] = row[0]
+        return self._keys[cache_key]
+
+    def remove(self, table: str, set_id: str, language: str) -> int:
+        """
+        Delete a vanished set's rows from table, then the set itself
+
+        Returns:
+            Rows deleted from table (delete triggers keep FTS in sync)
+        """
+        set_key = self.lookup(set_id, language)
+        if set_key is None:
+            return 0
+        removed = self.conn.execute(f"DELETE FROM {table} WHERE set_key = ?", (set_key,)).rowcount
+        self.conn.execute("DELETE FROM sets WHERE set_key = ?", (set_key,))
+        del self._keys[(set_id, language)]
+        return removed
+
+
+def has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def adopt_set_keys(conn: sqlite3.Connection, table: str, keyed_table: str, keyed_schema: str,
+                   view_schema: str, language_sql: str, source_sql: str) -> bool:
+    """
+    Move an old-layout table (set_id and set_name on every row) onto set keys
+
+    Sets are collected from the rows, every row is copied into keyed_table
+    with its rowid (so external-content FTS indexes stay valid), and the old
+    table is replaced by the compatibility view. Its triggers and indexes go
+    with it; callers recreate them.
+
+    Args:
+        table: Old table, and name of the view replacing it
+        keyed_table: New table, created by keyed_schema
+        view_schema: CREATE VIEW statement for table
+        language_sql: Row language as an expression over alias `t` (e.g. "t.language")
+        source_sql: Row source as an expression over alias `t`
+
+    Returns:
+        False if the database already uses set keys
+    """
+    if has_table(conn, keyed_table) or not has_table(conn, table):
+        return False
+
+    conn.executescript(SETS_SCHEMA)
+    conn.execute(f"""
+        INSERT OR IGNORE INTO sets (set_id, language, name, source)
+        SELECT t.set_id, {language_sql}, MAX(t.set_name), MAX({source_sql})
+        FROM {table} t GROUP BY t.set_id, {language_sql}
+    """)
+    conn.executescript(keyed_schema)
+
+    old_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({keyed_table})")
+               if row[1] in old_columns]
+    conn.execute(f"""
+        INSERT INTO {keyed_table} (rowid, {', '.join(columns)}, set_key)
+        SELECT t.rowid, {', '.join(f't.{column}' for column in columns)}, s.set_key
+        FROM {table} t JOIN sets s ON s.set_id = t.set_id AND s.language = {language_sql}
+    """)
+    conn.execute(f"DROP TABLE {table}")
+    conn.executescript(view_schema)
+    conn.commit()
+    return True
+
+
+def main():
+    """Register a few sets and show the keys and metadata they get"""
+    conn = sqlite3.connect(":memory:")
+    registry = SetRegistry(conn)
+    base = SetInfo.from_pokemontcg({
+        "id": "base1", "name": "Base", "series": "Base",
+        "releaseDate": "1999/01/09", "total": 102,
+    })
+    print(f"base1/en -> {registry.key(base)}")
+    print(f"base1/en again -> {registry.key(base)} (cached)")
+    print(f"SV1/ja -> {registry.key(SetInfo.from_tcgdex({'name': 'スカーレットex'}, 'ja', set_id='SV1'))}")
+
+    # The next run's first sighting fills in what is known now, keeping the rest
+    registry = SetRegistry(conn)
+    print(f"SV1/ja next run -> {registry.key(SetInfo('SV1', 'ja', '', 'tcgdex', card_total=108))}")
+    for row in conn.execute("SELECT * FROM sets"):
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
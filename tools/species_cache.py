@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Species Cache - SQLite store for PokéAPI species keyed by National Dex number
+Replaces the monolithic pokeapi_cache.json: lookups are point reads, each
+fetched species is committed on its own, the schema is versioned through
+PRAGMA user_version, and WAL plus a busy timeout let several builder
+processes share one cache file. An existing JSON cache is imported once
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+
+# Migrations indexed by the schema version they produce
+MIGRATIONS = {
+    1: """
+        CREATE TABLE IF NOT EXISTS species (
+            dex_number INTEGER PRIMARY KEY,
+            species_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            fetched_at INTEGER DEFAULT (strftime('%s', 'now'))
+        );
+    """,
+}
+
+BUSY_TIMEOUT_SECONDS = 30
+LOOKUP_CHUNK = 500  # stay well under SQLite's bound-parameter limit
+
+LEGACY_KEY = re.compile(r"species_(\d+)")
+
+
+class SpeciesCache:
+    """Species records (as plain dicts) stored one row per Dex number"""
+
+    SCHEMA_VERSION = max(MIGRATIONS)
+
+    def __init__(self, path: Path, legacy_json: Optional[Path] = None):
+        """
+        Args:
+            path: SQLite cache file (created if missing)
+            legacy_json: Old pokeapi_cache.json to import when the cache is first created
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS,
+                                   check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self.migrated = self._migrate(legacy_json)
+
+    def _migrate(self, legacy_json: Optional[Path]) -> int:
+        """
+        Bring the schema up to SCHEMA_VERSION (and import legacy JSON on creation).
+
+        Runs under BEGIN IMMEDIATE so two processes opening a fresh cache
+        don't both migrate it.
+
+        Returns:
+            Number of species imported from legacy_json
+        """
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version == self.SCHEMA_VERSION:
+            return 0
+
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-read: another process may have migrated while we waited for the lock
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version > self.SCHEMA_VERSION:
+                raise RuntimeError(
+                    f"{self.path} uses species cache schema {version}, "
+                    f"newer than this code ({self.SCHEMA_VERSION})"
+                )
+
+            imported = 0
+            for target in range(version + 1, self.SCHEMA_VERSION + 1):
+                for statement in MIGRATIONS[target].split(';'):
+                    if statement.strip():
+                        self._db.execute(statement)
+            if version == 0 and legacy_json is not None and Path(legacy_json).exists():
+                imported = self._import_json(Path(legacy_json))
+
+            self._db.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            self._db.commit()
+        except BaseException:
+            self._db.rollback()
+            raise
+
+        if imported:
+            print(f"Imported {imported} species from {legacy_json}")
+        return imported
+
+    def _import_json(self, legacy_json: Path) -> int:
+        """Copy entries from the old JSON cache (the file itself is left untouched)"""
+        try:
+            with open(legacy_json, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"Warning: Failed to import {legacy_json}: {e}")
+            return 0
+
+        rows = []
+        for key, data in entries.items():
+            match = LEGACY_KEY.fullmatch(key)
+            if match and isinstance(data, dict) and 'species_id' in data:
+                rows.append((int(match.group(1)), data['species_id'],
+                             json.dumps(data, ensure_ascii=False)))
+
+        self._db.executemany(
+            "INSERT OR REPLACE INTO species (dex_number, species_id, data) VALUES (?, ?, ?)",
+            rows
+        )
+        return len(rows)
+
+    def get(self, dex_number: int) -> Optional[Dict]:
+        """Cached species record, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM species WHERE dex_number = ?", (dex_number,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, dex_numbers: Iterable[int]) -> Dict[int, Dict]:
+        """Cached records for the given Dex numbers (misses are simply absent)"""
+        dex_numbers = list(dex_numbers)
+        found = {}
+        with self._lock:
+            for offset in range(0, len(dex_numbers), LOOKUP_CHUNK):
+                chunk = dex_numbers[offset:offset + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for dex_number, data in self._db.execute(
+                    f"SELECT dex_number, data FROM species WHERE dex_number IN ({placeholders})",
+                    chunk
+                ):
+                    found[dex_number] = json.loads(data)
+        return found
+
+    def put(self, dex_number: int, data: Dict):
+        """Store one species record and commit it immediately"""
+        with self._lock:
+            self._db.execute("""
+                INSERT OR REPLACE INTO species (dex_number, species_id, data, fetched_at)
+                VALUES (?, ?, ?, strftime('%s', 'now'))
+            """, (dex_number, data['species_id'], json.dumps(data, ensure_ascii=False)))
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM species").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main():
+    """Migrate a small JSON cache into a temporary SQLite cache and read it back"""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "pokeapi_cache.json"
+        legacy.write_text(json.dumps({
+            f"species_{n}": {'species_id': f"mock-{n}", 'canonical_name': f"Mock {n}",
+                             'card_type': 'pokemon', 'names': [], 'national_dex_number': n}
+            for n in range(1, 151)
+        }), encoding='utf-8')
+
+        cache = SpeciesCache(Path(tmp) / "pokeapi_cache.db", legacy_json=legacy)
+        print(f"Schema v{cache.SCHEMA_VERSION}: {len(cache)} species ({cache.migrated} migrated)")
+        cache.put(151, {'species_id': 'mew', 'canonical_name': 'Mew', 'card_type': 'pokemon',
+                        'names': [], 'national_dex_number': 151})
+
+        # A second handle (as another process would open it) sees the write without re-importing
+        other = SpeciesCache(Path(tmp) / "pokeapi_cache.db", legacy_json=legacy)
+        hits = other.get_many(range(1, 200))
+        print(f"Second handle: {len(hits)} hits for 1-199, #151 = {other.get(151)['canonical_name']}, "
+              f"{other.migrated} migrated")
+        other.close()
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
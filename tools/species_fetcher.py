@@ -2,16 +2,21 @@
 """
 Species Fetcher - PokéAPI Integration
 Fetches canonical Pokémon species data with multilingual names from PokéAPI
-Includes caching to avoid rate limiting (100 req/min)
+Includes caching to avoid rate limiting (100 req/min); uncached species can be
+fetched from a worker pool while the shared client keeps the global rate
+under the limit
 """
 
-import json
-import time
+import threading
 from pathlib import Path
+from urllib.parse import urlparse
 from typing import Dict, List, Optional
-import requests
 from dataclasses import dataclass, asdict
 
+from concurrent_fetch import bounded_imap
+from http_client import HttpClient, shared_client
+from species_cache import SpeciesCache
+
 
 @dataclass
 class SpeciesName:
@@ -35,8 +40,10 @@ class SpeciesFetcher:
     """Fetches and caches Pokémon species data from PokéAPI"""
 
     API_BASE = "https://pokeapi.co/api/v2"
-    RATE_LIMIT_DELAY = 0.6  # 100 req/min = 0.6s per request
-    CACHE_FILE = "pokeapi_cache.json"
+    MAX_REQUESTS_PER_SECOND = 100 / 60  # PokéAPI fair use: 100 req/min
+    CACHE_FILE = "pokeapi_cache.db"
+    LEGACY_CACHE_FILE = "pokeapi_cache.json"  # imported once into CACHE_FILE
+    DEFAULT_CONCURRENCY = 8
 
     # Language mapping from PokéAPI to our database
     LANGUAGE_MAP = {
@@ -53,46 +60,26 @@ class SpeciesFetcher:
         "pt-BR": "pt"
     }
 
-    def __init__(self, cache_path: Optional[Path] = None):
+    def __init__(self, cache_path: Optional[Path] = None,
+                 http_client: Optional[HttpClient] = None):
         self.cache_path = cache_path or Path(__file__).parent / self.CACHE_FILE
-        self.cache = self._load_cache()
+        self.http = http_client or shared_client()
+        # The client's per-host limiter paces requests and backs off on 429s
+        self.http.set_rate_limit(urlparse(self.API_BASE).netloc, self.MAX_REQUESTS_PER_SECOND)
+        self.cache = SpeciesCache(
+            self.cache_path, legacy_json=self.cache_path.with_name(self.LEGACY_CACHE_FILE)
+        )
         self.request_count = 0
-        self.last_request_time = 0
-
-    def _load_cache(self) -> Dict:
-        """Load cached species data"""
-        if self.cache_path.exists():
-            try:
-                with open(self.cache_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Warning: Failed to load cache: {e}")
-        return {}
-
-    def _save_cache(self):
-        """Save species data to cache"""
-        try:
-            with open(self.cache_path, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Warning: Failed to save cache: {e}")
-
-    def _rate_limit(self):
-        """Enforce rate limiting"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.RATE_LIMIT_DELAY:
-            time.sleep(self.RATE_LIMIT_DELAY - elapsed)
-        self.last_request_time = time.time()
+        # Guards request_count when fetch_species runs on workers
+        self._lock = threading.Lock()
 
     def _fetch_json(self, url: str) -> Optional[Dict]:
-        """Fetch JSON from URL with rate limiting"""
-        self._rate_limit()
-        self.request_count += 1
+        """Fetch JSON from URL (rate limited by the HTTP client)"""
+        with self._lock:
+            self.request_count += 1
 
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self.http.get_json(url, timeout=10)
         except Exception as e:
             print(f"Error fetching {url}: {e}")
             return None
@@ -107,18 +94,10 @@ class SpeciesFetcher:
         Returns:
             Species object with all language names, or None on error
         """
-        cache_key = f"species_{pokemon_id}"
-
         # Check cache first
-        if cache_key in self.cache:
-            data = self.cache[cache_key]
-            return Species(
-                species_id=data['species_id'],
-                canonical_name=data['canonical_name'],
-                card_type=data['card_type'],
-                names=[SpeciesName(**n) for n in data['names']],
-                national_dex_number=data.get('national_dex_number')
-            )
+        cached = self._cached_species(pokemon_id)
+        if cached:
+            return cached
 
         # Fetch from API
         url = f"{self.API_BASE}/pokemon-species/{pokemon_id}/"
@@ -167,46 +146,75 @@ class SpeciesFetcher:
             national_dex_number=pokemon_id
         )
 
-        # Cache the result
-        self.cache[cache_key] = {
+        # Cache the result (committed right away, so progress survives interrupts)
+        self.cache.put(pokemon_id, {
             'species_id': species.species_id,
             'canonical_name': species.canonical_name,
             'card_type': species.card_type,
             'names': [asdict(n) for n in species.names],
             'national_dex_number': species.national_dex_number
-        }
+        })
 
         return species
 
-    def fetch_all_species(self, max_id: int = 1025) -> List[Species]:
+    def _cached_species(self, pokemon_id: int) -> Optional[Species]:
+        """Species from the cache, or None if it still has to be fetched"""
+        data = self.cache.get(pokemon_id)
+        return self._species_from_cache(data) if data else None
+
+    @staticmethod
+    def _species_from_cache(data: Dict) -> Species:
+        return Species(
+            species_id=data['species_id'],
+            canonical_name=data['canonical_name'],
+            card_type=data['card_type'],
+            names=[SpeciesName(**n) for n in data['names']],
+            national_dex_number=data.get('national_dex_number')
+        )
+
+    def fetch_all_species(self, max_id: int = 1025,
+                          concurrency: int = DEFAULT_CONCURRENCY) -> List[Species]:
         """
         Fetch all Pokémon species up to max_id
 
+        Cached species are resolved up front; only the misses go to the
+        worker pool. The host's rate limit is shared by all workers, so
+        concurrency hides latency without raising the request rate.
+
         Args:
             max_id: Maximum National Dex number (default: 1025 for Gen 9)
+            concurrency: Requests kept in flight (1 = sequential)
 
         Returns:
-            List of Species objects
+            List of Species objects, in National Dex order
         """
         print(f"Fetching species 1-{max_id} from PokéAPI...")
         print(f"Cache: {len(self.cache)} entries")
 
-        species_list = []
-        failed = []
+        by_id: Dict[int, Species] = {
+            pokemon_id: self._species_from_cache(data)
+            for pokemon_id, data in self.cache.get_many(range(1, max_id + 1)).items()
+        }
+        missing = [pokemon_id for pokemon_id in range(1, max_id + 1) if pokemon_id not in by_id]
 
-        for pokemon_id in range(1, max_id + 1):
-            if pokemon_id % 50 == 0:
-                print(f"Progress: {pokemon_id}/{max_id} ({self.request_count} API requests)")
+        if missing:
+            concurrency = max(1, concurrency)
+            print(f"Fetching {len(missing)} uncached species ({concurrency} in flight)")
+            self.http.set_pool_size(urlparse(self.API_BASE).netloc, concurrency)
 
-            species = self.fetch_species(pokemon_id)
-            if species:
-                species_list.append(species)
+        failed = []
+        for done, outcome in enumerate(bounded_imap(self.fetch_species, missing, concurrency), 1):
+            if outcome.ok and outcome.result:
+                by_id[outcome.item] = outcome.result
             else:
-                failed.append(pokemon_id)
+                if outcome.error:
+                    print(f"Error fetching species {outcome.item}: {outcome.error}")
+                failed.append(outcome.item)
 
-        # Save cache after fetching
-        self._save_cache()
+            if done % 50 == 0:
+                print(f"Progress: {done}/{len(missing)} ({self.request_count} API requests)")
 
+        species_list = [by_id[pokemon_id] for pokemon_id in sorted(by_id)]
         print(f"\nFetched {len(species_list)} species ({self.request_count} API requests)")
         if failed:
             print(f"Failed to fetch: {failed}")
@@ -251,8 +259,8 @@ def main():
             marker = "★" if name.is_canonical else " "
             print(f"  {marker} [{name.language}] {name.name}")
 
-    # Uncomment to fetch all species (takes ~10 minutes)
-    # all_species = fetcher.fetch_all_species(max_id=100)
+    # Uncomment to fetch all species (~10 minutes cold at 100 req/min)
+    # all_species = fetcher.fetch_all_species(max_id=100, concurrency=8)
     # print(f"\nFetched {len(all_species)} total species")
 
 
@@ -6,9 +6,13 @@ Handles multi-Pokémon cards, variants (EX, GX, V, VMAX, etc.), and edge cases
 """
 
 import re
+from bisect import bisect_right
 from typing import List, Dict, Set, Optional, Tuple
 from dataclasses import dataclass
 
+from alias_automaton import AliasAutomaton
+from fuzzy_index import FuzzyCandidate, TrigramIndex, similarity
+
 
 @dataclass
 class CardSpeciesMapping:
@@ -17,25 +21,28 @@ class CardSpeciesMapping:
     species_ids: List[str]
     is_primary: List[bool]  # Which species is primary (for multi-Pokémon cards)
     confidence: float  # 0.0-1.0, for manual review threshold
+    variant: Optional[str] = None  # 'EX', 'GX', 'V', 'VMAX', 'VSTAR' or 'ex'
+
+
+@dataclass
+class ParsedCardName:
+    """Card name split into Pokémon names and its variant suffix"""
+    pokemon_names: List[str]  # Variant-free, one per TAG TEAM partner
+    variant: Optional[str]
 
 
 class SpeciesMapper:
     """Maps card names to species using pattern matching and name normalization"""
 
-    # Pokémon card variants to strip (case-insensitive)
-    VARIANT_SUFFIXES = [
-        r'\s+EX\s*$',
-        r'\s+GX\s*$',
-        r'\s+V\s*$',
-        r'\s+VMAX\s*$',
-        r'\s+VSTAR\s*$',
-        r'\s+&\s+',  # TAG TEAM delimiter
-        r'\s+ex\s*$',  # Lowercase variants
-        r'\s+gx\s*$',
-        r'\s+v\s*$',
-        r'\s+vmax\s*$',
-        r'\s+vstar\s*$',
-    ]
+    # Pokémon card variant suffix (case-insensitive), after a space or hyphen
+    # ("Charizard-GX") or directly after a Japanese/Chinese name ("リザードンex")
+    VARIANT_SUFFIX = re.compile(
+        r'(?:[\s\-]+|(?<=[^\x00-\x7f]))(VMAX|VSTAR|EX|GX|V)\s*$',
+        re.IGNORECASE
+    )
+
+    # TAG TEAM delimiters (ASCII and full-width, as in Japanese card names)
+    TAG_TEAM_DELIMITER = re.compile(r'\s*[&＆]\s*')
 
     # Trainer/Energy keywords (not Pokémon)
     NON_POKEMON_KEYWORDS = [
@@ -44,6 +51,18 @@ class SpeciesMapper:
         # Common trainer names
         'oak', 'juniper', 'sycamore', 'cynthia', 'n', 'guzma', 'marnie',
     ]
+    # Whole words only, so 'n' matches the N supporter and not every name with an n
+    NON_POKEMON_PATTERN = re.compile(
+        r'\b(?:' + '|'.join(map(re.escape, sorted(set(NON_POKEMON_KEYWORDS), key=len, reverse=True))) + r')\b',
+        re.IGNORECASE
+    )
+
+    _PUNCTUATION = re.compile(r'[^\w\s]')
+    _WHITESPACE = re.compile(r'\s+')
+
+    # Approximate (typo / romanization) matches below this score are ignored;
+    # names that contain or are contained in a species name always count
+    FUZZY_MIN_SCORE = 0.8
 
     def __init__(self, species_dict: Dict[str, List[str]]):
         """
@@ -65,6 +84,22 @@ class SpeciesMapper:
                     if normalized not in self.name_to_species:
                         self.name_to_species[normalized] = species_id
 
+        # Finds every species name inside a card name in one pass (fuzzy matching)
+        self.automaton = AliasAutomaton(self.name_to_species.items())
+
+        # All names joined by a separator that normalized names can't contain,
+        # so "card name inside a species name" is a single str.find
+        self._joined_names = '\n'.join(self.name_to_species) + '\n'
+        self._joined_starts: List[int] = []
+        offset = 0
+        for name in self.name_to_species:
+            self._joined_starts.append(offset)
+            offset += len(name) + 1
+        self._joined_aliases = list(self.name_to_species)
+
+        # Trigram index for typos and alternate romanizations
+        self.fuzzy_index = TrigramIndex(self.name_to_species.items())
+
     @staticmethod
     def _normalize_name(name: str) -> str:
         """Normalize name for matching"""
@@ -75,31 +110,46 @@ class SpeciesMapper:
         normalized = name.lower().strip()
 
         # Remove special characters but keep spaces for multi-word names
-        normalized = re.sub(r'[^\w\s]', '', normalized)
+        normalized = SpeciesMapper._PUNCTUATION.sub('', normalized)
 
         # Remove extra whitespace
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        normalized = SpeciesMapper._WHITESPACE.sub(' ', normalized).strip()
 
         return normalized
 
-    def _strip_variants(self, card_name: str) -> str:
-        """Remove variant suffixes from card name"""
-        name = card_name
+    def _split_variant(self, card_name: str) -> Tuple[str, Optional[str]]:
+        """Card name without its variant suffix, and the variant ('ex' keeps its case)"""
+        match = self.VARIANT_SUFFIX.search(card_name)
+        if not match:
+            return card_name.strip(), None
 
-        for pattern in self.VARIANT_SUFFIXES:
-            name = re.sub(pattern, '', name, flags=re.IGNORECASE)
+        suffix = match.group(1)
+        variant = suffix if suffix == 'ex' else suffix.upper()
+        return card_name[:match.start()].strip(), variant
 
-        return name.strip()
+    def _strip_variants(self, card_name: str) -> str:
+        """Remove variant suffixes from card name"""
+        return self._split_variant(card_name)[0]
 
     def _is_trainer_or_energy(self, card_name: str) -> bool:
         """Check if card name contains trainer/energy keywords"""
-        name_lower = card_name.lower()
+        return self.NON_POKEMON_PATTERN.search(card_name) is not None
 
-        for keyword in self.NON_POKEMON_KEYWORDS:
-            if keyword in name_lower:
-                return True
+    def parse_card_name(self, card_name: str) -> ParsedCardName:
+        """
+        Split a card name into Pokémon names and its variant
 
-        return False
+        TAG TEAM partners are split first; the variant is taken from the last
+        part ("Reshiram & Zekrom GX" -> ["Reshiram", "Zekrom"], "GX").
+        """
+        names = []
+        variant = None
+        for part in self.TAG_TEAM_DELIMITER.split(card_name):
+            name, part_variant = self._split_variant(part)
+            if name:
+                names.append(name)
+            variant = part_variant or variant
+        return ParsedCardName(pokemon_names=names, variant=variant)
 
     def _extract_pokemon_names(self, card_name: str) -> List[str]:
         """
@@ -108,16 +158,7 @@ class SpeciesMapper:
         Returns:
             List of Pokémon names found (e.g., ["Pikachu", "Zekrom"] for TAG TEAM)
         """
-        # Remove variant suffixes first
-        cleaned = self._strip_variants(card_name)
-
-        # Check for TAG TEAM (& delimiter)
-        if '&' in cleaned:
-            parts = [p.strip() for p in cleaned.split('&')]
-            return [p for p in parts if p]
-
-        # Single Pokémon
-        return [cleaned] if cleaned else []
+        return self.parse_card_name(card_name).pokemon_names
 
     def map_card_to_species(self, card_id: str, card_name: str,
                            card_type: Optional[str] = None) -> CardSpeciesMapping:
@@ -130,26 +171,23 @@ class SpeciesMapper:
             card_type: Optional type hint ('pokemon', 'trainer', 'energy')
 
         Returns:
-            CardSpeciesMapping with species IDs and confidence
+            CardSpeciesMapping with species IDs, confidence and variant
         """
+        # Extract Pokémon names and the variant suffix in one pass
+        parsed = self.parse_card_name(card_name)
+        pokemon_names = parsed.pokemon_names
+
         # Check if it's explicitly not a Pokémon
         if card_type in ('trainer', 'energy') or self._is_trainer_or_energy(card_name):
-            return CardSpeciesMapping(
-                card_id=card_id,
-                species_ids=[],
-                is_primary=[],
-                confidence=0.0
-            )
-
-        # Extract Pokémon names
-        pokemon_names = self._extract_pokemon_names(card_name)
+            pokemon_names = []
 
         if not pokemon_names:
             return CardSpeciesMapping(
                 card_id=card_id,
                 species_ids=[],
                 is_primary=[],
-                confidence=0.0
+                confidence=0.0,
+                variant=parsed.variant
             )
 
         # Match each Pokémon name to a species
@@ -166,12 +204,12 @@ class SpeciesMapper:
                 is_primary.append(i == 0)  # First Pokémon is primary
                 confidences.append(1.0)  # Exact match
             else:
-                # Fuzzy match attempt (check if name is substring of any species name)
+                # Fuzzy match attempt, scored by edit similarity to the alias hit
                 best_match = self._fuzzy_match(normalized)
                 if best_match:
-                    species_ids.append(best_match)
+                    species_ids.append(best_match.value)
                     is_primary.append(i == 0)
-                    confidences.append(0.7)  # Lower confidence for fuzzy match
+                    confidences.append(round(best_match.score, 3))
 
         # Overall confidence is minimum of all matches
         overall_confidence = min(confidences) if confidences else 0.0
@@ -180,10 +218,30 @@ class SpeciesMapper:
             card_id=card_id,
             species_ids=species_ids,
             is_primary=is_primary,
-            confidence=overall_confidence
+            confidence=overall_confidence,
+            variant=parsed.variant
         )
 
-    def _fuzzy_match(self, name: str) -> Optional[str]:
+    def _containment_candidates(self, name: str) -> List[FuzzyCandidate]:
+        """Species names found inside name, and the first one name is part of"""
+        candidates = []
+
+        # Species name inside the card name: longest, whole-word, leftmost wins
+        match = self.automaton.best_match(name)
+        if match:
+            candidates.append(FuzzyCandidate(match.value, match.alias,
+                                             similarity(name, match.alias)))
+
+        # Card name inside a species name: first species name containing it
+        position = self._joined_names.find(name)
+        if position >= 0:
+            alias = self._joined_aliases[bisect_right(self._joined_starts, position) - 1]
+            candidates.append(FuzzyCandidate(self.name_to_species[alias], alias,
+                                             similarity(name, alias)))
+
+        return candidates
+
+    def _fuzzy_match(self, name: str) -> Optional[FuzzyCandidate]:
         """
         Fuzzy match a name against species names
 
@@ -191,17 +249,40 @@ class SpeciesMapper:
             name: Normalized name to match
 
         Returns:
-            Best matching species_id or None
+            Best candidate (species_id in .value, confidence in .score) or None
         """
         if not name or len(name) < 3:
             return None
 
-        # Check if name is a substring of any species name
-        for species_name, species_id in self.name_to_species.items():
-            if name in species_name or species_name in name:
-                return species_id
+        candidates = self._containment_candidates(name)
+        candidates += self.fuzzy_index.query(name, limit=1, min_score=self.FUZZY_MIN_SCORE)
+        if not candidates:
+            return None
+        return min(candidates, key=lambda c: (-c.score, c.alias, c.value))
+
+    def suggest(self, card_name: str, limit: int = 5) -> List[FuzzyCandidate]:
+        """
+        Ranked species candidates for a card name, for review tools and reports
+
+        Args:
+            card_name: Raw card name (variant suffixes are stripped)
+            limit: Maximum candidates returned (one per species)
+
+        Returns:
+            Candidates ordered by score (1.0 = exact alias match)
+        """
+        name = self._normalize_name(self._strip_variants(card_name))
+        if not name:
+            return []
+        if name in self.name_to_species:
+            return [FuzzyCandidate(self.name_to_species[name], name, 1.0)]
 
-        return None
+        best: Dict[str, FuzzyCandidate] = {}
+        for candidate in self._containment_candidates(name) + self.fuzzy_index.query(name, limit):
+            current = best.get(candidate.value)
+            if current is None or candidate.score > current.score:
+                best[candidate.value] = candidate
+        return sorted(best.values(), key=lambda c: (-c.score, c.alias, c.value))[:limit]
 
     def map_all_cards(self, cards: List[Dict]) -> List[CardSpeciesMapping]:
         """
@@ -267,6 +348,8 @@ def main():
         {'id': '4', 'name': 'Professor Oak'},  # Trainer
         {'id': '5', 'name': 'リザードン'},  # Japanese
         {'id': '6', 'name': 'Mewtwo V'},
+        {'id': '7', 'name': 'Pikachu & Zekrom-GX'},  # Hyphenated TAG TEAM
+        {'id': '8', 'name': 'リザードンex'},  # Japanese ex, no space
     ]
 
     print("Species Mapping Test Cases")
@@ -282,6 +365,7 @@ def main():
         print(f"  Species: {mapping.species_ids}")
         print(f"  Primary: {mapping.is_primary}")
         print(f"  Confidence: {mapping.confidence:.2f}")
+        print(f"  Variant: {mapping.variant}")
 
 
 if __name__ == "__main__":
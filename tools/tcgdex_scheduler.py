@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+TCGdex Scheduler - Parallel set downloads across languages
+Fans out TCGdex set requests for every requested language at once, under a
+per-host concurrency cap and the client's adaptive (AIMD) per-host rate
+limit shared by all workers. Used by build_pokemon_db_multilang.py and
+build_pokemon_db_v2.py
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from concurrent_fetch import FetchOutcome, bounded_imap
+from http_client import HttpClient, shared_client
+from rate_limiter import AdaptiveRateLimiter
+
+
+TCGDEX_BASE_URL = "https://api.tcgdex.net/v2"
+
+
+@dataclass
+class TCGdexSetJob:
+    """One set to download in one language"""
+    language: str
+    set_id: str
+    set_name: str
+    card_count: Optional[int] = None
+
+
+class TCGdexScheduler:
+    """Downloads TCGdex set lists and set details concurrently"""
+
+    def __init__(self, base_url: str = TCGDEX_BASE_URL, max_per_host: int = 4,
+                 max_rate: float = 20.0, min_rate: float = 1.0,
+                 timeout: float = 30, client: Optional[HttpClient] = None):
+        """
+        Args:
+            base_url: TCGdex API base URL
+            max_per_host: Maximum concurrent requests to one host
+            max_rate: Requests/sec ceiling the limiter recovers toward
+            min_rate: Requests/sec floor after repeated throttling
+            timeout: Per-request timeout in seconds
+            client: Pooled HTTP client (default: the shared client), which
+                retries throttled requests with backoff
+        """
+        self.base_url = base_url.rstrip('/')
+        self.host = urlparse(self.base_url).netloc
+        self.max_per_host = max(1, max_per_host)
+        self.timeout = timeout
+        self.client = client or shared_client()
+        self.client.set_pool_size(self.host, self.max_per_host)
+        self.client.set_rate_limit(self.host, max_rate, min_rate, capacity=self.max_per_host)
+        self.request_count = 0
+
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    @property
+    def limiter(self) -> AdaptiveRateLimiter:
+        """The client's adaptive limiter for the TCGdex host"""
+        return self.client.rate_limits.limiter(self.host)
+
+    def _get_json(self, url: str) -> Optional[Any]:
+        """GET url as JSON (None on 404); the client paces and retries it"""
+        with self._slot(url):
+            with self._lock:
+                self.request_count += 1
+            return self.client.get_json(url, timeout=self.timeout, allow_404=True)
+
+    def fetch_sets(self, language: str) -> List[Dict[str, Any]]:
+        """Fetch the set list for one language"""
+        return self._get_json(f"{self.base_url}/{language}/sets") or []
+
+    def fetch_set(self, job: TCGdexSetJob) -> Optional[Dict[str, Any]]:
+        """Fetch one set's details (including its cards); None if missing"""
+        return self._get_json(f"{self.base_url}/{job.language}/sets/{job.set_id}")
+
+    def fetch_all_sets(self, languages: Iterable[str]) -> Iterator[FetchOutcome[str, List[Dict[str, Any]]]]:
+        """Fetch set lists for all languages concurrently"""
+        return bounded_imap(self.fetch_sets, list(languages), self.max_per_host)
+
+    @staticmethod
+    def interleave(jobs_by_language: Dict[str, List[TCGdexSetJob]]) -> List[TCGdexSetJob]:
+        """Round-robin jobs across languages so every language progresses at once"""
+        queues = [list(jobs) for jobs in jobs_by_language.values()]
+        ordered = []
+        for i in range(max((len(q) for q in queues), default=0)):
+            for queue in queues:
+                if i < len(queue):
+                    ordered.append(queue[i])
+        return ordered
+
+    def iter_set_details(self, jobs: Iterable[TCGdexSetJob]) -> Iterator[FetchOutcome[TCGdexSetJob, Optional[Dict[str, Any]]]]:
+        """Download set details with up to max_per_host requests in flight"""
+        return bounded_imap(self.fetch_set, jobs, self.max_per_host)
+
+    def plan_jobs(self, languages: Iterable[str],
+                  max_sets: Optional[int] = None) -> Dict[str, List[TCGdexSetJob]]:
+        """
+        Fetch set lists for all languages and turn them into jobs.
+
+        Languages whose set list fails are reported and skipped.
+        """
+        jobs_by_language: Dict[str, List[TCGdexSetJob]] = {}
+
+        for outcome in self.fetch_all_sets(languages):
+            if not outcome.ok:
+                print(f"  ERROR fetching {outcome.item} sets: {outcome.error}")
+                continue
+
+            sets = outcome.result
+            if max_sets:
+                sets = sets[:max_sets]
+
+            jobs_by_language[outcome.item] = [
+                TCGdexSetJob(
+                    outcome.item, s.get('id', ''), s.get('name', ''),
+                    (s.get('cardCount') or {}).get('total')
+                )
+                for s in sets if s.get('id')
+            ]
+
+        return jobs_by_language
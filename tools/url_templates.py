@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+URL Templates - Image URLs factored into shared prefixes and per-row stems
+Card image URLs differ only in their set directory and card number
+(https://images.pokemontcg.io/base1/4.png, .../SV1/001/low.webp). Each URL
+is stored as a url_templates row (prefix, suffix) plus a stem that is NULL
+when it equals the card number, so most rows keep one small integer. The
+builders' views rebuild image_url_small with template_url_sql()
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+URL_TEMPLATES_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS url_templates (
+        template_id INTEGER PRIMARY KEY,
+        prefix TEXT NOT NULL,
+        suffix TEXT NOT NULL,
+        UNIQUE (prefix, suffix)
+    );
+"""
+
+# TCGdex image URLs are an asset base plus a quality/format file name;
+# without it the split would put the card number in the prefix
+TCGDEX_SMALL_IMAGE = "/low.webp"
+IMAGE_SUFFIXES = (TCGDEX_SMALL_IMAGE,)
+
+ImageRef = Tuple[Optional[int], Optional[str]]  # (image_template, image_stem)
+
+
+def split_url(url: str, suffixes: Iterable[str] = IMAGE_SUFFIXES) -> Tuple[str, str, str]:
+    """
+    (prefix, stem, suffix) of url: stem is the last path segment, suffix a
+    known file name (see IMAGE_SUFFIXES) or else the segment's extension
+    """
+    suffix = next((s for s in suffixes if url.endswith(s)), None)
+    if suffix is None:
+        last = url.rsplit("/", 1)[-1]
+        dot = last.find(".")
+        suffix = last[dot:] if dot > 0 else ""
+    base = url[:len(url) - len(suffix)]
+    prefix, slash, stem = base.rpartition("/")
+    return prefix + slash, stem, suffix
+
+
+def template_url_sql(template: str, row: str, number_column: str = "card_number") -> str:
+    """SQL expression rebuilding a row's URL (NULL without an image)"""
+    return (f"{template}.prefix || COALESCE({row}.image_stem, {row}.{number_column}) "
+            f"|| {template}.suffix")
+
+
+class UrlTemplates:
+    """Hands out template_ids for image URLs, cached per run"""
+
+    def __init__(self, conn: sqlite3.Connection, suffixes: Iterable[str] = IMAGE_SUFFIXES):
+        self.conn = conn
+        self.conn.executescript(URL_TEMPLATES_SCHEMA)
+        self.suffixes = tuple(suffixes)
+        self._ids: Dict[Tuple[str, str], int] = {}
+
+    def template_id(self, prefix: str, suffix: str) -> int:
+        key = (prefix, suffix)
+        template_id = self._ids.get(key)
+        if template_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO url_templates (prefix, suffix) VALUES (?, ?)", key)
+            template_id = self.conn.execute(
+                "SELECT template_id FROM url_templates WHERE prefix = ? AND suffix = ?", key
+            ).fetchone()[0]
+            self._ids[key] = template_id
+        return template_id
+
+    def encode(self, url: Optional[str], card_number: str) -> ImageRef:
+        """(image_template, image_stem) for a URL; the stem is NULL when it is card_number"""
+        if not url:
+            return None, None
+        prefix, stem, suffix = split_url(url, self.suffixes)
+        return self.template_id(prefix, suffix), None if stem == card_number else stem
+
+
+@dataclass
+class UrlStats:
+    """Image URL bytes as full text vs. as templates and stems"""
+    urls: int
+    templates: int
+    text_bytes: int
+    stored_bytes: int
+
+    def summary(self) -> str:
+        ratio = self.text_bytes / self.stored_bytes if self.stored_bytes else 0.0
+        return (f"{self.urls:,} image URLs: {self.text_bytes / 1024:,.0f} KB as text -> "
+                f"{self.stored_bytes / 1024:,.0f} KB as {self.templates:,} templates + stems "
+                f"({ratio:.1f}x smaller)")
+
+
+def url_stats(conn: sqlite3.Connection, table: str, view: str) -> UrlStats:
+    """
+    Compare the URLs view would return with what table stores for them
+
+    Stored bytes count the template table's text, each row's stem and its
+    template_id at the varint size SQLite records it with.
+    """
+    urls, text_bytes = conn.execute(
+        f"SELECT COUNT(image_url_small), COALESCE(SUM(LENGTH(image_url_small)), 0) FROM {view}"
+    ).fetchone()
+    row_bytes = conn.execute(f"""
+        SELECT COALESCE(SUM(LENGTH(image_stem)), 0)
+             + COALESCE(SUM(CASE WHEN image_template < 128 THEN 1 WHEN image_template < 32768 THEN 2
+                                 ELSE 3 END), 0)
+        FROM {table}
+    """).fetchone()[0]
+    templates, template_bytes = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(LENGTH(prefix) + LENGTH(suffix)), 0) FROM url_templates"
+    ).fetchone()
+    return UrlStats(urls, templates, text_bytes, row_bytes + template_bytes)
+
+
+def adopt_url_templates(conn: sqlite3.Connection, table: str, id_column: str,
+                        number_column: str = "card_number", view: str = "",
+                        view_schema: str = "") -> bool:
+    """
+    Move a table that stores full image_url_small text onto templates
+
+    Adds image_template and image_stem, fills them from the URLs and drops
+    image_url_small (SQLite 3.35+; older versions keep the unused column).
+    The table's triggers are set aside while the rows are filled, since no
+    FTS index covers the URL and reindexing every row would only bloat it.
+    A view over table is dropped first and recreated from view_schema.
+
+    Returns:
+        False if table has no image_url_small column
+    """
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if "image_url_small" not in columns:
+        return False
+
+    triggers = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,)
+    ).fetchall()
+    for name, _ in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+
+    templates = UrlTemplates(conn)
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN image_template INTEGER REFERENCES url_templates(template_id)")
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN image_stem TEXT")
+    rows = conn.execute(f"SELECT {id_column}, image_url_small, {number_column} FROM {table}").fetchall()
+    conn.executemany(
+        f"UPDATE {table} SET image_template = ?, image_stem = ? WHERE {id_column} = ?",
+        [(*templates.encode(url, number), row_id) for row_id, url, number in rows]
+    )
+
+    if view:
+        conn.execute(f"DROP VIEW IF EXISTS {view}")
+    try:
+        conn.execute(f"ALTER TABLE {table} DROP COLUMN image_url_small")
+    except sqlite3.OperationalError:
+        pass
+    if view_schema:
+        conn.executescript(view_schema)
+    for _, sql in triggers:
+        conn.execute(sql)
+    conn.commit()
+    return True
+
+
+def main():
+    """Encode a few image URLs and rebuild them through a view"""
+    conn = sqlite3.connect(":memory:")
+    templates = UrlTemplates(conn)
+    conn.executescript(f"""
+        CREATE TABLE card_rows (id TEXT PRIMARY KEY, card_number TEXT, image_template INTEGER, image_stem TEXT);
+        CREATE VIEW cards AS
+        SELECT c.id, c.card_number, {template_url_sql('u', 'c')} AS image_url_small
+        FROM card_rows c LEFT JOIN url_templates u ON u.template_id = c.image_template;
+    """)
+    for card_id, number, url in [
+        ("base1-4", "4", "https://images.pokemontcg.io/base1/4.png"),
+        ("base1-58", "58", "https://images.pokemontcg.io/base1/58.png"),
+        ("SV1-001-ja", "001", f"https://assets.tcgdex.net/ja/SV/SV1/001{TCGDEX_SMALL_IMAGE}"),
+        ("promo-SM01", "SM01", "https://images.pokemontcg.io/smp/SM01.png"),
+        ("swsh45sv-SV001", "SV001", "https://images.pokemontcg.io/swsh45sv/SV1.png"),
+        ("no-image", "1", None),
+    ]:
+        template_id, stem = templates.encode(url, number)
+        conn.execute("INSERT INTO card_rows VALUES (?, ?, ?, ?)", (card_id, number, template_id, stem))
+        print(f"{card_id}: template {template_id}, stem {stem!r}")
+
+    for card_id, url in conn.execute("SELECT id, image_url_small FROM cards"):
+        print(f"  {card_id} -> {url}")
+    print(url_stats(conn, "card_rows", "cards").summary())
+
+
+if __name__ == "__main__":
+    main()